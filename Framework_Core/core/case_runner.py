@@ -0,0 +1,125 @@
+import operator
+from typing import Dict, Any, Callable, Optional
+from loguru import logger
+from Framework_Core.core.dependency_graph import DependencyResolver
+from Framework_Core.utils.fileUtils.case_model import YamlCase, YamlCaseFile, render_value
+from Framework_Core.utils.requestUtils.api_plugin import APIRequest
+from Framework_Core.utils.requestUtils.extractor import extract
+
+ASSERT_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    'in': lambda actual, expect: actual in expect,
+    'not in': lambda actual, expect: actual not in expect,
+    'contains': lambda actual, expect: expect in actual,
+}
+
+
+class YamlCaseRunner:
+    """
+    YAML用例执行器
+    直接基于预解析的用例模型发送请求、处理依赖和断言，不生成测试代码
+    """
+
+    def __init__(self, api_client: Optional[APIRequest] = None, functions: Optional[Dict[str, Callable[[], Any]]] = None):
+        """
+        :param api_client: API客户端
+        :param functions: 占位符中可调用的函数，如 {'host': lambda: 'https://api.example.com'}
+        """
+        self.api_client = api_client or APIRequest()
+        self.functions = functions or {}
+        self.cache: Dict[str, Any] = {}
+        self.dependencies = DependencyResolver(self)
+
+    def resolve(self, expr: str) -> Any:
+        """
+        解析占位符表达式：func() 调用注册的函数，其余从缓存中取值
+        :param expr: 占位符中的表达式
+        :return: 变量值
+        """
+        if expr.endswith('()'):
+            func = self.functions.get(expr[:-2])
+            if func is None:
+                raise KeyError(f"未注册的函数: {expr}")
+            return func()
+        if expr not in self.cache:
+            raise KeyError(f"缓存中不存在变量: {expr}")
+        return self.cache[expr]
+
+    def build_request(self, case: YamlCase) -> Dict[str, Any]:
+        """
+        渲染用例请求参数
+        :param case: 用例模型
+        :return: request方法的关键字参数
+        """
+        headers = {
+            key: self.cache.get(value, value) if isinstance(value, str) else value
+            for key, value in render_value(case.headers, self.resolve).items()
+        }
+        data = render_value(case.data, self.resolve)
+
+        request = {
+            'method': case.method,
+            'endpoint': f"{case.host.render(self.resolve)}{case.url.render(self.resolve)}",
+            'headers': headers,
+        }
+        if case.request_type == 'json':
+            request['json_data'] = data
+        elif case.request_type == 'params':
+            request['params'] = data
+        else:
+            request['data'] = data
+        return request
+
+    def send(self, case: YamlCase) -> Any:
+        """
+        发送用例请求
+        :param case: 用例模型
+        :return: 响应对象
+        """
+        return self.api_client.request(**self.build_request(case))
+
+    def run_case(self, case_file: YamlCaseFile, case: YamlCase) -> Any:
+        """
+        执行用例：处理依赖、发送请求并校验断言
+        :param case_file: 用例所在文件
+        :param case: 用例模型
+        :return: 响应对象
+        """
+        logger.info(f"开始执行测试用例: {case.detail}")
+        self.dependencies.resolve(case_file, case)
+        request = self.build_request(case)
+        response = self.api_client.request(**request)
+        self.check_assertions(case, response)
+        # 断言通过后才记录，依赖该用例的用例不会复用失败的响应
+        self.dependencies.remember(case_file, case, request, response)
+        logger.info("测试用例执行完成")
+        return response
+
+    def check_assertions(self, case: YamlCase, response: Any) -> None:
+        """
+        校验用例断言
+        :param case: 用例模型
+        :param response: 响应对象
+        """
+        for assertion in case.assertions:
+            compare = ASSERT_OPERATORS.get(assertion.type)
+            if compare is None:
+                raise ValueError(f"不支持的断言类型: {assertion.type}")
+            actual = self.extract_data(response, assertion.jsonpath)
+            assert compare(actual, assertion.value), \
+                f"断言失败: {assertion.name} {actual!r} {assertion.type} {assertion.value!r}"
+
+    @staticmethod
+    def extract_data(response: Any, expr: str) -> Any:
+        """
+        从响应中提取数据
+        :param response: 响应对象
+        :param expr: JSONPath表达式
+        :return: 第一个匹配值，不存在时返回None
+        """
+        return extract(response, expr)
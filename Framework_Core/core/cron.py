@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from typing import FrozenSet, Optional
+
+# 常用别名
+CRON_ALIASES = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+MONTH_NAMES = {name: i + 1 for i, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'])}
+WEEKDAY_NAMES = {name: i for i, name in enumerate(['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'])}
+
+# 最多向后查找的年数，用于拦截 "0 0 30 2 *" 这类永远不会触发的表达式
+MAX_SEARCH_YEARS = 5
+
+
+class CronExpression:
+    """
+    五段式cron表达式: 分 时 日 月 周
+    支持 *、数字、范围 a-b、步长 */n 和 a-b/n、逗号列表、月份/星期英文缩写以及 @daily 等别名；
+    日和周同时指定时满足其一即可（与crontab一致）
+    """
+
+    def __init__(self, expr: str):
+        """
+        :param expr: cron表达式
+        """
+        self.expr = expr
+        fields = CRON_ALIASES.get(expr.strip().lower(), expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron表达式必须包含5段: {expr}")
+        self.minutes = self._parse_field(fields[0], 0, 59)
+        self.hours = self._parse_field(fields[1], 0, 23)
+        self.days = self._parse_field(fields[2], 1, 31)
+        self.months = self._parse_field(fields[3], 1, 12, MONTH_NAMES)
+        # 周日可以写作0或7
+        weekdays = self._parse_field(fields[4], 0, 7, WEEKDAY_NAMES)
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int, names: Optional[dict] = None) -> FrozenSet[int]:
+        values = set()
+        for part in field.lower().split(','):
+            step = 1
+            if '/' in part:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"cron步长必须大于0: {field}")
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start_text, end_text = part.split('-', 1)
+                start, end = _to_int(start_text, names), _to_int(end_text, names)
+            else:
+                start = _to_int(part, names)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"cron字段超出范围[{low}-{high}]: {field}")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def _day_matches(self, dt: datetime) -> bool:
+        in_days = dt.day in self.days
+        in_weekdays = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return in_weekdays
+        if self._any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    def next_after(self, dt: datetime) -> datetime:
+        """
+        计算给定时间之后的下一次触发时间
+        按 月 -> 日 -> 时 -> 分 的顺序跳过不匹配的区间，而不是逐分钟尝试
+        :param dt: 起始时间（不包含）
+        :return: 下一次触发时间
+        """
+        current = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt.year + MAX_SEARCH_YEARS
+        while current.year <= limit:
+            if current.month not in self.months:
+                year, month = (current.year + 1, 1) if current.month == 12 else (current.year, current.month + 1)
+                current = current.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(current):
+                current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if current.hour not in self.hours:
+                current = (current + timedelta(hours=1)).replace(minute=0)
+                continue
+            if current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+                continue
+            return current
+        raise ValueError(f"cron表达式在{MAX_SEARCH_YEARS}年内不会触发: {self.expr}")
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expr!r})"
+
+
+def _to_int(text: str, names: Optional[dict]) -> int:
+    if names and text in names:
+        return names[text]
+    return int(text)
@@ -0,0 +1,196 @@
+from typing import Dict, Any, List, Set, Tuple, Optional
+from loguru import logger
+from Framework_Core.utils.fileUtils.case_model import YamlCase, YamlCaseFile
+from Framework_Core.utils.requestUtils.async_api_plugin import AsyncAPIRequest
+
+# dependent_type 对应的提取来源：response 从响应体提取，其余从上游用例发送的请求数据中提取
+DEPENDENT_SOURCES: Dict[str, Optional[str]] = {
+    'response': None,
+    'json': 'json_data',
+    'params': 'params',
+    'form-data': 'data',
+}
+
+
+class CaseDependencyGraph:
+    """用例依赖关系图，节点为用例ID，边由dependence_case_data中的case_id确定"""
+
+    def __init__(self, case_file: YamlCaseFile):
+        """
+        :param case_file: 用例文件模型
+        """
+        self.case_file = case_file
+        self.upstream: Dict[str, List[str]] = {}
+        for case_id, case in case_file.cases.items():
+            # 同一上游用例被多次引用时只保留一条边
+            self.upstream[case_id] = list(dict.fromkeys(dep.case_id for dep in case.dependencies))
+
+    def ancestors(self, case_id: str) -> Set[str]:
+        """
+        获取用例直接和间接依赖的全部上游用例
+        :param case_id: 用例ID
+        :return: 上游用例ID集合
+        """
+        result: Set[str] = set()
+        stack = list(self._upstream_of(case_id))
+        while stack:
+            current = stack.pop()
+            if current in result:
+                continue
+            result.add(current)
+            stack.extend(self._upstream_of(current))
+        return result
+
+    def levels(self, case_ids: Set[str]) -> List[List[str]]:
+        """
+        对给定用例做拓扑分层，同一层的用例互不依赖，可以并行执行
+        :param case_ids: 需要排序的用例ID集合
+        :return: 按执行顺序排列的分层结果
+        """
+        indegree = {case_id: 0 for case_id in case_ids}
+        downstream: Dict[str, List[str]] = {case_id: [] for case_id in case_ids}
+        for case_id in case_ids:
+            for upstream in self._upstream_of(case_id):
+                if upstream in indegree:
+                    indegree[case_id] += 1
+                    downstream[upstream].append(case_id)
+
+        levels = []
+        current = sorted(case_id for case_id, degree in indegree.items() if degree == 0)
+        while current:
+            levels.append(current)
+            following = []
+            for case_id in current:
+                for child in downstream[case_id]:
+                    indegree[child] -= 1
+                    if indegree[child] == 0:
+                        following.append(child)
+            current = sorted(following)
+
+        cyclic = sorted(case_id for case_id, degree in indegree.items() if degree > 0)
+        if cyclic:
+            raise ValueError(f"用例依赖存在循环: {', '.join(cyclic)}")
+        return levels
+
+    def _upstream_of(self, case_id: str) -> List[str]:
+        if case_id not in self.upstream:
+            raise KeyError(f"依赖的用例不存在: {case_id}")
+        return self.upstream[case_id]
+
+
+class DependencyResolver:
+    """
+    依赖用例执行器
+    按依赖图分层执行上游用例，同一层的用例并发发送；每个用例在本次运行中只请求一次，
+    上游用例的断言通过后才记录其请求和响应，所有set_cache提取都复用记录的结果。并发发送时沿用执行器客户端的请求头、Cookie和附件策略，
+    服务端设置的Cookie再写回执行器客户端，结果与逐个发送一致
+    """
+
+    def __init__(self, runner: Any, async_client: Optional[AsyncAPIRequest] = None):
+        """
+        :param runner: 用例执行器，需提供 api_client/build_request/check_assertions/extract_data/cache
+        :param async_client: 并发发送同层用例的异步客户端
+        """
+        self.runner = runner
+        self.async_client = async_client or AsyncAPIRequest()
+        self._graphs: Dict[str, CaseDependencyGraph] = {}
+        self._responses: Dict[Tuple[str, str], Tuple[Dict[str, Any], Any]] = {}
+
+    def graph(self, case_file: YamlCaseFile) -> CaseDependencyGraph:
+        """获取用例文件的依赖图，模型对象变化（文件被修改）时重新构建"""
+        graph = self._graphs.get(case_file.path)
+        if graph is None or graph.case_file is not case_file:
+            graph = CaseDependencyGraph(case_file)
+            self._graphs[case_file.path] = graph
+        return graph
+
+    def remember(self, case_file: YamlCaseFile, case: YamlCase, request: Dict[str, Any], response: Any) -> None:
+        """
+        记录用例的请求和响应，后续依赖该用例的用例直接复用
+        :param case_file: 用例所在文件
+        :param case: 用例模型
+        :param request: 发送的请求参数（build_request的结果）
+        :param response: 响应对象
+        """
+        self._responses[(case_file.path, case.case_id)] = (request, response)
+
+    def resolve(self, case_file: YamlCaseFile, case: YamlCase) -> None:
+        """
+        执行用例依赖的全部上游用例，并将提取的数据写入缓存
+        :param case_file: 用例所在文件
+        :param case: 用例模型
+        """
+        if not case.dependencies:
+            return
+        graph = self.graph(case_file)
+        ancestors = graph.ancestors(case.case_id)
+        if case.case_id in ancestors:
+            raise ValueError(f"用例依赖存在循环: {case.case_id}")
+        # 发送任何上游请求之前先检查依赖类型
+        for case_id in ancestors:
+            self._check_dependent_types(case_file.cases[case_id])
+        self._check_dependent_types(case)
+
+        for level in graph.levels(ancestors):
+            pending = [case_file.cases[case_id] for case_id in level
+                       if (case_file.path, case_id) not in self._responses]
+            if not pending:
+                continue
+            for upstream in pending:
+                self.apply(case_file, upstream)
+            requests = [self.runner.build_request(upstream) for upstream in pending]
+            if len(pending) == 1:
+                responses = [self.runner.api_client.request(**requests[0])]
+            else:
+                logger.info(f"并发执行依赖用例: {', '.join(upstream.case_id for upstream in pending)}")
+                self.async_client.load_session(self.runner.api_client)
+                try:
+                    responses = self.async_client.request_many(requests)
+                finally:
+                    self.async_client.save_cookies(self.runner.api_client)
+
+            failures = []
+            for upstream, request, response in zip(pending, requests, responses):
+                try:
+                    self.runner.check_assertions(upstream, response)
+                except AssertionError as e:
+                    failures.append(f"依赖用例 {upstream.case_id} {str(e)}")
+                    continue
+                self.remember(case_file, upstream, request, response)
+            if failures:
+                raise AssertionError('; '.join(failures))
+
+        self.apply(case_file, case)
+
+    def apply(self, case_file: YamlCaseFile, case: YamlCase) -> None:
+        """
+        按dependent_type从已记录的上游请求或响应中提取用例依赖的数据
+        :param case_file: 用例所在文件
+        :param case: 用例模型
+        """
+        self._check_dependent_types(case)
+        for dep in case.dependencies:
+            recorded = self._responses.get((case_file.path, dep.case_id))
+            if recorded is None:
+                raise KeyError(f"依赖的用例尚未执行: {dep.case_id}")
+            request, response = recorded
+            key = DEPENDENT_SOURCES[dep.dependent_type]
+            if key is None:
+                source = response
+            elif key in request:
+                source = request[key]
+            else:
+                raise ValueError(f"用例 {case.case_id} 依赖 {dep.case_id} 的{dep.dependent_type}数据，"
+                                 f"但该用例的requestType为{case_file.cases[dep.case_id].request_type}")
+            self.runner.cache[dep.cache_name] = self.runner.extract_data(source, dep.jsonpath)
+
+    @staticmethod
+    def _check_dependent_types(case: YamlCase) -> None:
+        for dep in case.dependencies:
+            if dep.dependent_type not in DEPENDENT_SOURCES:
+                raise ValueError(f"用例 {case.case_id} 不支持的依赖类型: {dep.dependent_type}，"
+                                 f"可选值: {'/'.join(DEPENDENT_SOURCES)}")
+
+    def close(self) -> None:
+        """释放异步客户端"""
+        self.async_client.close()
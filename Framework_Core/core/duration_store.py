@@ -0,0 +1,117 @@
+import os
+import json
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional
+from loguru import logger
+
+DEFAULT_STORE_PATH = ".pytest_durations.json"
+STORE_VERSION = 1
+
+
+class DurationStore:
+    """
+    用例耗时历史
+    以 {nodeid: 秒} 的形式保存在本地JSON文件中，多次运行的耗时做指数平滑，避免单次抖动影响排序
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, smoothing: float = 0.5):
+        """
+        :param path: 存储文件路径
+        :param smoothing: 平滑系数，越大越偏向最近一次耗时
+        """
+        self.path = path
+        self.smoothing = smoothing
+        self.durations: Dict[str, float] = {}
+        self._updates: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """读取存储文件，文件不存在或格式不正确时视为空"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == STORE_VERSION:
+                self.durations = {k: float(v) for k, v in data.get('durations', {}).items()}
+        except (OSError, ValueError, AttributeError):
+            self.durations = {}
+
+    def get(self, nodeid: str, default: Optional[float] = None) -> Optional[float]:
+        """
+        获取用例的历史耗时
+        :param nodeid: 用例nodeid
+        :param default: 无记录时的默认值
+        :return: 耗时（秒）
+        """
+        return self.durations.get(nodeid, default)
+
+    def record(self, nodeid: str, duration: float) -> None:
+        """
+        记录本次运行的耗时
+        :param nodeid: 用例nodeid
+        :param duration: 耗时（秒）
+        """
+        with self._lock:
+            self._updates[nodeid] = duration
+
+    def estimate(self, nodeids: Iterable[str]) -> List[float]:
+        """
+        估算用例耗时，无历史记录的用例按已知耗时的中位数估算
+        :param nodeids: 用例nodeid列表
+        :return: 与nodeids顺序一致的耗时列表
+        """
+        nodeids = list(nodeids)
+        known = sorted(self.durations[n] for n in nodeids if n in self.durations)
+        fallback = known[len(known) // 2] if known else 1.0
+        return [self.durations.get(n, fallback) for n in nodeids]
+
+    def save(self) -> bool:
+        """
+        合并本次运行的耗时并原子写入存储文件
+        :return: 是否保存成功
+        """
+        with self._lock:
+            updates, self._updates = self._updates, {}
+        if not updates:
+            return True
+        try:
+            # 重新读取一次，保留其他进程在本次运行期间写入的记录
+            self.load()
+            for nodeid, duration in updates.items():
+                previous = self.durations.get(nodeid)
+                if previous is None:
+                    self.durations[nodeid] = round(duration, 4)
+                else:
+                    self.durations[nodeid] = round(previous + self.smoothing * (duration - previous), 4)
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': STORE_VERSION, 'durations': self.durations}, f,
+                          ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            logger.error(f"保存用例耗时失败: {str(e)}")
+            return False
+
+
+def lpt_partition(durations: List[float], workers: int) -> List[List[int]]:
+    """
+    按最长处理时间优先（LPT）把用例分配到各worker
+    用例按耗时从长到短依次分给当前总耗时最小的worker，每个worker内部同样从长到短执行
+    :param durations: 各用例的耗时
+    :param workers: worker数量
+    :return: 每个worker分到的用例下标列表
+    """
+    workers = max(1, workers)
+    shards: List[List[int]] = [[] for _ in range(workers)]
+    heap = [(0.0, index) for index in range(workers)]
+    order = sorted(range(len(durations)), key=lambda i: (-durations[i], i))
+    for item in order:
+        load, shard = heapq.heappop(heap)
+        shards[shard].append(item)
+        heapq.heappush(heap, (load + durations[item], shard))
+    return shards
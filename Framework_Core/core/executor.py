@@ -1,7 +1,20 @@
+import os
+import importlib.util
 import pytest
 import allure
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from loguru import logger
+from Framework_Core.core.reporter import AllureReporter
+from Framework_Core.utils.logUtils.logger import setup_logging
+
+# 分发策略与pytest-xdist --dist参数的对应关系
+DIST_STRATEGIES = {
+    'module': 'loadfile',   # 同一模块的用例在同一个worker中执行
+    'class': 'loadscope',   # 同一测试类的用例在同一个worker中执行
+    'load': 'load',         # 按空闲worker逐个分发
+    'duration': 'load',     # 按历史耗时以LPT方式分配，见duration_plugin
+}
+DURATION_PLUGIN = 'Framework_Core.extensions.duration_plugin'
 
 class TestExecutor:
     def __init__(self, config: Dict[str, Any]):
@@ -9,31 +22,138 @@ class TestExecutor:
         self.setup_logging()
 
     def setup_logging(self):
-        """配置日志"""
-        logger.add("logs/test_execution.log", rotation="500 MB", level="INFO")
+        """按配置文件的logging配置初始化日志，已初始化时不会重复添加处理器"""
+        setup_logging(self.config.get('logging'))
+
+    def run(self, test_paths: List[str], markers: List[str] = None) -> bool:
+        """
+        按配置文件中的test和report配置执行测试用例
+        :param test_paths: 测试用例路径列表
+        :param markers: pytest标记列表
+        :return: 测试执行是否成功
+        """
+        allure_config = self.config.get('report', {}).get('allure', {})
+        return self.run_tests(
+            test_paths,
+            markers,
+            test_config=self.config.get('test', {}),
+            results_dir=allure_config.get('results_dir', './allure-results'),
+            clean_results=allure_config.get('clean_results', False)
+        )
 
     @staticmethod
-    def run_tests(test_paths: List[str], markers: List[str] = None) -> bool:
+    def build_args(
+        test_paths: List[str],
+        markers: List[str] = None,
+        test_config: Optional[Dict[str, Any]] = None,
+        results_dir: str = "./allure-results"
+    ) -> List[str]:
+        """
+        生成pytest命令行参数
+        :param test_paths: 测试用例路径列表
+        :param markers: pytest标记列表
+        :param test_config: 测试配置，对应config.yaml中的test节点
+        :param results_dir: Allure结果目录
+        :return: pytest参数列表
+        """
+        test_config = test_config or {}
+        args = ["-v", f"--alluredir={results_dir}"]
+
+        if markers:
+            for marker in markers:
+                args.append(f"-m {marker}")
+
+        if test_config.get('parallel'):
+            if importlib.util.find_spec('xdist') is None:
+                logger.warning("未安装pytest-xdist，测试将串行执行")
+            else:
+                strategy = test_config.get('distribution', 'load')
+                if strategy not in DIST_STRATEGIES:
+                    logger.warning(f"不支持的分发策略: {strategy}，使用load")
+                    strategy = 'load'
+                args.extend([
+                    "-n", str(test_config.get('max_workers', 'auto')),
+                    "--dist", DIST_STRATEGIES[strategy]
+                ])
+                if strategy == 'duration':
+                    # 用例不在项目根目录下执行时不会经过根目录的conftest，显式加载插件，已加载时pytest会跳过
+                    args.extend(["-p", DURATION_PLUGIN, "--duration-order"])
+
+        if test_config.get('rerun_failures'):
+            if importlib.util.find_spec('pytest_rerunfailures') is None:
+                logger.warning("未安装pytest-rerunfailures，失败用例不会重跑")
+            else:
+                args.extend(["--reruns", str(test_config.get('max_reruns', 1))])
+
+        args.extend(test_paths)
+        return args
+
+    @staticmethod
+    def run_tests(
+        test_paths: List[str],
+        markers: List[str] = None,
+        test_config: Optional[Dict[str, Any]] = None,
+        results_dir: str = "./allure-results",
+        clean_results: bool = False
+    ) -> bool:
         """
         执行测试用例
         :param test_paths: 测试用例路径列表
         :param markers: pytest标记列表
-        :return: 测试执行是否成功
+        :param test_config: 测试配置，对应config.yaml中的test节点，为空时串行执行
+        :param results_dir: Allure结果目录
+        :param clean_results: 执行前是否清理结果目录
+        :return: 测试执行是否成功，存在失败用例或开启耗时回归门禁且检测到回归时返回False
         """
         try:
-            args = ["-v", "--alluredir=./allure-results"]
-            
-            if markers:
-                for marker in markers:
-                    args.append(f"-m {marker}")
-
-            args.extend(test_paths)
-            pytest.main(args)
+            # 结果目录在启动worker前统一清理和创建，避免多个worker同时清理时互相删除结果文件
+            if clean_results:
+                AllureReporter.clean_results(results_dir)
+            os.makedirs(results_dir, exist_ok=True)
+
+            args = TestExecutor.build_args(test_paths, markers, test_config, results_dir)
+            logger.info(f"执行测试: pytest {' '.join(args)}")
+            exit_code = pytest.main(args)
+            if exit_code != pytest.ExitCode.OK:
+                logger.error(f"测试执行未通过，退出码: {int(exit_code)}")
+                return False
             return True
         except Exception as e:
             logger.error(f"测试执行失败: {str(e)}")
             return False
 
+    def run_load(
+        self,
+        cases: List[str] = None,
+        targets: List[str] = None,
+        host: Optional[str] = None,
+        **overrides
+    ) -> Optional[Dict[str, Any]]:
+        """
+        按配置文件中的load配置，以现有的YAML用例或测试函数作为场景执行负载测试
+        :param cases: YAML用例文件路径列表
+        :param targets: 测试函数路径列表，格式为 module:function
+        :param host: 接口地址，为空时使用默认环境的api_base_url
+        :param overrides: 覆盖load配置的参数，如 model='open', rate=100
+        :return: 负载测试结果，执行失败时返回None
+        """
+        try:
+            from functools import partial
+            from Framework_Core.core.load_runner import LoadRunner, load_scenarios, format_report
+
+            if host is None:
+                default_env = self.config.get('default_environment', 'dev')
+                host = self.config.get('environments', {}).get(default_env, {}).get('api_base_url', '')
+            load_config = {**(self.config.get('load') or {}), **overrides}
+            runner = LoadRunner(partial(load_scenarios, cases or [], targets or [], host), base_url=host, **load_config)
+            logger.info(f"执行负载测试: {load_config}")
+            result = runner.run()
+            logger.info("负载测试结果:\n" + format_report(result))
+            return result
+        except Exception as e:
+            logger.error(f"负载测试执行失败: {str(e)}")
+            return None
+
     @staticmethod
     @allure.step("设置测试环境")
     def setup_test_environment(env_config: Dict[str, Any]) -> None:
@@ -49,4 +169,4 @@ class TestExecutor:
     def cleanup_test_environment() -> None:
         """清理测试环境"""
         # 在这里实现环境清理逻辑
-        pass 
\ No newline at end of file
+        pass
\ No newline at end of file
@@ -0,0 +1,122 @@
+import math
+from typing import Dict, Any, Optional
+
+# 每个2的幂区间划分的桶数，记录值的相对误差不超过 1/SUB_BUCKETS
+SUB_BUCKETS = 32
+_SUB_BITS = SUB_BUCKETS.bit_length() - 1
+
+
+class LatencyHistogram:
+    """
+    对数线性分桶的耗时直方图（HDR风格）
+    以微秒为单位记录，小于SUB_BUCKETS微秒的值精确记录，更大的值按所在2的幂区间再细分为SUB_BUCKETS个桶，
+    内存只与数值范围的对数相关；可序列化后在进程之间合并
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    @staticmethod
+    def _index(micros: int) -> int:
+        if micros < SUB_BUCKETS:
+            return micros
+        shift = micros.bit_length() - 1 - _SUB_BITS
+        return (shift + 1) * SUB_BUCKETS + (micros >> shift) - SUB_BUCKETS
+
+    @staticmethod
+    def _value(index: int) -> float:
+        """桶的中间值（微秒）"""
+        if index < SUB_BUCKETS:
+            return float(index)
+        shift = index // SUB_BUCKETS - 1
+        lower = (index - shift * SUB_BUCKETS) << shift
+        return lower + ((1 << shift) - 1) / 2
+
+    def record(self, seconds: float) -> None:
+        """
+        记录一次耗时
+        :param seconds: 耗时（秒）
+        """
+        index = self._index(max(0, int(seconds * 1_000_000)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct: float) -> float:
+        """
+        计算分位数（最近秩法）
+        :param pct: 百分位，如99
+        :return: 耗时（秒），没有记录时返回0
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                # 桶的中间值可能超出实际范围，按记录的最小/最大值截断
+                return min(max(self._value(index) / 1_000_000, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        合并另一个直方图
+        :param other: 直方图
+        """
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        汇总统计
+        :return: 次数和各分位数（毫秒）
+        """
+        return {
+            'count': self.count,
+            'mean_ms': round(self.mean * 1000, 3),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p95_ms': round(self.percentile(95) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'max_ms': round((self.max or 0.0) * 1000, 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化为可JSON化的字典"""
+        return {'counts': {str(k): v for k, v in self.counts.items()}, 'count': self.count,
+                'total': self.total, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """
+        从字典还原直方图
+        :param data: to_dict的结果
+        :return: 直方图
+        """
+        histogram = cls()
+        histogram.counts = {int(k): v for k, v in data.get('counts', {}).items()}
+        histogram.count = data.get('count', 0)
+        histogram.total = data.get('total', 0.0)
+        histogram.min = data.get('min')
+        histogram.max = data.get('max')
+        return histogram
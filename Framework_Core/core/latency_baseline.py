@@ -0,0 +1,206 @@
+import os
+import json
+import math
+import time
+import statistics
+import threading
+from typing import Dict, Any, List
+from loguru import logger
+from Framework_Core.core.histogram import LatencyHistogram
+
+DEFAULT_BASELINE_PATH = ".latency_baseline.json"
+BASELINE_VERSION = 1
+METRICS = {'p50': 50, 'p90': 90, 'p95': 95, 'p99': 99}
+
+
+class LatencyBaseline:
+    """
+    接口耗时基线
+    按 (环境, 方法, 接口模板) 保存最近max_runs次运行的耗时直方图，保存在本地JSON文件中
+    """
+
+    def __init__(self, path: str = DEFAULT_BASELINE_PATH, max_runs: int = 20):
+        """
+        :param path: 存储文件路径
+        :param max_runs: 每个接口保留的运行次数
+        """
+        self.path = path
+        self.max_runs = max_runs
+        self.endpoints: Dict[str, List[Dict[str, Any]]] = {}
+        self._updates: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def key(environment: str, method: str, endpoint: str) -> str:
+        return f"{environment} {method} {endpoint}"
+
+    def load(self) -> None:
+        """读取存储文件，文件不存在或格式不正确时视为空"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == BASELINE_VERSION:
+                self.endpoints = data.get('endpoints', {})
+        except (OSError, ValueError, AttributeError):
+            self.endpoints = {}
+
+    def runs(self, key: str) -> List[Dict[str, Any]]:
+        """
+        获取接口最近的运行记录
+        :param key: key()生成的键
+        :return: 运行记录列表，从旧到新
+        """
+        return self.endpoints.get(key, [])
+
+    def record(self, key: str, histogram: LatencyHistogram) -> None:
+        """
+        记录本次运行的耗时，save时写入
+        :param key: key()生成的键
+        :param histogram: 本次运行的耗时直方图
+        """
+        with self._lock:
+            self._updates[key] = {'ts': int(time.time()), 'histogram': histogram.to_dict()}
+
+    def save(self) -> bool:
+        """
+        合并本次运行的记录并原子写入存储文件，每个接口只保留最近max_runs次
+        :return: 是否保存成功
+        """
+        with self._lock:
+            updates, self._updates = self._updates, {}
+        if not updates:
+            return True
+        try:
+            # 重新读取一次，保留其他进程在本次运行期间写入的记录
+            self.load()
+            for key, run in updates.items():
+                self.endpoints[key] = (self.endpoints.get(key, []) + [run])[-self.max_runs:]
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': BASELINE_VERSION, 'endpoints': self.endpoints}, f,
+                          ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            logger.error(f"保存接口耗时基线失败: {str(e)}")
+            return False
+
+
+def mann_whitney_p(baseline: LatencyHistogram, current: LatencyHistogram) -> float:
+    """
+    单侧Mann-Whitney U检验：本次耗时是否显著大于基线
+    直接使用直方图的桶计算秩，同一个桶内的值视为相等并做结的校正，使用正态近似
+    :param baseline: 基线耗时直方图
+    :param current: 本次耗时直方图
+    :return: p值，越小越说明本次耗时显著变大
+    """
+    n1, n2 = baseline.count, current.count
+    n = n1 + n2
+    if not n1 or not n2:
+        return 1.0
+    rank_sum = 0.0
+    ties = 0.0
+    seen = 0
+    for index in sorted(set(baseline.counts) | set(current.counts)):
+        a = baseline.counts.get(index, 0)
+        b = current.counts.get(index, 0)
+        t = a + b
+        # 同一个桶内的值取平均秩
+        rank_sum += b * (seen + (t + 1) / 2)
+        ties += t ** 3 - t
+        seen += t
+    u = rank_sum - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+class RegressionDetector:
+    """
+    接口耗时回归检测
+    同时满足以下条件时判定为回归：
+        1. 本次的耗时指标比最近各次运行指标的中位数高出threshold以上，且至少高出min_delta_ms
+        2. 本次的耗时指标高于最近每一次运行，排除单次运行之间的正常波动
+        3. 本次与基线的耗时分布做单侧Mann-Whitney U检验，p值小于alpha
+    基线运行次数少于min_runs或本次请求数少于min_samples的接口只记录不判断
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.2,
+        metric: str = 'p50',
+        alpha: float = 0.01,
+        min_runs: int = 3,
+        min_samples: int = 5,
+        min_delta_ms: float = 5.0
+    ):
+        """
+        :param threshold: 相对变化阈值，0.2表示变慢20%
+        :param metric: 比较的耗时指标 p50/p90/p95/p99
+        :param alpha: 显著性水平
+        :param min_runs: 基线至少需要的运行次数
+        :param min_samples: 本次至少需要的请求数
+        :param min_delta_ms: 至少需要的绝对变化（毫秒），避免很快的接口因微小波动被判定为回归
+        """
+        if metric not in METRICS:
+            raise ValueError(f"不支持的耗时指标: {metric}")
+        self.threshold = threshold
+        self.metric = metric
+        self.alpha = alpha
+        self.min_runs = min_runs
+        self.min_samples = min_samples
+        self.min_delta_ms = min_delta_ms
+
+    def check(self, baseline: LatencyBaseline, key: str, current: LatencyHistogram) -> Dict[str, Any]:
+        """
+        检查一个接口
+        :param baseline: 耗时基线
+        :param key: LatencyBaseline.key生成的键
+        :param current: 本次运行的耗时直方图
+        :return: 检查结果，regressed为是否回归，基线不足时为None
+        """
+        pct = METRICS[self.metric]
+        runs = [LatencyHistogram.from_dict(run['histogram']) for run in baseline.runs(key)]
+        current_ms = current.percentile(pct) * 1000
+        result = {
+            'key': key,
+            'count': current.count,
+            'baseline_runs': len(runs),
+            'metric': self.metric,
+            'current_ms': round(current_ms, 3),
+            'baseline_ms': None,
+            'change': None,
+            'p_value': None,
+            'regressed': None,
+        }
+        if len(runs) < self.min_runs or current.count < self.min_samples:
+            return result
+
+        run_values = [run.percentile(pct) * 1000 for run in runs if run.count]
+        if not run_values:
+            return result
+        baseline_ms = statistics.median(run_values)
+        merged = LatencyHistogram()
+        for run in runs:
+            merged.merge(run)
+        p_value = mann_whitney_p(merged, current)
+        change = (current_ms - baseline_ms) / baseline_ms if baseline_ms else 0.0
+        result.update(
+            baseline_ms=round(baseline_ms, 3),
+            change=round(change, 4),
+            p_value=round(p_value, 6),
+            regressed=(
+                change >= self.threshold
+                and current_ms - baseline_ms >= self.min_delta_ms
+                and current_ms > max(run_values)
+                and p_value < self.alpha
+            ),
+        )
+        return result
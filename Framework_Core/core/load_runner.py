@@ -0,0 +1,451 @@
+"""
+负载与稳定性测试
+复用YAML用例或基于APIRequest的测试函数作为场景，按固定并发（closed模型）或固定到达速率（open模型）
+持续执行指定时长，按时间窗口统计吞吐量、错误率和耗时分位数
+
+用法:
+    python -m Framework_Core.core.load_runner --cases Resources/test_data/test.yaml --model open --rate 50 --duration 60
+    python -m Framework_Core.core.load_runner --target tests.load:create_order --model closed --concurrency 20
+"""
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import importlib
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, List, Callable, Optional
+from loguru import logger
+from requests.cookies import RequestsCookieJar
+from Framework_Core.core.histogram import LatencyHistogram
+from Framework_Core.utils.requestUtils.api_plugin import APIRequest
+from Framework_Core.utils.requestUtils.async_api_plugin import AsyncAPIRequest
+from Framework_Core.utils.requestUtils.attachment_policy import AttachmentPolicy
+
+MODELS = ('closed', 'open')
+ARRIVALS = ('constant', 'poisson')
+# 负载测试中不记录Allure附件
+_NO_ATTACHMENTS = AttachmentPolicy(mode='never')
+
+
+class LoadScenario:
+    """
+    负载场景：一次可重复执行的操作
+    action为协程函数，参数为异步客户端，返回响应状态码；抛出异常（包括断言失败）或状态码>=500记为错误
+    """
+
+    def __init__(self, name: str, action: Callable[[AsyncAPIRequest], Any], weight: int = 1,
+                 session: Optional[APIRequest] = None):
+        """
+        :param name: 场景名称
+        :param action: 协程函数
+        :param weight: 权重，按权重轮流选择场景
+        :param session: 准备场景时使用的同步客户端，开始前把它的会话请求头和Cookie复制到异步客户端
+        """
+        self.name = name
+        self.action = action
+        self.weight = max(1, int(weight))
+        self.session = session
+
+
+def yaml_scenarios(yaml_path: str, host: str = "") -> List[LoadScenario]:
+    """
+    把YAML用例文件中的用例转换为场景
+    依赖的上游用例在加载时执行一次，提取的数据以及登录等步骤设置的Cookie在之后的每次请求中复用
+    :param yaml_path: YAML用例文件路径
+    :param host: ${{host()}} 的取值
+    :return: 场景列表
+    """
+    from Framework_Core.core.case_runner import YamlCaseRunner
+    from Framework_Core.utils.fileUtils.case_model import load_case_file
+
+    case_file = load_case_file(yaml_path)
+    runner = YamlCaseRunner(APIRequest(attachment_policy=_NO_ATTACHMENTS), functions={'host': lambda: host})
+    scenarios = []
+    for case in case_file.cases.values():
+        if not case.is_run:
+            continue
+        if case.dependencies:
+            runner.dependencies.resolve(case_file, case)
+
+        async def action(client: AsyncAPIRequest, case=case) -> int:
+            response = await client.send(**runner.build_request(case))
+            runner.check_assertions(case, response)
+            return response.status_code
+
+        scenarios.append(LoadScenario(case.case_id, action, session=runner.api_client))
+    return scenarios
+
+
+def callable_scenario(target: str, base_url: str = "", weight: int = 1) -> LoadScenario:
+    """
+    把测试函数转换为场景
+    协程函数的参数为AsyncAPIRequest；普通函数的参数为APIRequest，在线程池中执行，每个线程使用各自的客户端
+    :param target: 函数路径，格式为 module:function
+    :param base_url: 客户端的基础URL
+    :param weight: 权重
+    :return: 场景
+    """
+    module_name, _, func_name = target.partition(':')
+    func = getattr(importlib.import_module(module_name), func_name)
+    if asyncio.iscoroutinefunction(func):
+        return LoadScenario(target, func, weight)
+
+    local = threading.local()
+
+    def call() -> Any:
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = APIRequest(base_url, attachment_policy=_NO_ATTACHMENTS)
+        response = func(client)
+        return getattr(response, 'status_code', None)
+
+    async def action(client: AsyncAPIRequest) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, call)
+
+    return LoadScenario(target, action, weight)
+
+
+def load_scenarios(cases: List[str], targets: List[str], host: str = "") -> List[LoadScenario]:
+    """
+    加载YAML用例和测试函数作为场景，多进程执行时在每个进程中调用
+    :param cases: YAML用例文件路径列表
+    :param targets: 测试函数路径列表
+    :param host: 接口地址
+    :return: 场景列表
+    """
+    scenarios = []
+    for path in cases:
+        scenarios.extend(yaml_scenarios(path, host))
+    scenarios.extend(callable_scenario(target, host) for target in targets)
+    return scenarios
+
+
+class _LoadStats:
+    """按时间窗口和场景汇总的执行结果"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.windows: Dict[int, Dict[str, Any]] = {}
+        self.scenarios: Dict[str, Dict[str, Any]] = {}
+        self.dropped = 0
+
+    def record(self, name: str, offset: float, latency: float, error: bool) -> None:
+        window = self.windows.get(int(offset // self.interval))
+        if window is None:
+            window = self.windows[int(offset // self.interval)] = {'count': 0, 'errors': 0, 'histogram': LatencyHistogram()}
+        scenario = self.scenarios.get(name)
+        if scenario is None:
+            scenario = self.scenarios[name] = {'count': 0, 'errors': 0, 'histogram': LatencyHistogram()}
+        for bucket in (window, scenario):
+            bucket['count'] += 1
+            bucket['errors'] += error
+            bucket['histogram'].record(latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化，用于从子进程返回"""
+        def dump(buckets):
+            return {k: {'count': v['count'], 'errors': v['errors'], 'histogram': v['histogram'].to_dict()}
+                    for k, v in buckets.items()}
+        return {'windows': dump(self.windows), 'scenarios': dump(self.scenarios), 'dropped': self.dropped}
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """合并其他进程的结果"""
+        for target, source in ((self.windows, data['windows']), (self.scenarios, data['scenarios'])):
+            for key, value in source.items():
+                bucket = target.setdefault(key, {'count': 0, 'errors': 0, 'histogram': LatencyHistogram()})
+                bucket['count'] += value['count']
+                bucket['errors'] += value['errors']
+                bucket['histogram'].merge(LatencyHistogram.from_dict(value['histogram']))
+        self.dropped += data['dropped']
+
+
+class LoadRunner:
+    """
+    负载执行器
+    closed模型: concurrency个虚拟用户循环执行场景，一个场景结束后立即开始下一个
+    open模型: 按rate（次/秒）发起场景，不等待之前的场景结束；耗时从计划发起时间算起，
+              客户端来不及发起时的排队时间也计入耗时，避免协调遗漏（coordinated omission）；
+              进行中的场景超过max_in_flight时丢弃新的场景并计数
+    """
+
+    def __init__(
+        self,
+        scenario_factory: Callable[[], List[LoadScenario]],
+        model: str = 'closed',
+        concurrency: int = 10,
+        rate: float = 10.0,
+        duration: float = 60.0,
+        ramp_up: float = 0.0,
+        arrival: str = 'constant',
+        max_in_flight: int = 1000,
+        think_time: float = 0.0,
+        interval: float = 1.0,
+        processes: int = 1,
+        base_url: str = ""
+    ):
+        """
+        :param scenario_factory: 返回场景列表的函数，多进程执行时需要可序列化，如functools.partial(load_scenarios, ...)
+        :param model: closed/open
+        :param concurrency: closed模型的虚拟用户数
+        :param rate: open模型每秒发起的场景数
+        :param duration: 持续时间（秒）
+        :param ramp_up: 预热时间（秒），期间并发数或速率从0线性增加
+        :param arrival: open模型的到达间隔分布 constant/poisson
+        :param max_in_flight: open模型最多同时进行的场景数
+        :param think_time: closed模型中两次场景之间的等待时间（秒）
+        :param interval: 统计时间窗口（秒）
+        :param processes: 进程数，并发数和速率平均分配到各进程
+        :param base_url: 异步客户端的基础URL
+        """
+        if model not in MODELS:
+            raise ValueError(f"不支持的负载模型: {model}")
+        if arrival not in ARRIVALS:
+            raise ValueError(f"不支持的到达分布: {arrival}")
+        self.scenario_factory = scenario_factory
+        self.model = model
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.arrival = arrival
+        self.max_in_flight = max_in_flight
+        self.think_time = think_time
+        self.interval = interval
+        self.processes = max(1, processes)
+        self.base_url = base_url
+
+    def run(self) -> Dict[str, Any]:
+        """
+        执行负载测试
+        :return: 结果，包含按时间窗口的序列、按场景的汇总和总体汇总
+        """
+        # 各进程按同一个墙钟时间开始，时间窗口可以直接合并
+        start_at = time.time() + (1.0 if self.processes > 1 else 0.05)
+        stats = _LoadStats(self.interval)
+        if self.processes == 1:
+            stats.merge(self._run_process(0, start_at))
+        else:
+            with ProcessPoolExecutor(self.processes) as pool:
+                for data in pool.map(partial(self._run_process, start_at=start_at), range(self.processes)):
+                    stats.merge(data)
+        return self._report(stats)
+
+    def _run_process(self, index: int, start_at: float) -> Dict[str, Any]:
+        """在当前进程中执行分配到的负载"""
+        scenarios = self.scenario_factory()
+        if not scenarios:
+            raise ValueError("没有可执行的负载场景")
+        # 并发数和速率平均分配到各进程，余数分给前面的进程
+        concurrency = self.concurrency // self.processes + (index < self.concurrency % self.processes)
+        rate = self.rate / self.processes
+        stats = _LoadStats(self.interval)
+        asyncio.run(self._run_async(scenarios, concurrency, rate, start_at, stats))
+        return stats.to_dict()
+
+    async def _run_async(self, scenarios: List[LoadScenario], concurrency: int, rate: float,
+                         start_at: float, stats: _LoadStats) -> None:
+        loop = asyncio.get_running_loop()
+        # 线程池用于执行同步的测试函数
+        loop.set_default_executor(ThreadPoolExecutor(max(concurrency, min(self.max_in_flight, 256))))
+        pool_size = concurrency if self.model == 'closed' else self.max_in_flight
+        client = AsyncAPIRequest(self.base_url, pool_size=pool_size, per_host_limit=pool_size,
+                                 attachment_policy=_NO_ATTACHMENTS)
+        self._load_sessions(client, scenarios)
+        weighted = [scenario for scenario in scenarios for _ in range(scenario.weight)]
+        start = loop.time() + max(0.0, start_at - time.time())
+        deadline = start + self.duration
+        await asyncio.sleep(max(0.0, start - loop.time()))
+        try:
+            if self.model == 'closed':
+                await asyncio.gather(*(
+                    self._virtual_user(client, weighted, i, concurrency, start, deadline, stats)
+                    for i in range(concurrency)
+                ))
+            else:
+                await self._open_arrivals(client, weighted, rate, start, deadline, stats)
+        finally:
+            await client.aclose()
+
+    @staticmethod
+    def _load_sessions(client: AsyncAPIRequest, scenarios: List[LoadScenario]) -> None:
+        """把各场景同步客户端的会话请求头和Cookie复制到异步客户端"""
+        cookies = RequestsCookieJar()
+        sessions = {id(scenario.session): scenario.session for scenario in scenarios if scenario.session is not None}
+        for session in sessions.values():
+            client.set_headers(dict(session.session.headers))
+            cookies.update(session.session.cookies)
+        client.set_cookies(cookies)
+
+    async def _execute(self, client: AsyncAPIRequest, scenario: LoadScenario, scheduled: float,
+                       start: float, stats: _LoadStats) -> None:
+        loop = asyncio.get_running_loop()
+        error = False
+        try:
+            status = await scenario.action(client)
+            error = status is not None and status >= 500
+        except Exception as e:
+            error = True
+            logger.debug("负载场景失败: {} {}", scenario.name, e)
+        finished = loop.time()
+        stats.record(scenario.name, finished - start, finished - scheduled, error)
+
+    async def _virtual_user(self, client: AsyncAPIRequest, scenarios: List[LoadScenario], index: int,
+                            concurrency: int, start: float, deadline: float, stats: _LoadStats) -> None:
+        loop = asyncio.get_running_loop()
+        if self.ramp_up and concurrency:
+            # 预热期间虚拟用户依次启动
+            await asyncio.sleep(self.ramp_up * index / concurrency)
+        order = itertools.islice(itertools.cycle(scenarios), index % len(scenarios), None)
+        for scenario in order:
+            now = loop.time()
+            if now >= deadline:
+                return
+            await self._execute(client, scenario, now, start, stats)
+            if self.think_time:
+                await asyncio.sleep(self.think_time)
+
+    def _arrival_offset(self, arrivals: float, rate: float) -> float:
+        """
+        第arrivals个场景的计划发起时间（相对开始时间，秒）
+        预热期间速率从0线性增加，累计到达数为 rate*t²/(2*ramp_up)，按其反函数计算
+        """
+        ramp_arrivals = rate * self.ramp_up / 2
+        if arrivals < ramp_arrivals:
+            return math.sqrt(2 * self.ramp_up * arrivals / rate)
+        return self.ramp_up + (arrivals - ramp_arrivals) / rate
+
+    async def _open_arrivals(self, client: AsyncAPIRequest, scenarios: List[LoadScenario], rate: float,
+                             start: float, deadline: float, stats: _LoadStats) -> None:
+        loop = asyncio.get_running_loop()
+        in_flight = set()
+        order = itertools.cycle(scenarios)
+        # 累计到达数，poisson分布时按单位速率的指数分布累加，再换算为时间
+        arrivals = 0.0
+        scheduled = start
+        while scheduled < deadline and rate > 0:
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            scenario = next(order)
+            if len(in_flight) >= self.max_in_flight:
+                stats.dropped += 1
+            else:
+                task = asyncio.create_task(self._execute(client, scenario, scheduled, start, stats))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            arrivals += random.expovariate(1.0) if self.arrival == 'poisson' else 1.0
+            scheduled = start + self._arrival_offset(arrivals, rate)
+        if in_flight:
+            await asyncio.wait(in_flight)
+
+    def _report(self, stats: _LoadStats) -> Dict[str, Any]:
+        def summarize(bucket: Dict[str, Any], seconds: float) -> Dict[str, Any]:
+            count = bucket['count']
+            return {
+                'requests': count,
+                'throughput': round(count / seconds, 2) if seconds else 0.0,
+                'errors': bucket['errors'],
+                'error_rate': round(bucket['errors'] / count, 4) if count else 0.0,
+                **{k: v for k, v in bucket['histogram'].summary().items() if k != 'count'},
+            }
+
+        total = {'count': 0, 'errors': 0, 'histogram': LatencyHistogram()}
+        for bucket in stats.scenarios.values():
+            total['count'] += bucket['count']
+            total['errors'] += bucket['errors']
+            total['histogram'].merge(bucket['histogram'])
+        return {
+            'model': self.model,
+            'duration': self.duration,
+            'processes': self.processes,
+            'dropped': stats.dropped,
+            'total': summarize(total, self.duration),
+            'scenarios': {name: summarize(bucket, self.duration) for name, bucket in sorted(stats.scenarios.items())},
+            'series': [
+                {'t': round(index * self.interval, 3), **summarize(stats.windows[index], self.interval)}
+                for index in sorted(stats.windows)
+            ],
+        }
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """
+    格式化负载测试结果
+    :param result: LoadRunner.run的结果
+    :return: 文本表格
+    """
+    def table(header, rows):
+        rows = [header] + rows
+        widths = [max(len(str(row[i])) for row in rows) + 2 for i in range(len(header))]
+        return ["".join(str(value).ljust(width) for value, width in zip(row, widths)) for row in rows]
+
+    def columns(item):
+        return [item['requests'], item['throughput'], f"{item['error_rate']:.2%}",
+                item['p50_ms'], item['p95_ms'], item['p99_ms'], item['max_ms']]
+
+    metrics = ('请求数', '吞吐量/s', '错误率', 'p50ms', 'p95ms', 'p99ms', 'maxms')
+    lines = table(('时间s',) + metrics, [[row['t']] + columns(row) for row in result['series']])
+    lines.append("")
+    scenario_rows = [[name] + columns(item) for name, item in result['scenarios'].items()]
+    lines.extend(table(('场景',) + metrics, scenario_rows + [['合计'] + columns(result['total'])]))
+    if result['dropped']:
+        lines.append(f"客户端来不及发起而丢弃的场景: {result['dropped']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='负载与稳定性测试')
+    parser.add_argument('--cases', action='append', default=[], help='YAML用例文件，可重复指定')
+    parser.add_argument('--target', action='append', default=[], help='测试函数 module:function，可重复指定')
+    parser.add_argument('--host', default=None, help='接口地址，默认使用配置文件中默认环境的api_base_url')
+    parser.add_argument('--model', choices=MODELS, default='closed', help='closed: 固定并发；open: 固定到达速率')
+    parser.add_argument('--concurrency', type=int, default=10, help='closed模型的虚拟用户数')
+    parser.add_argument('--rate', type=float, default=10.0, help='open模型每秒发起的场景数')
+    parser.add_argument('--duration', type=float, default=60.0, help='持续时间（秒）')
+    parser.add_argument('--ramp-up', type=float, default=0.0, help='预热时间（秒）')
+    parser.add_argument('--arrival', choices=ARRIVALS, default='constant', help='open模型的到达间隔分布')
+    parser.add_argument('--max-in-flight', type=int, default=1000, help='open模型最多同时进行的场景数')
+    parser.add_argument('--think-time', type=float, default=0.0, help='closed模型两次场景之间的等待时间（秒）')
+    parser.add_argument('--interval', type=float, default=1.0, help='统计时间窗口（秒）')
+    parser.add_argument('--processes', type=int, default=1, help='进程数')
+    parser.add_argument('--json', help='将结果写入JSON文件')
+    args = parser.parse_args()
+    if not args.cases and not args.target:
+        parser.error("需要至少指定一个 --cases 或 --target")
+
+    host = args.host
+    if host is None:
+        from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
+        host = ConfigLoader().get_environment_config().get('api_base_url', '')
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    runner = LoadRunner(
+        partial(load_scenarios, args.cases, args.target, host),
+        model=args.model,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        arrival=args.arrival,
+        max_in_flight=args.max_in_flight,
+        think_time=args.think_time,
+        interval=args.interval,
+        processes=args.processes,
+        base_url=host
+    )
+    result = runner.run()
+    print(format_report(result))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+"""
+执行进度实时汇总
+在主进程中汇总用例结果、进行中的用例和各接口的请求耗时，定期写入JSON Lines文件，
+并可通过本地HTTP服务查看（/ 页面、/progress JSON、/events SSE推送）
+"""
+import os
+import json
+import time
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Callable, Optional
+from loguru import logger
+from Framework_Core.core.histogram import LatencyHistogram
+
+# 快照中列出的进行中用例数和接口数
+IN_FLIGHT_ROWS = 5
+ENDPOINT_ROWS = 10
+
+
+class LiveProgress:
+    """
+    执行进度，线程安全
+    用例结果来自pytest_runtest_logreport，进行中的用例来自logstart/logfinish，
+    请求耗时来自各用例报告中附带的请求记录，pytest-xdist并行时这些钩子都在主进程中触发
+    """
+
+    def __init__(self, window: float = 60.0):
+        """
+        :param window: 计算近期吞吐量和错误率的时间窗口（秒）
+        """
+        self.window = window
+        self.started = time.time()
+        self.total: Optional[int] = None
+        self.completed = 0
+        self.outcomes: Dict[str, int] = {}
+        self.in_flight: Dict[str, float] = {}
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        self.request_errors = 0
+        self.finished = False
+        self.aborted: Optional[str] = None
+        self._recent_tests = deque()
+        self._recent_requests = deque()
+        self._lock = threading.Lock()
+
+    def set_total(self, total: int) -> None:
+        with self._lock:
+            self.total = total
+
+    def test_started(self, nodeid: str) -> None:
+        with self._lock:
+            self.in_flight[nodeid] = time.time()
+
+    def test_finished(self, nodeid: str) -> None:
+        with self._lock:
+            self.in_flight.pop(nodeid, None)
+
+    def add_report(self, report) -> None:
+        """
+        记录用例报告，按pytest的方式计数: setup/teardown失败记为error，setup跳过记为skipped
+        :param report: TestReport
+        """
+        if report.when == 'call' or (report.when == 'setup' and report.skipped):
+            outcome = report.outcome
+        elif report.failed:
+            outcome = 'error'
+        else:
+            outcome = None
+        now = time.time()
+        with self._lock:
+            if outcome is not None:
+                self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            if report.when == 'teardown':
+                self.completed += 1
+                self._recent_tests.append(now)
+            for key, latency_ms, error in getattr(report, 'api_requests', None) or []:
+                self._add_request(key, latency_ms, error, now)
+
+    def _add_request(self, key: str, latency_ms: float, error: bool, now: float) -> None:
+        """记录一个请求，调用方需持有锁"""
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            endpoint = self.endpoints[key] = {'errors': 0, 'histogram': LatencyHistogram()}
+        endpoint['histogram'].record(latency_ms / 1000)
+        endpoint['errors'] += error
+        self.requests += 1
+        self.request_errors += error
+        self._recent_requests.append((now, latency_ms / 1000, error))
+
+    def _trim(self, now: float) -> None:
+        """丢弃时间窗口之外的近期记录，调用方需持有锁"""
+        while self._recent_tests and self._recent_tests[0] < now - self.window:
+            self._recent_tests.popleft()
+        while self._recent_requests and self._recent_requests[0][0] < now - self.window:
+            self._recent_requests.popleft()
+
+    def recent_error_rate(self, min_requests: int = 1) -> Optional[float]:
+        """
+        近期请求的错误率
+        :param min_requests: 近期请求数少于该值时返回None
+        :return: 错误率
+        """
+        with self._lock:
+            self._trim(time.time())
+            count = len(self._recent_requests)
+            if count < max(1, min_requests):
+                return None
+            return sum(error for _, _, error in self._recent_requests) / count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        当前进度
+        :return: 用例计数、吞吐量、进行中最久的用例、近期请求和各接口的耗时统计
+        """
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            elapsed = now - self.started
+            recent = LatencyHistogram()
+            for _, latency, _ in self._recent_requests:
+                recent.record(latency)
+            recent_errors = sum(error for _, _, error in self._recent_requests)
+            window = min(self.window, elapsed) or 1.0
+            recent_rate = len(self._recent_tests) / window
+            remaining = self.total - self.completed if self.total is not None else None
+            endpoints = []
+            for key, endpoint in self.endpoints.items():
+                method, _, path = key.partition(' ')
+                endpoints.append({'method': method, 'endpoint': path, 'errors': endpoint['errors'],
+                                  **endpoint['histogram'].summary()})
+            endpoints.sort(key=lambda row: row['p95_ms'], reverse=True)
+            in_flight = sorted(self.in_flight.items(), key=lambda item: item[1])[:IN_FLIGHT_ROWS]
+            return {
+                'ts': round(now, 3),
+                'elapsed_s': round(elapsed, 1),
+                'total': self.total,
+                'completed': self.completed,
+                'outcomes': dict(self.outcomes),
+                'throughput': round(self.completed / elapsed, 2) if elapsed else 0.0,
+                'recent_throughput': round(recent_rate, 2),
+                'eta_s': round(remaining / recent_rate, 1) if remaining and recent_rate else None,
+                'in_flight': len(self.in_flight),
+                'slowest_in_flight': [{'nodeid': nodeid, 'running_s': round(now - start, 1)} for nodeid, start in in_flight],
+                'requests': {
+                    'count': self.requests,
+                    'errors': self.request_errors,
+                    'recent_count': len(self._recent_requests),
+                    'recent_error_rate': round(recent_errors / len(self._recent_requests), 4) if self._recent_requests else 0.0,
+                    'recent_p95_ms': round(recent.percentile(95) * 1000, 3),
+                },
+                'endpoints': endpoints[:ENDPOINT_ROWS],
+                'finished': self.finished,
+                'aborted': self.aborted,
+            }
+
+
+class ProgressFeed:
+    """
+    按固定间隔把进度快照追加到JSON Lines文件，可用 tail -f 查看；
+    同时检查近期请求错误率，超过阈值时调用abort中止执行
+    """
+
+    def __init__(
+        self,
+        progress: LiveProgress,
+        path: Optional[str] = None,
+        interval: float = 2.0,
+        abort: Optional[Callable[[str], None]] = None,
+        abort_error_rate: float = 0.0,
+        abort_min_requests: int = 50
+    ):
+        """
+        :param progress: 执行进度
+        :param path: JSON Lines文件路径，为空时不写文件
+        :param interval: 写入间隔（秒）
+        :param abort: 中止执行的函数，参数为原因
+        :param abort_error_rate: 近期请求错误率达到该值时中止执行，0表示不中止
+        :param abort_min_requests: 近期请求数达到该值后才检查错误率
+        """
+        self.progress = progress
+        self.path = path
+        self.interval = interval
+        self.abort = abort
+        self.abort_error_rate = abort_error_rate
+        self.abort_min_requests = abort_min_requests
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 每次执行重新开始
+            open(self.path, 'w', encoding='utf-8').close()
+        self._thread = threading.Thread(target=self._run, name="progress-feed", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.tick()
+
+    def tick(self) -> None:
+        """检查中止条件并写入一次快照"""
+        if self.abort_error_rate and self.abort and self.progress.aborted is None:
+            rate = self.progress.recent_error_rate(self.abort_min_requests)
+            if rate is not None and rate >= self.abort_error_rate:
+                self.abort(f"近期请求错误率 {rate:.1%} 超过阈值 {self.abort_error_rate:.1%}")
+        if self.path:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(self.progress.snapshot(), ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning(f"写入执行进度失败: {str(e)}")
+                self.path = None
+
+    def stop(self) -> None:
+        """停止定时写入，并写入最后一次快照"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.tick()
+
+
+_PAGE = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>执行进度</title>
+<style>body{font-family:-apple-system,"Segoe UI","Microsoft YaHei",sans-serif;margin:24px}
+table{border-collapse:collapse;margin:8px 0 20px}th,td{border:1px solid #ddd;padding:3px 10px;text-align:left}
+th{background:#f5f5f5}.bad{color:#c62828}</style></head><body>
+<h1>执行进度 <button onclick="fetch('/abort',{method:'POST'})">中止执行</button></h1>
+<div id="summary"></div><h2>进行中最久的用例</h2><table id="flight"></table><h2>接口耗时（按p95排序）</h2><table id="endpoints"></table>
+<script>
+function rows(el, header, data){document.getElementById(el).innerHTML='<tr>'+header.map(h=>'<th>'+h+'</th>').join('')+'</tr>'+
+  data.map(r=>'<tr>'+r.map(v=>'<td>'+String(v).replace(/</g,'&lt;')+'</td>').join('')+'</tr>').join('');}
+const source = new EventSource('/events');
+source.onmessage = function(event){
+  const p = JSON.parse(event.data), r = p.requests;
+  document.getElementById('summary').innerHTML = '<p>已完成 '+p.completed+(p.total!==null?' / '+p.total:'')+'，用时 '+p.elapsed_s+'s'+
+    (p.eta_s!==null?'，预计剩余 '+p.eta_s+'s':'')+'，吞吐量 '+p.throughput+'/s（近期 '+p.recent_throughput+'/s）</p><p>'+
+    Object.entries(p.outcomes).map(([k,v])=>k+': '+v).join('，')+'</p><p'+(r.recent_error_rate>0.1?' class="bad"':'')+'>请求 '+r.count+
+    '，错误 '+r.errors+'，近期错误率 '+(r.recent_error_rate*100).toFixed(1)+'%，近期p95 '+r.recent_p95_ms+'ms</p>'+
+    (p.aborted?'<p class="bad">已中止: '+p.aborted+'</p>':'')+(p.finished?'<p>执行结束</p>':'');
+  rows('flight', ['用例','已执行(s)'], p.slowest_in_flight.map(t=>[t.nodeid,t.running_s]));
+  rows('endpoints', ['接口','次数','错误','p50ms','p95ms','p99ms','maxms'],
+       p.endpoints.map(e=>[e.method+' '+e.endpoint,e.count,e.errors,e.p50_ms,e.p95_ms,e.p99_ms,e.max_ms]));
+  if (p.finished) source.close();
+};
+</script></body></html>"""
+
+
+class ProgressServer:
+    """
+    本地进度服务
+        GET  /         进度页面
+        GET  /progress 当前进度JSON
+        GET  /events   SSE，每隔interval秒推送一次进度
+        POST /abort    中止执行
+    """
+
+    def __init__(self, progress: LiveProgress, port: int = 0, host: str = "127.0.0.1", interval: float = 2.0,
+                 abort: Optional[Callable[[str], None]] = None):
+        """
+        :param progress: 执行进度
+        :param port: 端口，0表示随机端口
+        :param host: 监听地址，默认只允许本机访问
+        :param interval: SSE推送间隔（秒）
+        :param abort: 中止执行的函数，为空时不提供中止接口
+        """
+        self.progress = progress
+        self.interval = interval
+        self.abort = abort
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        # 关闭时等待SSE连接推送完最后一次进度
+        self.server.daemon_threads = False
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # 客户端不再读取时，写入超时后结束连接
+            timeout = 10
+
+            def do_GET(self):
+                if self.path == '/':
+                    self._send(200, 'text/html; charset=utf-8', _PAGE.encode('utf-8'))
+                elif self.path == '/progress':
+                    self._send(200, 'application/json', json.dumps(server.progress.snapshot(), ensure_ascii=False).encode('utf-8'))
+                elif self.path == '/events':
+                    self._events()
+                else:
+                    self._send(404, 'text/plain', b'not found')
+
+            def do_POST(self):
+                if self.path == '/abort' and server.abort is not None:
+                    server.abort("通过进度页面中止")
+                    self._send(202, 'text/plain', b'aborting')
+                else:
+                    self._send(404, 'text/plain', b'not found')
+
+            def _send(self, status: int, content_type: str, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _events(self) -> None:
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                try:
+                    while True:
+                        snapshot = server.progress.snapshot()
+                        self.wfile.write(f"data: {json.dumps(snapshot, ensure_ascii=False)}\n\n".encode('utf-8'))
+                        self.wfile.flush()
+                        if snapshot['finished'] or server._stopping.is_set():
+                            return
+                        server._stopping.wait(server.interval)
+                except OSError:
+                    return
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.server.serve_forever, name="progress-server", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self.server.shutdown()
+        self.server.server_close()
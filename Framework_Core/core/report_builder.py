@@ -0,0 +1,305 @@
+"""
+测试报告生成
+直接读取allure-results中的结果文件和分段文件，生成静态的HTML和JSON汇总报告，不依赖Allure命令行和Java
+
+用法:
+    python -m Framework_Core.core.report_builder --results ./allure-results --report ./allure-report
+    python -m Framework_Core.core.report_builder --results ./allure-results --report ./allure-report --incremental
+"""
+import os
+import json
+import html
+import time
+import heapq
+import shutil
+import argparse
+from typing import Dict, Any, List
+from loguru import logger
+from Framework_Core.core.result_store import SegmentReader, list_segments
+
+STATUSES = ('passed', 'failed', 'broken', 'skipped', 'unknown')
+STATE_FILE = '.report_state.json'
+STATE_VERSION = 1
+# 报告中列出详情的失败用例数和最慢用例数
+MAX_FAILURES = 200
+SLOWEST = 20
+# 失败信息的最大长度
+MAX_MESSAGE = 2000
+
+
+class ReportBuilder:
+    """
+    流式报告生成器
+    逐个读取结果文件，每个用例只保留名称、套件、状态、耗时等汇总字段，失败用例额外保留失败信息和附件，
+    内存占用与用例数有关，与步骤和附件的大小无关；重跑的用例按historyId只保留最后一次结果
+    处理过的文件记录在报告目录的状态文件中，增量模式下只处理新的结果
+    """
+
+    def __init__(self, results_dir: str = "./allure-results", report_dir: str = "./allure-report"):
+        """
+        :param results_dir: Allure结果目录
+        :param report_dir: 报告目录
+        """
+        self.results_dir = results_dir
+        self.report_dir = report_dir
+        self.attachment_dir = os.path.join(report_dir, 'attachments')
+        self.state_path = os.path.join(report_dir, STATE_FILE)
+        self.tests: Dict[str, Dict[str, Any]] = {}
+        self.seen_files = set()
+        self.seen_segments: Dict[str, List[int]] = {}
+
+    def build(self, incremental: bool = False) -> Dict[str, Any]:
+        """
+        生成报告
+        :param incremental: 是否增量生成，只处理上次生成后新增的结果
+        :return: 汇总数据
+        """
+        if incremental:
+            self._load_state()
+        else:
+            self.clean()
+        os.makedirs(self.report_dir, exist_ok=True)
+
+        processed = self._read_files() + self._read_segments()
+        summary = self.summarize()
+        with open(os.path.join(self.report_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        with open(os.path.join(self.report_dir, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(render_html(summary))
+        self._save_state()
+        logger.info(f"报告已生成到: {self.report_dir}，本次处理 {processed} 个结果，共 {summary['total']} 个用例")
+        return summary
+
+    def clean(self) -> None:
+        """删除报告目录中之前生成的报告文件和状态"""
+        shutil.rmtree(self.attachment_dir, ignore_errors=True)
+        for name in ('summary.json', 'index.html', STATE_FILE):
+            path = os.path.join(self.report_dir, name)
+            if os.path.exists(path):
+                os.unlink(path)
+        self.tests = {}
+        self.seen_files = set()
+        self.seen_segments = {}
+
+    def _load_state(self) -> None:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get('version') != STATE_VERSION or state.get('results_dir') != os.path.abspath(self.results_dir):
+            return
+        self.tests = state.get('tests', {})
+        self.seen_files = set(state.get('files', []))
+        self.seen_segments = state.get('segments', {})
+
+    def _save_state(self) -> None:
+        state = {
+            'version': STATE_VERSION,
+            'results_dir': os.path.abspath(self.results_dir),
+            'files': sorted(self.seen_files),
+            'segments': self.seen_segments,
+            'tests': self.tests,
+        }
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    def _read_files(self) -> int:
+        """读取结果目录中的 *-result.json 文件"""
+        if not os.path.isdir(self.results_dir):
+            logger.warning(f"结果目录不存在: {self.results_dir}")
+            return 0
+        count = 0
+        with os.scandir(self.results_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('-result.json') or entry.name in self.seen_files:
+                    continue
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        result = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"读取结果文件失败: {entry.name} {str(e)}")
+                    continue
+                self._add(result, self._copy_file_attachment)
+                self.seen_files.add(entry.name)
+                count += 1
+        return count
+
+    def _read_segments(self) -> int:
+        """读取结果分段文件，已处理过的记录直接跳过"""
+        count = 0
+        for path in list_segments(self.results_dir):
+            name = os.path.basename(path)
+            size = os.path.getsize(path)
+            seen_size, seen_records = self.seen_segments.get(name, (0, 0))
+            if size == seen_size:
+                continue
+            try:
+                with SegmentReader(path) as reader:
+                    copy = lambda source: self._copy_segment_attachment(reader, source)
+                    for _, _, data in reader.records(seen_records, kind='result'):
+                        self._add(json.loads(data), copy)
+                        count += 1
+                    self.seen_segments[name] = [size, len(reader.entries)]
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取结果分段文件失败: {name} {str(e)}")
+        return count
+
+    def _add(self, result: Dict[str, Any], copy_attachment) -> None:
+        """把一个结果归并为用例的汇总字段"""
+        key = result.get('historyId') or result.get('uuid')
+        start = result.get('start') or 0
+        stop = result.get('stop') or start
+        previous = self.tests.get(key)
+        if previous is not None and previous['stop'] > stop:
+            # 先读到了重跑后的结果
+            previous['retries'] += 1
+            return
+        labels = {label.get('name'): label.get('value') for label in result.get('labels', [])}
+        status = result.get('status') or 'unknown'
+        test = {
+            'name': result.get('name'),
+            'full_name': result.get('fullName'),
+            'suite': " / ".join(labels[name] for name in ('parentSuite', 'suite', 'subSuite') if labels.get(name)) or '未分组',
+            'status': status if status in STATUSES else 'unknown',
+            'start': start,
+            'stop': stop,
+            'duration_ms': stop - start,
+            'retries': previous['retries'] + 1 if previous is not None else 0,
+        }
+        if test['status'] in ('failed', 'broken'):
+            message = (result.get('statusDetails') or {}).get('message') or ''
+            test['message'] = message[:MAX_MESSAGE]
+            test['attachments'] = [
+                {'name': attachment.get('name'), 'path': copy_attachment(attachment['source'])}
+                for attachment in _attachments(result) if attachment.get('source')
+            ]
+        self.tests[key] = test
+
+    def _copy_file_attachment(self, source: str) -> str:
+        os.makedirs(self.attachment_dir, exist_ok=True)
+        try:
+            shutil.copyfile(os.path.join(self.results_dir, source), os.path.join(self.attachment_dir, source))
+        except OSError as e:
+            logger.warning(f"复制附件失败: {source} {str(e)}")
+        return f"attachments/{source}"
+
+    def _copy_segment_attachment(self, reader: SegmentReader, source: str) -> str:
+        os.makedirs(self.attachment_dir, exist_ok=True)
+        data = reader.read(source)
+        if data is None:
+            logger.warning(f"分段文件中没有附件: {source}")
+        else:
+            with open(os.path.join(self.attachment_dir, source), 'wb') as f:
+                f.write(data)
+        return f"attachments/{source}"
+
+    def summarize(self) -> Dict[str, Any]:
+        """
+        汇总所有用例
+        :return: 总数、各状态数、按套件的统计、失败用例和最慢用例
+        """
+        statuses = dict.fromkeys(STATUSES, 0)
+        suites: Dict[str, Dict[str, Any]] = {}
+        failures = []
+        failure_count = 0
+        start, stop = None, None
+        for test in self.tests.values():
+            statuses[test['status']] += 1
+            suite = suites.get(test['suite'])
+            if suite is None:
+                suite = suites[test['suite']] = {'name': test['suite'], 'total': 0, 'duration_ms': 0,
+                                                 **dict.fromkeys(STATUSES, 0)}
+            suite['total'] += 1
+            suite[test['status']] += 1
+            suite['duration_ms'] += test['duration_ms']
+            if test['status'] in ('failed', 'broken'):
+                failure_count += 1
+                if len(failures) < MAX_FAILURES:
+                    failures.append(test)
+            if test['start'] and (start is None or test['start'] < start):
+                start = test['start']
+            if stop is None or test['stop'] > stop:
+                stop = test['stop']
+        slowest = heapq.nlargest(SLOWEST, self.tests.values(), key=lambda test: test['duration_ms'])
+        return {
+            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'total': len(self.tests),
+            'statuses': statuses,
+            'start': start,
+            'stop': stop,
+            'duration_ms': (stop - start) if start and stop else 0,
+            'suites': sorted(suites.values(), key=lambda suite: suite['name']),
+            'failure_count': failure_count,
+            'failures': sorted(failures, key=lambda test: (test['suite'], test['name'] or '')),
+            'slowest': [{k: test[k] for k in ('name', 'suite', 'status', 'duration_ms')} for test in slowest],
+        }
+
+
+def _attachments(item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """用例及其各级步骤中的附件"""
+    attachments = list(item.get('attachments', []))
+    for step in item.get('steps', []):
+        attachments.extend(_attachments(step))
+    return attachments
+
+
+_STYLE = """
+body{font-family:-apple-system,"Segoe UI","Microsoft YaHei",sans-serif;margin:24px;color:#222}
+table{border-collapse:collapse;margin:8px 0 24px}th,td{border:1px solid #ddd;padding:4px 10px;text-align:left}
+th{background:#f5f5f5}.passed{color:#2e7d32}.failed{color:#c62828}.broken{color:#ef6c00}.skipped{color:#757575}
+pre{white-space:pre-wrap;background:#fafafa;border:1px solid #eee;padding:8px;margin:4px 0}
+"""
+
+
+def render_html(summary: Dict[str, Any]) -> str:
+    """
+    生成静态HTML报告
+    :param summary: ReportBuilder.summarize的结果
+    :return: HTML内容
+    """
+    e = html.escape
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>测试报告</title>',
+        f'<style>{_STYLE}</style></head><body>',
+        f'<h1>测试报告</h1><p>生成时间: {e(summary["generated_at"])}，用例数: {summary["total"]}，'
+        f'执行时长: {summary["duration_ms"] / 1000:.1f}s</p>',
+        '<table><tr>' + ''.join(f'<th class="{s}">{s}</th>' for s in STATUSES) + '</tr><tr>'
+        + ''.join(f'<td>{summary["statuses"][s]}</td>' for s in STATUSES) + '</tr></table>',
+        '<h2>测试套件</h2><table><tr><th>套件</th><th>总数</th>'
+        + ''.join(f'<th class="{s}">{s}</th>' for s in STATUSES) + '<th>耗时(ms)</th></tr>',
+    ]
+    for suite in summary['suites']:
+        parts.append(f'<tr><td>{e(suite["name"])}</td><td>{suite["total"]}</td>'
+                     + ''.join(f'<td>{suite[s]}</td>' for s in STATUSES)
+                     + f'<td>{suite["duration_ms"]}</td></tr>')
+    parts.append('</table>')
+
+    parts.append(f'<h2>失败用例（{summary["failure_count"]}）</h2>')
+    if summary['failure_count'] > len(summary['failures']):
+        parts.append(f'<p>只列出前 {len(summary["failures"])} 个，全部用例的结果见 {STATE_FILE}</p>')
+    for test in summary['failures']:
+        links = ' '.join(f'<a href="{e(a["path"])}">{e(a["name"] or a["path"])}</a>' for a in test.get('attachments', []))
+        parts.append(f'<h3 class="{test["status"]}">{e(test["name"] or "")} <small>{e(test["suite"])}</small></h3>'
+                     f'<pre>{e(test.get("message", ""))}</pre><p>{links}</p>')
+
+    parts.append('<h2>最慢用例</h2><table><tr><th>用例</th><th>套件</th><th>状态</th><th>耗时(ms)</th></tr>')
+    for test in summary['slowest']:
+        parts.append(f'<tr><td>{e(test["name"] or "")}</td><td>{e(test["suite"])}</td>'
+                     f'<td class="{test["status"]}">{test["status"]}</td><td>{test["duration_ms"]}</td></tr>')
+    parts.append('</table></body></html>')
+    return "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成静态测试报告')
+    parser.add_argument('--results', default='./allure-results', help='Allure结果目录')
+    parser.add_argument('--report', default='./allure-report', help='报告目录')
+    parser.add_argument('--incremental', action='store_true', help='只处理上次生成后新增的结果')
+    args = parser.parse_args()
+    summary = ReportBuilder(args.results, args.report).build(args.incremental)
+    print(json.dumps(summary['statuses'], ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
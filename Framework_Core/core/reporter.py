@@ -1,16 +1,20 @@
 import os
+import sys
 import subprocess
 from typing import Optional
 from loguru import logger
+from Framework_Core.core.report_builder import ReportBuilder
+from Framework_Core.core.result_store import export_allure, list_segments
 
 class AllureReporter:
     def __init__(self, results_dir: str = "./allure-results", report_dir: str = "./allure-report"):
         self.results_dir = results_dir
         self.report_dir = report_dir
 
-    def generate_report(self) -> bool:
+    def generate_report(self, incremental: bool = False) -> bool:
         """
-        生成Allure报告
+        生成静态HTML/JSON报告，直接读取结果文件和分段文件，不需要Allure命令行和Java
+        :param incremental: 是否增量生成，只处理上次生成后新增的结果
         :return: 是否成功生成报告
         """
         try:
@@ -18,6 +22,23 @@ class AllureReporter:
                 logger.error(f"结果目录不存在: {self.results_dir}")
                 return False
 
+            ReportBuilder(self.results_dir, self.report_dir).build(incremental)
+            return True
+        except Exception as e:
+            logger.error(f"生成报告失败: {str(e)}")
+            return False
+
+    def generate_allure_report(self) -> bool:
+        """
+        使用Allure命令行生成完整的Allure报告，需要安装Allure和Java
+        :return: 是否成功生成报告
+        """
+        try:
+            if not os.path.exists(self.results_dir):
+                logger.error(f"结果目录不存在: {self.results_dir}")
+                return False
+
+            self.export_results()
             # 生成报告
             cmd = f"allure generate {self.results_dir} -o {self.report_dir} --clean"
             subprocess.run(cmd, shell=True, check=True)
@@ -29,19 +50,32 @@ class AllureReporter:
 
     def serve_report(self, port: int = 8080) -> Optional[subprocess.Popen]:
         """
-        启动Allure报告服务
+        生成报告并启动静态文件服务
         :param port: 服务端口
         :return: 服务进程对象
         """
         try:
-            cmd = f"allure serve -p {port} {self.results_dir}"
-            process = subprocess.Popen(cmd, shell=True)
+            if not self.generate_report():
+                return None
+            cmd = [sys.executable, "-m", "http.server", str(port), "--directory", self.report_dir]
+            process = subprocess.Popen(cmd)
             logger.info(f"报告服务已启动在端口: {port}")
             return process
         except Exception as e:
             logger.error(f"启动报告服务失败: {str(e)}")
             return None
 
+    def export_results(self) -> int:
+        """
+        把结果目录中的分段文件导出为Allure的标准目录结构，没有分段文件时不做任何处理
+        :return: 导出的文件数
+        """
+        if not list_segments(self.results_dir):
+            return 0
+        count = export_allure(self.results_dir)
+        logger.info(f"已从分段文件导出 {count} 个结果文件")
+        return count
+
     @staticmethod
     def clean_results(results_dir: str) -> bool:
         """
@@ -51,10 +85,11 @@ class AllureReporter:
         """
         try:
             if os.path.exists(results_dir):
-                for file in os.listdir(results_dir):
-                    file_path = os.path.join(results_dir, file)
-                    if os.path.isfile(file_path):
-                        os.unlink(file_path)
+                # scandir返回的目录项带有文件类型，不需要逐个stat
+                with os.scandir(results_dir) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            os.unlink(entry.path)
             logger.info(f"已清理结果目录: {results_dir}")
             return True
         except Exception as e:
@@ -0,0 +1,291 @@
+"""
+Allure结果分段存储
+把每个进程的测试结果、容器和附件追加写入一个压缩的分段文件，代替每个用例、每个请求各写一个小文件；
+生成报告时再导出为Allure的标准目录结构
+
+文件格式:
+    文件头  MAGIC
+    数据块  BLOCK_HEADER(b'BLK1', 压缩后长度, 原始长度) + zlib压缩的记录，
+            记录为 RECORD_HEADER(类型, 名称长度, 数据长度) + 名称 + 数据
+    索引    zlib压缩的JSON: [[类型, 名称, 数据块偏移, 块内偏移, 长度], ...]
+    文件尾  TRAILER(索引偏移, 索引长度, b'SIDX')
+每个用例的结果写入后立即写出当前数据块并刷新文件，进程异常退出时最多丢失正在执行的用例的记录；
+没有写入索引时，按顺序扫描数据块重建索引
+"""
+import os
+import json
+import mmap
+import uuid
+import zlib
+import struct
+import threading
+from typing import Any, List, Optional, Tuple, Iterator
+from loguru import logger
+from attr import asdict
+from allure_commons import hookimpl
+
+MAGIC = b'ALRSEG01'
+SEGMENT_SUFFIX = '.seg'
+# 数据块压缩前的大小上限，超过后或用例结束时写出
+BLOCK_SIZE = 256 * 1024
+BLOCK_HEADER = struct.Struct('<4sII')
+RECORD_HEADER = struct.Struct('<BHI')
+TRAILER = struct.Struct('<QI4s')
+KINDS = ('result', 'container', 'attachment', 'globals')
+
+
+class SegmentWriter:
+    """
+    分段文件写入器，线程安全
+    第一次写入时才创建文件，没有结果的进程（如pytest-xdist的主进程）不会留下空文件
+    """
+
+    def __init__(self, path: str, block_size: int = BLOCK_SIZE, level: int = 6):
+        """
+        :param path: 分段文件路径
+        :param block_size: 数据块压缩前的大小上限
+        :param level: zlib压缩级别
+        """
+        self.path = path
+        self.block_size = block_size
+        self.level = level
+        self.index: List[List[Any]] = []
+        self._file = None
+        self._block = bytearray()
+        self._block_entries: List[List[Any]] = []
+        self._lock = threading.Lock()
+
+    def append(self, kind: str, name: str, data: bytes) -> None:
+        """
+        追加一条记录
+        :param kind: 记录类型，见KINDS
+        :param name: 导出时的文件名
+        :param data: 文件内容
+        """
+        encoded_name = name.encode('utf-8')
+        with self._lock:
+            self._block_entries.append([kind, name, len(self._block) + RECORD_HEADER.size + len(encoded_name), len(data)])
+            self._block += RECORD_HEADER.pack(KINDS.index(kind), len(encoded_name), len(data))
+            self._block += encoded_name
+            self._block += data
+            if len(self._block) >= self.block_size:
+                self._flush_block()
+
+    def _flush_block(self) -> None:
+        """压缩并写出当前数据块，调用方需持有锁"""
+        if not self._block:
+            return
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'wb')
+            self._file.write(MAGIC)
+        offset = self._file.tell()
+        compressed = zlib.compress(bytes(self._block), self.level)
+        self._file.write(BLOCK_HEADER.pack(b'BLK1', len(compressed), len(self._block)))
+        self._file.write(compressed)
+        for kind, name, position, length in self._block_entries:
+            self.index.append([kind, name, offset, position, length])
+        self._block = bytearray()
+        self._block_entries = []
+
+    def flush(self) -> None:
+        """写出当前数据块"""
+        with self._lock:
+            self._flush_block()
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        """写出剩余数据和索引，关闭文件"""
+        with self._lock:
+            self._flush_block()
+            if self._file is None:
+                return
+            offset = self._file.tell()
+            index = zlib.compress(json.dumps(self.index, ensure_ascii=False).encode('utf-8'), self.level)
+            self._file.write(index)
+            self._file.write(TRAILER.pack(offset, len(index), b'SIDX'))
+            self._file.close()
+            self._file = None
+
+
+class SegmentReader:
+    """
+    分段文件读取器
+    通过mmap读取，只解压被访问的数据块
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: 分段文件路径
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"不是结果分段文件: {path}")
+        self._cached_block: Tuple[int, bytes] = (-1, b'')
+        self.entries = self._read_index()
+        self._by_name = {entry[1]: entry for entry in self.entries}
+
+    def _read_index(self) -> List[List[Any]]:
+        if len(self._map) >= len(MAGIC) + TRAILER.size:
+            offset, length, magic = TRAILER.unpack_from(self._map, len(self._map) - TRAILER.size)
+            if magic == b'SIDX' and offset + length + TRAILER.size == len(self._map):
+                return json.loads(zlib.decompress(self._map[offset:offset + length]))
+        logger.warning(f"结果分段文件没有索引，按数据块重建: {self.path}")
+        return self._scan()
+
+    def _scan(self) -> List[List[Any]]:
+        """按顺序扫描数据块重建索引，忽略末尾不完整的数据块"""
+        entries = []
+        offset = len(MAGIC)
+        while offset + BLOCK_HEADER.size <= len(self._map):
+            tag, compressed_len, _ = BLOCK_HEADER.unpack_from(self._map, offset)
+            end = offset + BLOCK_HEADER.size + compressed_len
+            if tag != b'BLK1' or end > len(self._map):
+                break
+            try:
+                block = self._block(offset)
+            except zlib.error:
+                break
+            position = 0
+            while position < len(block):
+                kind, name_len, data_len = RECORD_HEADER.unpack_from(block, position)
+                position += RECORD_HEADER.size
+                name = block[position:position + name_len].decode('utf-8')
+                position += name_len
+                entries.append([KINDS[kind], name, offset, position, data_len])
+                position += data_len
+            offset = end
+        return entries
+
+    def _block(self, offset: int) -> bytes:
+        """解压数据块，连续读取同一数据块时复用解压结果"""
+        if self._cached_block[0] != offset:
+            _, compressed_len, _ = BLOCK_HEADER.unpack_from(self._map, offset)
+            start = offset + BLOCK_HEADER.size
+            self._cached_block = (offset, zlib.decompress(self._map[start:start + compressed_len]))
+        return self._cached_block[1]
+
+    def __iter__(self) -> Iterator[Tuple[str, str, bytes]]:
+        """
+        按写入顺序遍历记录
+        :return: (类型, 名称, 数据)
+        """
+        return self.records()
+
+    def records(self, start: int = 0, kind: Optional[str] = None) -> Iterator[Tuple[str, str, bytes]]:
+        """
+        按写入顺序遍历记录，跳过的记录所在的数据块不会被解压
+        :param start: 从第几条记录开始
+        :param kind: 只返回指定类型的记录
+        :return: (类型, 名称, 数据)
+        """
+        for entry_kind, name, offset, position, length in self.entries[start:]:
+            if kind is None or entry_kind == kind:
+                yield entry_kind, name, self._block(offset)[position:position + length]
+
+    def read(self, name: str) -> Optional[bytes]:
+        """
+        读取指定名称的记录
+        :param name: 名称
+        :return: 数据，不存在时返回None
+        """
+        entry = self._by_name.get(name)
+        if entry is None:
+            return None
+        _, _, offset, position, length = entry
+        return self._block(offset)[position:position + length]
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "SegmentReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class SegmentResultLogger:
+    """
+    写入分段文件的Allure结果记录器，实现与allure_commons.logger.AllureFileLogger相同的钩子
+    """
+
+    def __init__(self, results_dir: str, worker: Optional[str] = None):
+        """
+        :param results_dir: Allure结果目录
+        :param worker: pytest-xdist的worker编号，用于文件名
+        """
+        name = f"{worker or 'main'}-{uuid.uuid4().hex[:12]}{SEGMENT_SUFFIX}"
+        self.writer = SegmentWriter(os.path.join(results_dir, name))
+
+    def _report_item(self, kind: str, item) -> None:
+        data = asdict(item, filter=lambda _, v: v or v is False)
+        file_name = item.file_pattern.format(prefix=uuid.uuid4())
+        self.writer.append(kind, file_name, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    @hookimpl
+    def report_result(self, result) -> None:
+        self._report_item('result', result)
+        # 用例的附件在结果之前写入，写出数据块后该用例的记录都已落盘
+        self.writer.flush()
+
+    @hookimpl
+    def report_container(self, container) -> None:
+        self._report_item('container', container)
+
+    @hookimpl
+    def report_attached_file(self, source, file_name) -> None:
+        with open(source, 'rb') as f:
+            self.writer.append('attachment', file_name, f.read())
+
+    @hookimpl
+    def report_attached_data(self, body, file_name) -> None:
+        self.writer.append('attachment', file_name, body.encode('utf-8') if isinstance(body, str) else body)
+
+    @hookimpl
+    def report_globals(self, globals_item) -> None:
+        self._report_item('globals', globals_item)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def list_segments(results_dir: str) -> List[str]:
+    """
+    获取结果目录中的分段文件
+    :param results_dir: 结果目录
+    :return: 分段文件路径列表
+    """
+    if not os.path.isdir(results_dir):
+        return []
+    return sorted(entry.path for entry in os.scandir(results_dir)
+                  if entry.is_file() and entry.name.endswith(SEGMENT_SUFFIX))
+
+
+def export_allure(results_dir: str, target_dir: Optional[str] = None) -> int:
+    """
+    把结果目录中的分段文件导出为Allure的标准目录结构
+    :param results_dir: 结果目录
+    :param target_dir: 导出目录，为空时导出到结果目录
+    :return: 导出的文件数
+    """
+    target_dir = target_dir or results_dir
+    os.makedirs(target_dir, exist_ok=True)
+    count = 0
+    for path in list_segments(results_dir):
+        try:
+            with SegmentReader(path) as reader:
+                for kind, name, data in reader:
+                    with open(os.path.join(target_dir, name), 'wb') as f:
+                        f.write(data)
+                    count += 1
+        except (OSError, ValueError, zlib.error) as e:
+            logger.error(f"导出结果分段文件失败: {path} {str(e)}")
+    return count
@@ -1,35 +1,229 @@
 import time
-from typing import List, Dict, Any, Callable
-from datetime import datetime
+import json
+import heapq
+import importlib
+import itertools
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Union
+from datetime import datetime, timedelta
 from loguru import logger
 import threading
+from Framework_Core.core.cron import CronExpression
+from Framework_Core.core.scheduler_store import SchedulerStore
+
+# 任务上一次执行尚未结束时再次到期的处理方式
+OVERLAP_POLICIES = ('skip', 'queue', 'parallel')
+# 调度器停止期间错过的触发: skip不补跑/once补跑一次/all逐次补跑
+CATCH_UP_POLICIES = ('skip', 'once', 'all')
+# 运行时状态，不写入任务定义
+_RUNTIME_KEYS = ('status', 'last_run', 'next_run')
+
 
 class TestScheduler:
-    def __init__(self):
-        self.tasks = []
+    """
+    测试任务调度器
+    任务的下一次触发时间保存在最小堆中，调度线程通过条件变量休眠到最早的到期时间，
+    到期任务交给有界线程池执行，调度线程本身不执行任务
+
+    任务配置:
+        id: 任务ID，未指定时自动生成
+        name: 任务名称
+        callback: 执行函数，参数为任务配置
+        cron: cron表达式，如 "*/5 * * * *"
+        interval: 执行间隔（秒）
+        schedule_time: 单次执行时间，datetime或 "YYYY-MM-DD HH:MM:SS"
+        overlap: 上一次执行未结束时的处理方式 skip/queue/parallel，默认skip
+        max_queue: queue策略下最多排队的触发次数，默认1，超出的触发被合并
+        catch_up: 重启后对错过触发的处理方式 skip/once/all，默认使用调度器的配置
+        max_catch_up: all策略下最多补跑的次数，默认100
+
+    配置了store时任务定义、调度状态和执行历史写入SQLite；callback为模块级函数或 "模块:函数" 字符串时，
+    重启后可以直接从存储中恢复任务
+    """
+
+    def __init__(self, max_workers: int = 8, store: Union[SchedulerStore, str, None] = None, catch_up: str = 'skip'):
+        """
+        :param max_workers: 执行任务的最大线程数
+        :param store: 持久化存储或数据库文件路径，为空时不持久化
+        :param catch_up: 默认的错过触发处理方式
+        """
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"不支持的补跑策略: {catch_up}")
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.max_workers = max_workers
+        self.store = SchedulerStore(store) if isinstance(store, str) else store
+        self.catch_up = catch_up
         self._running = False
         self._scheduler_thread = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._condition = threading.Condition()
+        # 堆元素: [触发时间戳, 序号, 任务ID, 是否有效]，移除任务时只标记无效，出堆时丢弃
+        self._heap: List[list] = []
+        self._entries: Dict[str, list] = {}
+        self._removed = 0
+        self._counter = itertools.count()
+        self._active: Dict[str, int] = {}
+        self._queued: Dict[str, int] = {}
+        self._missed: Dict[str, List[datetime]] = {}
+        if self.store is not None:
+            self.restore()
 
     def add_task(self, task: Dict[str, Any]) -> None:
         """
         添加测试任务
         :param task: 任务配置字典
         """
-        self.tasks.append(task)
+        task.setdefault('id', uuid.uuid4().hex)
+        overlap = task.setdefault('overlap', 'skip')
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"不支持的重叠策略: {overlap}")
+        if task.get('cron') and not isinstance(task['cron'], CronExpression):
+            task['cron'] = CronExpression(task['cron'])
+        if isinstance(task.get('schedule_time'), str):
+            task['schedule_time'] = datetime.strptime(task['schedule_time'], '%Y-%m-%d %H:%M:%S')
+        if isinstance(task.get('callback'), str):
+            task['callback'] = self._resolve_callback(task['callback'])
+        if task.setdefault('catch_up', self.catch_up) not in CATCH_UP_POLICIES:
+            raise ValueError(f"不支持的补跑策略: {task['catch_up']}")
+
+        state = None
+        if self.store is not None:
+            state = self.store.get_state(task['id'])
+            self.store.save_task(task['id'], self._definition(task))
+
+        with self._condition:
+            if task['id'] in self.tasks:
+                self._unschedule(task['id'])
+            self.tasks[task['id']] = task
+            next_run = self._initial_fire_time(task, state)
+            if next_run is None and state is None:
+                logger.warning(f"任务未配置cron/interval/schedule_time，不会被调度: {task.get('name', task['id'])}")
+            if next_run is not None:
+                self._schedule(task, next_run)
+            elif self.store is not None:
+                self.store.update_next_run(task['id'], None)
+            if state:
+                task.setdefault('status', state['status'])
+                task.setdefault('last_run', state['last_run'])
+            task.setdefault('status', 'scheduled' if next_run else 'idle')
+            if self._running and task['id'] in self._missed:
+                self._dispatch(task, self._missed.pop(task['id']))
         logger.info(f"已添加任务: {task.get('name', 'unnamed task')}")
 
+    def restore(self) -> int:
+        """
+        从存储中恢复任务，已通过add_task添加的同ID任务以内存中的定义为准
+        :return: 恢复的任务数
+        """
+        restored = 0
+        for definition in self.store.load_tasks():
+            if definition['id'] in self.tasks:
+                continue
+            if not definition.get('callback'):
+                logger.warning(f"任务的回调无法从存储中恢复，需要重新添加: {definition['id']}")
+                continue
+            try:
+                self.add_task(definition)
+                restored += 1
+            except Exception as e:
+                logger.error(f"恢复任务失败: {definition['id']}, {str(e)}")
+        if restored:
+            logger.info(f"已从存储中恢复 {restored} 个任务")
+        return restored
+
+    def _initial_fire_time(self, task: Dict[str, Any], state: Optional[Dict[str, Any]]) -> Optional[datetime]:
+        """
+        计算任务加入时的触发时间，存储中有调度状态时按补跑策略处理错过的触发
+        :param task: 任务配置
+        :param state: 存储中的调度状态
+        :return: 下一次触发时间
+        """
+        if state is None:
+            return self._next_fire_time(task, None)
+        persisted = state['next_run']
+        if persisted is None:
+            # 单次任务已经执行过
+            return None if not (task.get('cron') or task.get('interval')) else self._next_fire_time(task, None)
+
+        now = datetime.now()
+        if persisted > now:
+            return persisted
+        missed = self._missed_fires(task, persisted, now)
+        if missed and task['catch_up'] != 'skip':
+            missed = missed if task['catch_up'] == 'all' else missed[-1:]
+            logger.info(f"任务错过 {len(missed)} 次触发，将补跑: {task.get('name', task['id'])}")
+            self._missed[task['id']] = missed
+        elif missed:
+            logger.info(f"任务错过 {len(missed)} 次触发，已跳过: {task.get('name', task['id'])}")
+        if task.get('cron') or task.get('interval'):
+            return self._next_fire_time(task, missed[-1] if missed else None)
+        return None
+
+    @staticmethod
+    def _missed_fires(task: Dict[str, Any], first: datetime, now: datetime) -> List[datetime]:
+        """列出从first到now之间错过的触发时间"""
+        fires, fire = [], first
+        limit = task.get('max_catch_up', 100)
+        while fire is not None and fire <= now and len(fires) < limit:
+            fires.append(fire)
+            if task.get('cron'):
+                fire = task['cron'].next_after(fire)
+            elif task.get('interval'):
+                fire = fire + timedelta(seconds=float(task['interval']))
+            else:
+                fire = None
+        return fires
+
+    @staticmethod
+    def _resolve_callback(path: str) -> Any:
+        """解析 "模块:函数" 形式的回调"""
+        module_name, _, attr = path.partition(':')
+        target = importlib.import_module(module_name)
+        for name in attr.split('.'):
+            target = getattr(target, name)
+        return target
+
+    @staticmethod
+    def _definition(task: Dict[str, Any]) -> Dict[str, Any]:
+        """生成可持久化的任务定义，无法序列化的字段不保存"""
+        definition = {}
+        for key, value in task.items():
+            if key in _RUNTIME_KEYS:
+                continue
+            if key == 'callback':
+                qualname = getattr(value, '__qualname__', '')
+                if callable(value) and '<' not in qualname:
+                    definition[key] = f"{value.__module__}:{qualname}"
+                continue
+            if isinstance(value, CronExpression):
+                value = value.expr
+            elif isinstance(value, datetime):
+                value = value.strftime('%Y-%m-%d %H:%M:%S')
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                logger.debug(f"任务字段无法持久化，已忽略: {key}")
+                continue
+            definition[key] = value
+        return definition
+
     def remove_task(self, task_id: str) -> bool:
         """
         移除测试任务
         :param task_id: 任务ID
         :return: 是否成功移除
         """
-        for task in self.tasks:
-            if task.get('id') == task_id:
-                self.tasks.remove(task)
-                logger.info(f"已移除任务: {task_id}")
-                return True
-        return False
+        with self._condition:
+            if self.tasks.pop(task_id, None) is None:
+                return False
+            self._unschedule(task_id)
+            self._queued.pop(task_id, None)
+            self._missed.pop(task_id, None)
+        if self.store is not None:
+            self.store.delete_task(task_id)
+        logger.info(f"已移除任务: {task_id}")
+        return True
 
     def start(self) -> None:
         """启动调度器"""
@@ -38,54 +232,182 @@ class TestScheduler:
             return
 
         self._running = True
-        self._scheduler_thread = threading.Thread(target=self._run_scheduler)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="test-task")
+        self._scheduler_thread = threading.Thread(target=self._run_scheduler, name="test-scheduler", daemon=True)
         self._scheduler_thread.start()
+        with self._condition:
+            for task_id in list(self._missed):
+                self._dispatch(self.tasks[task_id], self._missed.pop(task_id))
         logger.info("调度器已启动")
 
-    def stop(self) -> None:
-        """停止调度器"""
-        self._running = False
+    def stop(self, wait: bool = True) -> None:
+        """
+        停止调度器
+        :param wait: 是否等待正在执行的任务结束
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
         if self._scheduler_thread:
             self._scheduler_thread.join()
+            self._scheduler_thread = None
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
         logger.info("调度器已停止")
 
     def _run_scheduler(self) -> None:
-        """调度器主循环"""
-        while self._running:
-            current_time = datetime.now()
-            
-            for task in self.tasks:
-                if self._should_run_task(task, current_time):
-                    self._execute_task(task)
-            
-            time.sleep(1)  # 避免过度消耗CPU
+        """调度器主循环，休眠到堆顶任务的触发时间，新任务加入时被唤醒重新计算"""
+        with self._condition:
+            while self._running:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                fire_at, _, task_id, valid = self._heap[0]
+                if not valid:
+                    heapq.heappop(self._heap)
+                    self._removed -= 1
+                    continue
+                delay = fire_at - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                del self._entries[task_id]
+                task = self.tasks[task_id]
+                scheduled = datetime.fromtimestamp(fire_at)
+                next_run = self._next_fire_time(task, scheduled)
+                if next_run is not None:
+                    self._schedule(task, next_run)
+                else:
+                    task['next_run'] = None
+                    if self.store is not None:
+                        self.store.update_next_run(task_id, None)
+                self._dispatch(task, [scheduled])
+
+    def _schedule(self, task: Dict[str, Any], next_run: datetime) -> None:
+        entry = [next_run.timestamp(), next(self._counter), task['id'], True]
+        self._entries[task['id']] = entry
+        heapq.heappush(self._heap, entry)
+        task['next_run'] = next_run
+        if self.store is not None:
+            self.store.update_next_run(task['id'], next_run)
+        self._condition.notify()
+
+    def _unschedule(self, task_id: str) -> None:
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        entry[-1] = False
+        self._removed += 1
+        # 无效元素过多时重建堆，避免频繁增删任务后堆无限增长
+        if self._removed > len(self._heap) // 2:
+            self._heap = [e for e in self._heap if e[-1]]
+            heapq.heapify(self._heap)
+            self._removed = 0
 
     @staticmethod
-    def _should_run_task(task: Dict[str, Any], current_time: datetime) -> bool:
+    def _next_fire_time(task: Dict[str, Any], previous: Optional[datetime]) -> Optional[datetime]:
         """
-        检查任务是否应该执行
+        计算任务的下一次触发时间
         :param task: 任务配置
-        :param current_time: 当前时间
-        :return: 是否应该执行
-        """
-        schedule_time = task.get('schedule_time')
-        if not schedule_time:
-            return False
-        
-        # 这里可以实现更复杂的调度逻辑
-        return True
+        :param previous: 上一次计划触发时间，首次调度时为None
+        :return: 下一次触发时间，不再触发时返回None
+        """
+        now = datetime.now()
+        if task.get('cron'):
+            return task['cron'].next_after(max(now, previous) if previous else now)
+        if task.get('interval'):
+            interval = timedelta(seconds=float(task['interval']))
+            if previous is None:
+                return now + interval
+            # 以计划时间为基准累加，错过的周期直接跳过，不补发
+            next_run = previous + interval
+            if next_run <= now:
+                next_run += interval * ((now - next_run) // interval + 1)
+            return next_run
+        if task.get('schedule_time') and previous is None:
+            return task['schedule_time']
+        return None
+
+    def _dispatch(self, task: Dict[str, Any], scheduled: List[datetime]) -> None:
+        """
+        按重叠策略把到期任务提交到线程池，调用方需持有锁
+        :param task: 任务配置
+        :param scheduled: 本次执行对应的计划触发时间，补跑错过的触发时可能有多个
+        """
+        task_id = task['id']
+        if self._active.get(task_id) and task['overlap'] != 'parallel':
+            if task['overlap'] == 'skip':
+                logger.warning(f"任务仍在执行，跳过本次触发: {task.get('name', task_id)}")
+                return
+            if self._queued.get(task_id, 0) < task.get('max_queue', 1):
+                self._queued[task_id] = self._queued.get(task_id, 0) + 1
+            return
+        self._active[task_id] = self._active.get(task_id, 0) + 1
+        task['status'] = 'running'
+        self._executor.submit(self._execute_task, task, scheduled)
 
-    def _execute_task(self, task: Dict[str, Any]) -> None:
+    def _execute_task(self, task: Dict[str, Any], scheduled: List[datetime] = None) -> None:
         """
         执行测试任务
         :param task: 任务配置
+        :param scheduled: 计划触发时间列表，每个触发时间执行一次
         """
+        status, started = 'success', datetime.now()
         try:
-            if callable(task.get('callback')):
-                task['callback'](task)
-            logger.info(f"任务执行完成: {task.get('name', 'unnamed task')}")
+            for fire_time in scheduled or [None]:
+                started = datetime.now()
+                status, error = 'success', None
+                try:
+                    if callable(task.get('callback')):
+                        task['callback'](task)
+                    logger.info(f"任务执行完成: {task.get('name', 'unnamed task')}")
+                except Exception as e:
+                    status, error = 'failed', str(e)
+                    logger.error(f"任务执行失败: {str(e)}")
+                self._record_run(task, fire_time, started, status, error)
+        finally:
+            self._finish_task(task, status, started)
+
+    def _record_run(self, task: Dict[str, Any], scheduled: Optional[datetime], started: datetime,
+                    status: str, error: Optional[str]) -> None:
+        """写入执行历史，存储异常不影响调度"""
+        if self.store is None:
+            return
+        try:
+            self.store.record_run(task['id'], scheduled, started, datetime.now(), status, error)
         except Exception as e:
-            logger.error(f"任务执行失败: {str(e)}")
+            logger.error(f"记录任务执行历史失败: {str(e)}")
+
+    def _finish_task(self, task: Dict[str, Any], status: str, started: datetime) -> None:
+        """记录执行结果，queue策略下继续执行排队的触发"""
+        task_id = task['id']
+        with self._condition:
+            task['status'] = status
+            task['last_run'] = started
+            self._active[task_id] -= 1
+            if self._queued.get(task_id) and self._running and task_id in self.tasks:
+                self._queued[task_id] -= 1
+                self._dispatch(task, [datetime.now()])
+            elif not self._active[task_id]:
+                del self._active[task_id]
+
+    def get_task_history(self, task_id: Optional[str] = None, status: Optional[str] = None,
+                         since: Optional[datetime] = None, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        分页查询任务执行历史
+        :param task_id: 任务ID，为空时查询全部任务
+        :param status: 执行结果 success/failed
+        :param since: 开始时间下限
+        :param limit: 返回的最大记录数
+        :param offset: 跳过的记录数
+        :return: 执行记录列表，按开始时间倒序
+        """
+        if self.store is None:
+            return []
+        return self.store.history(task_id, status, since, limit=limit, offset=offset)
 
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """
@@ -93,13 +415,13 @@ class TestScheduler:
         :param task_id: 任务ID
         :return: 任务状态信息
         """
-        for task in self.tasks:
-            if task.get('id') == task_id:
-                return {
-                    'id': task_id,
-                    'name': task.get('name'),
-                    'status': task.get('status', 'unknown'),
-                    'last_run': task.get('last_run'),
-                    'next_run': task.get('next_run')
-                }
-        return {} 
\ No newline at end of file
+        task = self.tasks.get(task_id)
+        if task is None:
+            return {}
+        return {
+            'id': task_id,
+            'name': task.get('name'),
+            'status': task.get('status', 'unknown'),
+            'last_run': task.get('last_run'),
+            'next_run': task.get('next_run')
+        }
\ No newline at end of file
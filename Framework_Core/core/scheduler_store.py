@@ -0,0 +1,216 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+from loguru import logger
+
+DEFAULT_STORE_PATH = "data/scheduler.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    definition TEXT NOT NULL,
+    next_run REAL,
+    last_run REAL,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    scheduled REAL,
+    started REAL NOT NULL,
+    finished REAL NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_task_started ON runs (task_id, started);
+"""
+
+
+def _to_ts(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+
+def _to_dt(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+class SchedulerStore:
+    """
+    调度器持久化存储
+    基于SQLite保存任务定义、调度状态和执行历史，调度器重启后据此恢复任务并补跑错过的触发
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """
+        :param path: 数据库文件路径，":memory:" 表示仅保存在内存中
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 调度线程和任务线程共用一个连接，由锁保证串行访问
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def save_task(self, task_id: str, definition: Dict[str, Any]) -> None:
+        """
+        保存任务定义，已有的调度状态保持不变
+        :param task_id: 任务ID
+        :param definition: 可JSON序列化的任务定义
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tasks (id, definition) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET definition = excluded.definition",
+                (task_id, json.dumps(definition, ensure_ascii=False, sort_keys=True))
+            )
+
+    def delete_task(self, task_id: str) -> None:
+        """
+        删除任务定义，执行历史保留
+        :param task_id: 任务ID
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def load_tasks(self) -> List[Dict[str, Any]]:
+        """
+        读取全部任务定义
+        :return: 任务定义列表
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT definition FROM tasks ORDER BY id").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_state(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取任务的调度状态
+        :param task_id: 任务ID
+        :return: 包含next_run/last_run/status的字典，任务不存在时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT next_run, last_run, status FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'next_run': _to_dt(row[0]), 'last_run': _to_dt(row[1]), 'status': row[2]}
+
+    def update_next_run(self, task_id: str, next_run: Optional[datetime]) -> None:
+        """
+        更新下一次触发时间
+        :param task_id: 任务ID
+        :param next_run: 下一次触发时间，不再触发时为None
+        """
+        with self._lock:
+            self._conn.execute("UPDATE tasks SET next_run = ? WHERE id = ?", (_to_ts(next_run), task_id))
+
+    def record_run(self, task_id: str, scheduled: Optional[datetime], started: datetime,
+                   finished: datetime, status: str, error: Optional[str] = None) -> None:
+        """
+        记录一次执行并更新任务的最近执行状态
+        :param task_id: 任务ID
+        :param scheduled: 计划触发时间
+        :param started: 开始时间
+        :param finished: 结束时间
+        :param status: 执行结果 success/failed
+        :param error: 失败原因
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO runs (task_id, scheduled, started, finished, status, error) VALUES (?, ?, ?, ?, ?, ?)",
+                    (task_id, _to_ts(scheduled), started.timestamp(), finished.timestamp(), status, error)
+                )
+                self._conn.execute(
+                    "UPDATE tasks SET last_run = ?, status = ? WHERE id = ?",
+                    (started.timestamp(), status, task_id)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def iter_history(self, task_id: Optional[str] = None, status: Optional[str] = None,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        按开始时间倒序逐批读取执行历史，不会一次性加载全部记录
+        :param task_id: 任务ID
+        :param status: 执行结果
+        :param since: 开始时间下限
+        :param until: 开始时间上限
+        :param batch_size: 每批读取的记录数
+        :return: 执行记录迭代器
+        """
+        offset = 0
+        while True:
+            batch = self.history(task_id, status, since, until, limit=batch_size, offset=offset)
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            offset += batch_size
+
+    def history(self, task_id: Optional[str] = None, status: Optional[str] = None,
+                since: Optional[datetime] = None, until: Optional[datetime] = None,
+                limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        分页查询执行历史，按开始时间倒序
+        :param task_id: 任务ID
+        :param status: 执行结果
+        :param since: 开始时间下限
+        :param until: 开始时间上限
+        :param limit: 返回的最大记录数
+        :param offset: 跳过的记录数
+        :return: 执行记录列表
+        """
+        conditions, params = [], []
+        if task_id is not None:
+            conditions.append("task_id = ?")
+            params.append(task_id)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if since is not None:
+            conditions.append("started >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            conditions.append("started < ?")
+            params.append(until.timestamp())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (f"SELECT task_id, scheduled, started, finished, status, error FROM runs {where} "
+               f"ORDER BY started DESC, id DESC LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit, offset)).fetchall()
+        return [{
+            'task_id': row[0],
+            'scheduled': _to_dt(row[1]),
+            'started': _to_dt(row[2]),
+            'finished': _to_dt(row[3]),
+            'duration': round(row[3] - row[2], 3),
+            'status': row[4],
+            'error': row[5],
+        } for row in rows]
+
+    def prune_history(self, before: datetime) -> int:
+        """
+        清理早于指定时间的执行历史
+        :param before: 时间界限
+        :return: 删除的记录数
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM runs WHERE started < ?", (before.timestamp(),))
+        logger.info(f"已清理执行历史: {cursor.rowcount} 条")
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,356 @@
+import asyncio
+import json
+import operator
+import os
+import re
+import threading
+import time
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from loguru import logger
+from Framework_Core.utils.requestUtils.async_api_plugin import AsyncAPIRequest
+from Framework_Core.utils.requestUtils.extractor import compile_path, parse_body
+
+# 变量占位符，与YAML用例保持一致: ${{name}}
+VARIABLE_PATTERN = re.compile(r'\$\{\{(.*?)\}\}')
+
+ASSERT_METHODS: Dict[str, Callable[[Any, Any], bool]] = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le,
+    'in': lambda actual, expect: actual in expect,
+    'not_in': lambda actual, expect: actual not in expect,
+    'contains': lambda actual, expect: expect in actual,
+    'not_contains': lambda actual, expect: expect not in actual,
+}
+
+_MISSING = object()
+
+
+class CompiledStep:
+    """预处理后的步骤：请求参数和断言函数在加载时即已确定"""
+
+    __slots__ = ('name', 'method', 'endpoint', 'request_kwargs', 'templated', 'assertions', 'extract', 'next')
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        endpoint: Any,
+        request_kwargs: Dict[str, Any],
+        templated: bool,
+        assertions: List[Callable[[Any], Optional[str]]],
+        extract: Dict[str, Callable[[Any], Any]],
+        next_step: str
+    ):
+        self.name = name
+        self.method = method
+        self.endpoint = endpoint
+        self.request_kwargs = request_kwargs
+        self.templated = templated
+        self.assertions = assertions
+        self.extract = extract
+        self.next = next_step
+
+
+class CompiledSuite:
+    """预处理后的数据文件"""
+
+    def __init__(self, variables: Dict[str, Any], setup: List[CompiledStep], suites: List[List[List[CompiledStep]]]):
+        """
+        :param variables: setup中的公共变量
+        :param setup: 按顺序执行的前置步骤
+        :param suites: 每个测试套件的执行链列表，链内步骤按next顺序执行
+        """
+        self.variables = variables
+        self.setup = setup
+        self.suites = suites
+
+
+class StepResult:
+    """单个步骤的执行结果"""
+
+    def __init__(self, suite_index: int, name: str, passed: bool, status_code: Optional[int] = None,
+                 elapsed: float = 0.0, error: Optional[str] = None):
+        self.suite_index = suite_index
+        self.name = name
+        self.passed = passed
+        self.status_code = status_code
+        self.elapsed = elapsed
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'suite_index': self.suite_index,
+            'name': self.name,
+            'passed': self.passed,
+            'status_code': self.status_code,
+            'elapsed': self.elapsed,
+            'error': self.error,
+        }
+
+
+class StepRunner:
+    """
+    数据驱动步骤执行器
+    执行 setup.steps / testsuit[].testcase[] 格式的数据文件：
+    - 数据文件只加载和编译一次，之后按文件修改时间复用
+    - setup中的步骤按顺序执行，非steps字段作为公共变量
+    - 被其他步骤的next引用的步骤作为链的后续步骤，其余步骤各自作为一条链的起点
+    - 同一套件内的链并发执行，链内步骤按next顺序执行，前一步失败则终止该链
+    """
+
+    _cache: Dict[str, Tuple[float, CompiledSuite]] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, base_url: str = "", concurrency: int = 10, client: Optional[AsyncAPIRequest] = None):
+        """
+        :param base_url: 接口基础URL
+        :param concurrency: 单个套件内的最大并发链数
+        :param client: 异步API客户端，为空则按base_url创建
+        """
+        self.concurrency = concurrency
+        self.client = client or AsyncAPIRequest(base_url=base_url, per_host_limit=concurrency)
+
+    @classmethod
+    def load(cls, data_path: str) -> CompiledSuite:
+        """
+        加载并编译数据文件，文件未修改时直接返回缓存结果
+        :param data_path: 数据文件路径
+        :return: 编译后的数据
+        """
+        path = os.path.abspath(data_path)
+        mtime = os.path.getmtime(path)
+        with cls._cache_lock:
+            cached = cls._cache.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        compiled = cls.compile(raw)
+        with cls._cache_lock:
+            cls._cache[path] = (mtime, compiled)
+        logger.info(f"数据文件已编译: {data_path}")
+        return compiled
+
+    @classmethod
+    def compile(cls, raw: Dict[str, Any]) -> CompiledSuite:
+        """
+        编译数据文件内容
+        :param raw: 数据文件内容
+        :return: 编译后的数据
+        """
+        setup = raw.get('setup') or {}
+        variables = {k: v for k, v in setup.items() if k != 'steps'}
+        setup_steps = [cls.compile_step(step) for step in setup.get('steps') or []]
+        suites = [
+            cls._build_chains([cls.compile_step(step) for step in suite.get('testcase') or []])
+            for suite in raw.get('testsuit') or []
+        ]
+        return CompiledSuite(variables, setup_steps, suites)
+
+    @classmethod
+    def compile_step(cls, step: Dict[str, Any]) -> CompiledStep:
+        """
+        编译单个步骤
+        :param step: 步骤定义
+        :return: 编译后的步骤
+        """
+        name = step.get('name', 'unnamed step')
+        request_kwargs = {}
+        for key, target in (('params', 'params'), ('json', 'json_data'), ('data', 'data'), ('headers', 'headers')):
+            if step.get(key) is not None:
+                request_kwargs[target] = step[key]
+        endpoint = step.get('url', '')
+
+        assertions = step.get('assert') or []
+        if isinstance(assertions, dict):
+            assertions = [assertions]
+
+        return CompiledStep(
+            name=name,
+            method=step.get('request', 'get').upper(),
+            endpoint=endpoint,
+            request_kwargs=request_kwargs,
+            templated=_has_variables(endpoint) or _has_variables(request_kwargs),
+            assertions=[cls._compile_assertion(name, assertion) for assertion in assertions],
+            extract={var: _compile_getter(field) for var, field in (step.get('extract') or {}).items()},
+            next_step=step.get('next') or ''
+        )
+
+    @staticmethod
+    def _compile_assertion(step_name: str, assertion: Dict[str, Any]) -> Callable[[Any], Optional[str]]:
+        """将断言定义编译为函数，返回None表示通过，否则返回失败信息"""
+        method = assertion.get('method', 'eq')
+        compare = ASSERT_METHODS.get(method)
+        if compare is None:
+            raise ValueError(f"步骤 {step_name} 使用了不支持的断言方法: {method}")
+        field = assertion.get('field', 'status_code')
+        getter = _compile_getter(field)
+        expect = assertion.get('expect')
+        message = assertion.get('message') or f"{field} {method} {expect}"
+
+        def check(response: Any) -> Optional[str]:
+            actual = getter(response)
+            if actual is _MISSING:
+                return f"{message}: 字段不存在 {field}"
+            try:
+                if compare(actual, expect):
+                    return None
+            except TypeError:
+                pass
+            return f"{message}: 实际值 {actual!r}，期望 {method} {expect!r}"
+
+        return check
+
+    @staticmethod
+    def _build_chains(steps: List[CompiledStep]) -> List[List[CompiledStep]]:
+        """根据next字段将步骤组织为执行链"""
+        by_name = {step.name: step for step in steps}
+        referenced = {step.next for step in steps if step.next}
+        missing = referenced - by_name.keys()
+        if missing:
+            raise ValueError(f"next引用的步骤不存在: {', '.join(sorted(missing))}")
+
+        chains = []
+        for step in steps:
+            if step.name in referenced:
+                continue
+            chain, seen, current = [], set(), step
+            while current is not None:
+                if current.name in seen:
+                    raise ValueError(f"步骤存在循环引用: {current.name}")
+                seen.add(current.name)
+                chain.append(current)
+                current = by_name.get(current.next) if current.next else None
+            chains.append(chain)
+
+        if sum(len(chain) for chain in chains) < len(steps):
+            raise ValueError("部分步骤只能通过循环next引用到达")
+        return chains
+
+    def run(self, data_path: str) -> List[StepResult]:
+        """
+        执行数据文件
+        :param data_path: 数据文件路径
+        :return: 全部步骤的执行结果
+        """
+        return asyncio.run(self.run_compiled(self.load(data_path)))
+
+    async def run_compiled(self, compiled: CompiledSuite) -> List[StepResult]:
+        """
+        执行编译后的数据
+        :param compiled: 编译后的数据
+        :return: 全部步骤的执行结果
+        """
+        results: List[StepResult] = []
+        context = dict(compiled.variables)
+        try:
+            # 前置步骤按顺序执行，提取的变量对所有套件可见
+            if compiled.setup:
+                setup_results = await self._run_chain(-1, compiled.setup, context)
+                results.extend(setup_results)
+                if not all(result.passed for result in setup_results):
+                    logger.error("前置步骤执行失败，跳过测试套件")
+                    return results
+
+            for index, chains in enumerate(compiled.suites):
+                semaphore = asyncio.Semaphore(self.concurrency)
+
+                async def _run(chain: List[CompiledStep], suite_index: int = index) -> List[StepResult]:
+                    async with semaphore:
+                        return await self._run_chain(suite_index, chain, dict(context))
+
+                for chain_results in await asyncio.gather(*(_run(chain) for chain in chains)):
+                    results.extend(chain_results)
+        finally:
+            await self.client.aclose()
+
+        passed = sum(1 for result in results if result.passed)
+        logger.info(f"数据驱动执行完成: 共 {len(results)} 个步骤，通过 {passed}，失败 {len(results) - passed}")
+        return results
+
+    async def _run_chain(self, suite_index: int, chain: List[CompiledStep], context: Dict[str, Any]) -> List[StepResult]:
+        """按顺序执行一条链，步骤失败时终止"""
+        results = []
+        for step in chain:
+            result = await self._run_step(suite_index, step, context)
+            results.append(result)
+            if not result.passed:
+                break
+        return results
+
+    async def _run_step(self, suite_index: int, step: CompiledStep, context: Dict[str, Any]) -> StepResult:
+        """执行单个步骤并校验断言"""
+        endpoint, request_kwargs = step.endpoint, step.request_kwargs
+        if step.templated:
+            endpoint = _render(endpoint, context)
+            request_kwargs = _render(request_kwargs, context)
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(step.method, endpoint, **request_kwargs)
+        except Exception as e:
+            return StepResult(suite_index, step.name, False, elapsed=time.perf_counter() - start, error=str(e))
+        elapsed = time.perf_counter() - start
+
+        for check in step.assertions:
+            error = check(response)
+            if error:
+                logger.error(f"步骤断言失败: {step.name} - {error}")
+                return StepResult(suite_index, step.name, False, response.status_code, elapsed, error)
+
+        for var, getter in step.extract.items():
+            value = getter(response)
+            if value is not _MISSING:
+                context[var] = value
+        return StepResult(suite_index, step.name, True, response.status_code, elapsed)
+
+
+def _compile_getter(field: str) -> Callable[[Any], Any]:
+    """
+    将字段表达式编译为取值函数
+    status_code/text/headers.xxx 取响应属性，其余按 $.a.b 或 a.b 的形式从JSON响应体中取值
+    """
+    if field == 'status_code':
+        return lambda response: response.status_code
+    if field == 'text':
+        return lambda response: response.text
+    if field.startswith('headers.'):
+        header = field[len('headers.'):]
+        return lambda response: response.headers.get(header, _MISSING)
+
+    path = compile_path(field if field.startswith('$') else f"$.{field}")
+
+    def getter(response: Any) -> Any:
+        return path.find(parse_body(response), _MISSING)
+
+    return getter
+
+
+def _has_variables(value: Any) -> bool:
+    """判断值中是否包含变量占位符"""
+    if isinstance(value, str):
+        return bool(VARIABLE_PATTERN.search(value))
+    if isinstance(value, dict):
+        return any(_has_variables(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_has_variables(v) for v in value)
+    return False
+
+
+def _render(value: Any, context: Dict[str, Any]) -> Any:
+    """替换变量占位符，整个值为单个占位符时保留变量原始类型"""
+    if isinstance(value, str):
+        match = VARIABLE_PATTERN.fullmatch(value)
+        if match:
+            return context.get(match.group(1).strip(), value)
+        return VARIABLE_PATTERN.sub(lambda m: str(context.get(m.group(1).strip(), m.group(0))), value)
+    if isinstance(value, dict):
+        return {k: _render(v, context) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_render(v, context) for v in value]
+    return value
@@ -0,0 +1,59 @@
+"""
+请求详情附件插件
+根据命令行参数配置全局附件策略，并在on_failure模式下于用例失败时写入缓存的请求详情
+"""
+import pytest
+from Framework_Core.utils.requestUtils.attachment_policy import (
+    AttachmentPolicy,
+    begin_test,
+    end_test,
+    flush_buffer,
+    set_default_policy,
+)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("api-attachments", "请求详情附件")
+    group.addoption(
+        "--attach-mode",
+        choices=AttachmentPolicy.MODES,
+        default=None,
+        help="请求详情附件模式: always/on_failure/never"
+    )
+    group.addoption(
+        "--attach-max-size",
+        type=int,
+        default=None,
+        help="附件中请求/响应体的最大字节数"
+    )
+    group.addoption(
+        "--attach-spill-dir",
+        default=None,
+        help="超大响应体的保存目录"
+    )
+    parser.addini("attach_mode", "请求详情附件模式", default="always")
+    parser.addini("attach_max_size", "附件中请求/响应体的最大字节数", default=str(64 * 1024))
+    parser.addini("attach_spill_dir", "超大响应体的保存目录", default="")
+
+
+def pytest_configure(config):
+    set_default_policy(AttachmentPolicy.from_config({
+        'mode': config.getoption("--attach-mode") or config.getini("attach_mode"),
+        'max_body_size': config.getoption("--attach-max-size") or config.getini("attach_max_size"),
+        'spill_dir': config.getoption("--attach-spill-dir") or config.getini("attach_spill_dir") or None,
+    }))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    begin_test()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.failed:
+        flush_buffer()
+    if report.when == "teardown":
+        end_test()
@@ -0,0 +1,150 @@
+"""
+用例耗时插件
+记录每个用例的执行耗时（setup+call+teardown）到本地存储；开启 --duration-order 且使用pytest-xdist并行时，
+按历史耗时以最长处理时间优先（LPT）的方式把用例分配到各worker
+"""
+import os
+from typing import Dict, Any, List, Optional
+import pytest
+from Framework_Core.core.duration_store import DEFAULT_STORE_PATH, DurationStore, lpt_partition
+
+try:
+    from xdist.scheduler import LoadScheduling
+except ImportError:  # 未安装pytest-xdist时只记录耗时
+    LoadScheduling = None
+
+duration_store_key = pytest.StashKey[DurationStore]()
+# worker执行一个用例时需要知道下一个用例（决定fixture的teardown范围），因此每个worker至少保留2个待执行用例
+SCHEDULE_AHEAD = 2
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("api-durations", "用例耗时")
+    group.addoption(
+        "--duration-store",
+        default=None,
+        help="用例耗时存储文件路径"
+    )
+    group.addoption(
+        "--duration-order",
+        action="store_true",
+        default=False,
+        help="并行执行时按历史耗时以LPT方式分配用例"
+    )
+    parser.addini("duration_store", "用例耗时存储文件路径", default=DEFAULT_STORE_PATH)
+
+
+def pytest_configure(config):
+    path = config.getoption("--duration-store") or config.getini("duration_store")
+    if not os.path.isabs(path):
+        path = os.path.join(str(config.rootpath), path)
+    store = DurationStore(path)
+    config.stash[duration_store_key] = store
+    # xdist的worker不写存储，耗时由主进程统一汇总，避免多个进程同时写文件
+    if not hasattr(config, "workerinput"):
+        config.pluginmanager.register(DurationRecorder(store), "duration_recorder")
+
+
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if LoadScheduling is None or not config.getoption("--duration-order") or config.getvalue("dist") != "load":
+        return None
+    return DurationScheduling(config, log)
+
+
+class DurationRecorder:
+    """汇总各阶段报告中的耗时，会话结束时写入存储"""
+
+    def __init__(self, store: DurationStore):
+        self.store = store
+        self._running = {}
+
+    def pytest_runtest_logreport(self, report):
+        # 失败重跑时每次重新从setup开始累计，只保留最后一次执行的耗时；跳过的用例不记录
+        if report.when == "setup":
+            self._running[report.nodeid] = report.duration
+        elif report.nodeid in self._running:
+            self._running[report.nodeid] += report.duration
+        if report.skipped:
+            self._running.pop(report.nodeid, None)
+        elif report.when == "teardown" and report.nodeid in self._running:
+            self.store.record(report.nodeid, self._running.pop(report.nodeid))
+
+    def pytest_sessionfinish(self, session):
+        self.store.save()
+
+
+if LoadScheduling is not None:
+    class DurationScheduling(LoadScheduling):
+        """
+        按历史耗时分配用例的xdist调度器
+        收集完成后按LPT为每个worker规划用例和执行顺序（从长到短），但与LoadScheduling一样逐步发送，
+        每个worker只保留少量待执行用例。worker规划的用例发完后从剩余耗时最多的worker的规划末尾取用例；
+        worker崩溃时已分配但未执行的用例放回全局队列，由其他worker或重启的worker执行
+        """
+
+        def __init__(self, config, log=None):
+            super().__init__(config, log)
+            self.node2plan: Dict[Any, List[int]] = {}
+            self.estimates: List[float] = []
+
+        @property
+        def tests_finished(self) -> bool:
+            return not any(self.node2plan.values()) and super().tests_finished
+
+        @property
+        def has_pending(self) -> bool:
+            return any(self.node2plan.values()) or super().has_pending
+
+        def schedule(self) -> None:
+            assert self.collection_is_completed
+            if self.collection is None:
+                if not self._check_nodes_have_same_collection():
+                    self.log("**Different tests collected, aborting run**")
+                    return
+                self.collection = next(iter(self.node2collection.values()))
+                self.estimates = self.config.stash[duration_store_key].estimate(self.collection)
+                self.node2plan = dict(zip(self.nodes, lpt_partition(self.estimates, len(self.nodes))))
+            for node in self.nodes:
+                self.check_schedule(node)
+
+        def check_schedule(self, node, duration: float = 0) -> None:
+            if node.shutting_down:
+                return
+            tests = []
+            while len(self.node2pending[node]) + len(tests) < SCHEDULE_AHEAD:
+                index = self._next_test(node)
+                if index is None:
+                    break
+                tests.append(index)
+            if tests:
+                self.node2pending[node].extend(tests)
+                node.send_runtest_some(tests)
+            if not self.pending and not any(self.node2plan.values()):
+                node.shutdown()
+
+        def remove_node(self, node) -> Optional[str]:
+            pending = self.node2pending.pop(node)
+            plan = self.node2plan.pop(node, [])
+            crashitem = None
+            if pending:
+                # worker崩溃，第一个待执行的用例是崩溃时正在执行的用例
+                crashitem = self.collection[pending.pop(0)]
+            if pending or plan:
+                self.pending.extend(pending + plan)
+                self.pending.sort(key=lambda index: -self.estimates[index])
+                for other in self.nodes:
+                    self.check_schedule(other)
+            return crashitem
+
+        def _next_test(self, node) -> Optional[int]:
+            """按规划取worker的下一个用例，规划为空时取全局队列，再从剩余耗时最多的worker的规划末尾取"""
+            plan = self.node2plan.get(node)
+            if plan:
+                return plan.pop(0)
+            if self.pending:
+                return self.pending.pop(0)
+            donors = [plan for plan in self.node2plan.values() if plan]
+            if not donors:
+                return None
+            return max(donors, key=lambda plan: sum(self.estimates[index] for index in plan)).pop()
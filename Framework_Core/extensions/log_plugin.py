@@ -0,0 +1,49 @@
+"""
+用例日志插件
+在pytest启动时按config.yaml的logging配置初始化日志；--debug-log on_failure 时按用例缓存低于INFO级别的日志，用例失败时才完整写入日志文件，通过的用例丢弃
+"""
+import pytest
+from Framework_Core.utils.logUtils.logger import test_logger
+
+DEBUG_LOG_MODES = ('always', 'on_failure')
+failed_key = pytest.StashKey[bool]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("api-logging", "用例日志")
+    group.addoption(
+        "--debug-log",
+        choices=DEBUG_LOG_MODES,
+        default=None,
+        help="调试日志写入方式: always/on_failure"
+    )
+    parser.addini("debug_log", "调试日志写入方式", default="")
+
+
+def pytest_configure(config):
+    test_logger.setup()
+    mode = config.getoption("--debug-log") or config.getini("debug_log") or test_logger.log_config.get('debug_log', 'always')
+    if mode not in DEBUG_LOG_MODES:
+        raise pytest.UsageError(f"不支持的调试日志写入方式: {mode}")
+    test_logger.set_buffer_debug(mode == 'on_failure')
+
+
+def pytest_unconfigure(config):
+    # 异步写入时等待后台线程写完，避免进程退出时丢失最后的日志
+    test_logger.complete()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    item.stash[failed_key] = False
+    test_logger.begin_test(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.failed:
+        item.stash[failed_key] = True
+    if report.when == "teardown":
+        test_logger.end_test(item.stash.get(failed_key, False))
@@ -0,0 +1,191 @@
+"""
+接口耗时回归检测插件
+按config.yaml的perf_baseline配置，会话结束时用请求遥测汇总的各接口耗时与历史基线比较，输出显著变慢的接口；
+只有全部用例执行通过且没有按-k/-m/--lf等条件筛选用例时才把本次耗时加入基线，
+开启gate时存在回归则把本次执行标记为失败。使用pytest-xdist并行时在主进程中合并各worker的数据后检测
+"""
+import os
+import json
+from typing import Dict, Any, List
+import pytest
+from loguru import logger
+from Framework_Core.core.histogram import LatencyHistogram
+from Framework_Core.core.latency_baseline import DEFAULT_BASELINE_PATH, LatencyBaseline, RegressionDetector
+from Framework_Core.utils.requestUtils.telemetry import get_telemetry
+
+DEFAULT_REPORT_FILE = "logs/perf_regressions.json"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("api-perf-baseline", "接口耗时回归检测")
+    group.addoption(
+        "--perf-baseline",
+        default=None,
+        help="接口耗时基线文件"
+    )
+    group.addoption(
+        "--perf-threshold",
+        type=float,
+        default=None,
+        help="判定为回归的相对变化阈值，如0.2表示变慢20%%"
+    )
+    group.addoption(
+        "--perf-gate",
+        action="store_true",
+        default=False,
+        help="存在耗时回归时本次执行失败"
+    )
+    group.addoption(
+        "--no-perf-baseline",
+        action="store_true",
+        default=False,
+        help="关闭接口耗时回归检测"
+    )
+
+
+def _baseline_config():
+    try:
+        from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
+        loader = ConfigLoader()
+        settings = loader.get_value('perf_baseline', {}) or {}
+        # default_environment是可选配置，直接读取避免缺省时的警告
+        environment = os.environ.get('TEST_ENV') or loader.config.get('default_environment') or 'dev'
+        return settings, environment
+    except Exception:
+        return {}, os.environ.get('TEST_ENV') or 'dev'
+
+
+def pytest_configure(config):
+    if hasattr(config, "workerinput"):
+        return
+    settings, environment = _baseline_config()
+    if config.getoption("--no-perf-baseline") or not settings.get('enabled', True):
+        return
+    if config.option.collectonly:
+        return
+    path = _resolve_path(config, config.getoption("--perf-baseline") or settings.get('file', DEFAULT_BASELINE_PATH))
+    report_path = settings.get('report_file', DEFAULT_REPORT_FILE)
+    threshold = config.getoption("--perf-threshold")
+    detector = RegressionDetector(
+        threshold=threshold if threshold is not None else float(settings.get('threshold', 0.2)),
+        metric=settings.get('metric', 'p50'),
+        alpha=float(settings.get('alpha', 0.01)),
+        min_runs=int(settings.get('min_runs', 3)),
+        min_samples=int(settings.get('min_samples', 5)),
+        min_delta_ms=float(settings.get('min_delta_ms', 5))
+    )
+    config.pluginmanager.register(PerfRegressionCheck(
+        LatencyBaseline(path, int(settings.get('max_runs', 20))),
+        detector,
+        environment,
+        gate=config.getoption("--perf-gate") or bool(settings.get('gate', False)),
+        report_path=_resolve_path(config, report_path) if report_path else None
+    ), "perf_regression_check")
+
+
+def _resolve_path(config, path: str) -> str:
+    """相对路径按pytest的rootdir解析，与执行目录无关"""
+    return path if os.path.isabs(path) else os.path.join(str(config.rootpath), path)
+
+
+def _partial_selection(config) -> bool:
+    """是否只执行了部分用例，pytest-xdist并行时筛选发生在worker中，主进程只能根据命令行参数判断"""
+    return bool(
+        config.getoption("keyword", default="") or config.getoption("markexpr", default="")
+        or config.getoption("deselect", default=None) or config.getoption("lf", default=False)
+    )
+
+
+class PerfRegressionCheck:
+    """会话结束时检测耗时回归并更新基线"""
+
+    def __init__(self, baseline: LatencyBaseline, detector: RegressionDetector, environment: str,
+                 gate: bool = False, report_path: str = DEFAULT_REPORT_FILE):
+        self.baseline = baseline
+        self.detector = detector
+        self.environment = environment
+        self.gate = gate
+        self.report_path = report_path
+        self.results: List[Dict[str, Any]] = []
+        self.deselected = False
+        self.recorded = False
+
+    def check(self, record: bool = True) -> List[Dict[str, Any]]:
+        """
+        检查本次运行的各接口
+        :param record: 是否把请求错误不超过一半的接口加入基线
+        :return: 各接口的检查结果
+        """
+        telemetry = get_telemetry()
+        if telemetry is None:
+            logger.warning("请求遥测已关闭，跳过接口耗时回归检测")
+            return []
+        snapshot = telemetry.snapshot()
+        results = []
+        # 只使用成功请求的耗时，失败请求很快返回的耗时会拉低基线并干扰显著性检验
+        for name, data in snapshot['success'].items():
+            histogram = LatencyHistogram.from_dict(data)
+            if not histogram.count:
+                continue
+            method, _, endpoint = name.partition(' ')
+            key = LatencyBaseline.key(self.environment, method, endpoint)
+            result = self.detector.check(self.baseline, key, histogram)
+            result.update(environment=self.environment, method=method, endpoint=endpoint,
+                          errors=snapshot['errors'].get(name, 0))
+            results.append(result)
+            # 大部分请求失败时接口状态异常，成功请求的耗时同样不加入基线
+            if record and result['errors'] <= histogram.count:
+                self.baseline.record(key, histogram)
+        if record:
+            self.baseline.save()
+        return sorted(results, key=lambda result: (not result['regressed'], -(result['change'] or 0)))
+
+    def pytest_deselected(self, items):
+        if items:
+            self.deselected = True
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        # 失败的执行和部分用例的执行不代表接口的正常表现，只检查不加入基线
+        self.recorded = (session.exitstatus == pytest.ExitCode.OK and not self.deselected
+                         and not _partial_selection(session.config))
+        self.results = self.check(self.recorded)
+        regressions = [result for result in self.results if result['regressed']]
+        if self.report_path:
+            directory = os.path.dirname(self.report_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.report_path, 'w', encoding='utf-8') as f:
+                json.dump(self.results, f, ensure_ascii=False, indent=2)
+        if regressions and self.gate and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    def pytest_terminal_summary(self, terminalreporter):
+        regressions = [result for result in self.results if result['regressed']]
+        checked = sum(result['regressed'] is not None for result in self.results)
+        if self.results and not self.recorded:
+            terminalreporter.write_line("本次执行未全部通过或只执行了部分用例，耗时未加入基线")
+        if not regressions:
+            if self.results:
+                terminalreporter.write_line(f"接口耗时回归检测: 检查 {checked} 个接口，未发现回归（环境: {self.environment}）")
+            return
+        terminalreporter.write_sep("-", f"接口耗时回归（环境: {self.environment}）", red=True)
+        for line in format_regressions(regressions):
+            terminalreporter.write_line(line)
+        if self.gate:
+            terminalreporter.write_line("已开启耗时回归门禁，本次执行标记为失败", red=True)
+
+
+def format_regressions(rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    格式化耗时回归
+    :param rows: PerfRegressionCheck.check的结果
+    :return: 表格的各行
+    """
+    header = ('接口', '指标', '基线ms', '本次ms', '变化', 'p值', '基线次数', '本次请求数')
+    table = [header] + [(
+        f"{row['method']} {row['endpoint']}", row['metric'], row['baseline_ms'], row['current_ms'],
+        f"{row['change']:+.1%}", row['p_value'], row['baseline_runs'], row['count']
+    ) for row in rows]
+    widths = [max(len(str(line[i])) for line in table) + 2 for i in range(len(header))]
+    return ["".join(str(value).ljust(width) for value, width in zip(line, widths)) for line in table]
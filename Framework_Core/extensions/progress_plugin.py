@@ -0,0 +1,161 @@
+"""
+实时进度插件
+按config.yaml的progress配置在执行过程中汇总用例结果和请求耗时，写入JSON Lines文件并可通过本地HTTP/SSE服务查看；
+使用pytest-xdist并行时，worker把每个用例的请求记录附在用例报告中，由主进程汇总
+"""
+import threading
+import pytest
+from Framework_Core.core.progress import LiveProgress, ProgressFeed, ProgressServer
+from Framework_Core.utils.requestUtils.telemetry import get_telemetry
+
+DEFAULT_PROGRESS_FILE = "logs/progress.jsonl"
+live_progress_key = pytest.StashKey[LiveProgress]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("api-progress", "实时进度")
+    group.addoption(
+        "--progress-file",
+        default=None,
+        help="进度快照文件（JSON Lines）"
+    )
+    group.addoption(
+        "--progress-port",
+        type=int,
+        default=None,
+        help="本地进度服务端口，0表示随机端口，不指定时按配置文件"
+    )
+    group.addoption(
+        "--progress-abort-error-rate",
+        type=float,
+        default=None,
+        help="近期请求错误率达到该值（0~1）时中止执行"
+    )
+    group.addoption(
+        "--no-progress",
+        action="store_true",
+        default=False,
+        help="关闭实时进度"
+    )
+
+
+def _progress_config():
+    try:
+        from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
+        return ConfigLoader().get_value('progress', {}) or {}
+    except Exception:
+        return {}
+
+
+def _telemetry_disabled(config) -> bool:
+    # 请求耗时来自请求遥测，遥测关闭时不启动进度
+    return config.getoption("--no-telemetry", default=False) or get_telemetry() is None
+
+
+def pytest_configure(config):
+    settings = _progress_config()
+    if config.getoption("--no-progress") or not settings.get('enabled', True):
+        return
+    # 只收集用例时不执行请求，不启动进度，也不覆盖上次执行的进度文件
+    if config.option.collectonly or _telemetry_disabled(config):
+        return
+    config.pluginmanager.register(RequestCollector(), "progress_request_collector")
+    if not hasattr(config, "workerinput"):
+        port = config.getoption("--progress-port")
+        abort_error_rate = config.getoption("--progress-abort-error-rate")
+        config.pluginmanager.register(ProgressReporter(
+            config,
+            path=config.getoption("--progress-file") or settings.get('file', DEFAULT_PROGRESS_FILE),
+            port=port if port is not None else settings.get('port'),
+            interval=float(settings.get('interval', 2)),
+            window=float(settings.get('window', 60)),
+            abort_error_rate=abort_error_rate if abort_error_rate is not None else float(settings.get('abort_error_rate', 0)),
+            abort_min_requests=int(settings.get('abort_min_requests', 50))
+        ), "progress_reporter")
+
+
+class RequestCollector:
+    """收集当前用例发出的请求，在teardown报告中附带给主进程"""
+
+    def __init__(self):
+        self.pending = []
+        self._lock = threading.Lock()
+
+    def pytest_sessionstart(self, session):
+        telemetry = get_telemetry()
+        if telemetry is not None:
+            telemetry.add_listener(self.on_request)
+
+    def on_request(self, record):
+        failed = record['error'] is not None or (record['status'] or 0) >= 500
+        with self._lock:
+            self.pending.append((f"{record['method']} {record['endpoint']}", record['total_ms'] or 0.0, failed))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        if call.when == "teardown":
+            with self._lock:
+                requests, self.pending = self.pending, []
+            outcome.get_result().api_requests = requests
+
+
+class ProgressReporter:
+    """在主进程中汇总进度，写入进度文件并启动进度服务"""
+
+    def __init__(self, config, path, port, interval, window, abort_error_rate, abort_min_requests):
+        self.config = config
+        self.session = None
+        self.progress = LiveProgress(window)
+        config.stash[live_progress_key] = self.progress
+        self.feed = ProgressFeed(self.progress, path, interval, self.abort, abort_error_rate, abort_min_requests)
+        self.server = ProgressServer(self.progress, port, interval=interval, abort=self.abort) if port is not None else None
+
+    def abort(self, reason: str) -> None:
+        """
+        中止执行，正在执行的用例结束后停止
+        :param reason: 原因
+        """
+        if self.progress.aborted is not None:
+            return
+        self.progress.aborted = reason
+        # pytest-xdist并行时由主进程的调度循环检查shouldstop
+        dsession = self.config.pluginmanager.getplugin("dsession")
+        if dsession is not None:
+            dsession.shouldstop = reason
+        elif self.session is not None:
+            self.session.shouldstop = reason
+
+    def pytest_sessionstart(self, session):
+        self.session = session
+        self.feed.start()
+        if self.server is not None:
+            self.server.start()
+            terminal = self.config.pluginmanager.getplugin("terminalreporter")
+            if terminal is not None:
+                terminal.write_line(f"实时进度: {self.server.url}")
+
+    def pytest_collection_finish(self, session):
+        if not hasattr(self.config, "workerinput") and session.items:
+            self.progress.set_total(len(session.items))
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node, ids):
+        self.progress.set_total(len(ids))
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self.progress.test_started(nodeid)
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        self.progress.test_finished(nodeid)
+
+    def pytest_runtest_logreport(self, report):
+        self.progress.add_report(report)
+
+    def pytest_sessionfinish(self, session):
+        self.progress.finished = True
+        self.feed.stop()
+
+    def pytest_unconfigure(self, config):
+        if self.server is not None:
+            self.server.stop()
@@ -0,0 +1,56 @@
+"""
+Allure结果存储插件
+按config.yaml的report.allure.store配置选择结果的写入方式:
+    files   allure-pytest默认的方式，每个结果、容器和附件各写一个文件
+    segment 每个进程写入一个压缩的分段文件，生成报告时再导出为Allure的标准目录结构，见Framework_Core/core/result_store.py
+"""
+import os
+import pytest
+import allure_commons
+from allure_commons.logger import AllureFileLogger
+from Framework_Core.core.result_store import SegmentResultLogger
+
+STORES = ('files', 'segment')
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("api-result-store", "Allure结果存储")
+    group.addoption(
+        "--result-store",
+        choices=STORES,
+        default=None,
+        help="Allure结果写入方式: files/segment"
+    )
+
+
+def _store_config() -> str:
+    try:
+        from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
+        return ConfigLoader().get_value('report.allure.store', 'files') or 'files'
+    except Exception:
+        return 'files'
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    # 在allure-pytest添加文件记录器之后执行
+    store = config.getoption("--result-store") or _store_config()
+    results_dir = getattr(config.option, 'allure_report_dir', None)
+    if store != 'segment' or not results_dir:
+        return
+    file_loggers = [plugin for plugin in allure_commons.plugin_manager.get_plugins()
+                    if isinstance(plugin, AllureFileLogger)]
+    for file_logger in file_loggers:
+        allure_commons.plugin_manager.unregister(file_logger)
+    worker = getattr(config, "workerinput", {}).get("workerid")
+    segment_logger = SegmentResultLogger(os.path.abspath(results_dir), worker)
+    allure_commons.plugin_manager.register(segment_logger)
+
+    def cleanup():
+        segment_logger.close()
+        allure_commons.plugin_manager.unregister(segment_logger)
+        # allure-pytest的清理函数按名称注销文件记录器，重新注册后才能正常注销
+        for file_logger in file_loggers:
+            allure_commons.plugin_manager.register(file_logger)
+
+    config.add_cleanup(cleanup)
@@ -0,0 +1,112 @@
+"""
+请求遥测插件
+按config.yaml的telemetry配置记录每个请求的结构化数据，会话结束时输出按接口汇总的耗时分位数；
+使用pytest-xdist并行时各worker的汇总数据在主进程合并
+"""
+import os
+import json
+from typing import Dict, Any, List
+import pytest
+from Framework_Core.utils.logUtils.logger import worker_log_file
+from Framework_Core.utils.requestUtils.telemetry import RequestTelemetry, get_telemetry, set_telemetry
+
+DEFAULT_TELEMETRY_FILE = "logs/telemetry.jsonl"
+DEFAULT_SUMMARY_FILE = "logs/telemetry_summary.json"
+# 终端中最多显示的接口数
+SUMMARY_ROWS = 20
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("api-telemetry", "请求遥测")
+    group.addoption(
+        "--telemetry-file",
+        default=None,
+        help="请求记录文件（JSON Lines）"
+    )
+    group.addoption(
+        "--telemetry-summary",
+        default=None,
+        help="按接口汇总的耗时统计文件（JSON）"
+    )
+    group.addoption(
+        "--no-telemetry",
+        action="store_true",
+        default=False,
+        help="关闭请求遥测"
+    )
+
+
+def _telemetry_config() -> Dict[str, Any]:
+    try:
+        from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
+        return ConfigLoader().get_value('telemetry', {}) or {}
+    except Exception:
+        return {}
+
+
+def pytest_configure(config):
+    settings = _telemetry_config()
+    if config.getoption("--no-telemetry") or not settings.get('enabled', True):
+        set_telemetry(None)
+        return
+    path = config.getoption("--telemetry-file") or settings.get('file', DEFAULT_TELEMETRY_FILE)
+    set_telemetry(RequestTelemetry(worker_log_file(path) if path else None))
+    if not hasattr(config, "workerinput"):
+        summary_path = config.getoption("--telemetry-summary") or settings.get('summary_file', DEFAULT_SUMMARY_FILE)
+        config.pluginmanager.register(TelemetrySummary(summary_path), "telemetry_summary")
+
+
+def pytest_sessionfinish(session):
+    telemetry = get_telemetry()
+    if telemetry is None:
+        return
+    telemetry.close()
+    # worker把汇总数据交给主进程
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput['telemetry'] = json.dumps(telemetry.snapshot())
+
+
+class TelemetrySummary:
+    """在主进程中合并各worker的汇总数据，会话结束时写入汇总文件并在终端输出"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        telemetry = get_telemetry()
+        data = getattr(node, "workeroutput", {}).get('telemetry')
+        if telemetry is not None and data:
+            telemetry.merge_snapshot(json.loads(data))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        telemetry = get_telemetry()
+        rows = telemetry.summary() if telemetry is not None else []
+        if not rows:
+            return
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(rows, f, ensure_ascii=False, indent=2)
+        terminalreporter.write_sep("-", "接口耗时（按p95排序）")
+        for line in format_summary(rows[:SUMMARY_ROWS]):
+            terminalreporter.write_line(line)
+        if len(rows) > SUMMARY_ROWS:
+            terminalreporter.write_line(f"... 共 {len(rows)} 个接口，完整数据见 {self.path}")
+
+
+def format_summary(rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    格式化按接口汇总的耗时统计
+    :param rows: RequestTelemetry.summary的结果
+    :return: 表格的各行
+    """
+    header = ('接口', '次数', '错误', 'p50ms', 'p95ms', 'p99ms', 'maxms')
+    table = [header] + [(
+        f"{row['method']} {row['endpoint']}", row['count'], row['errors'],
+        row['p50_ms'], row['p95_ms'], row['p99_ms'], row['max_ms']
+    ) for row in rows]
+    widths = [max(len(str(line[i])) for line in table) + 2 for i in range(len(header))]
+    return ["".join(str(value).ljust(width) for value, width in zip(line, widths)) for line in table]
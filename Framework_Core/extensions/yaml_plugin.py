@@ -0,0 +1,86 @@
+"""
+YAML用例收集插件
+直接从YAML用例文件收集测试项，不生成测试代码文件
+"""
+from fnmatch import fnmatch
+import allure
+import pytest
+from Framework_Core.core.case_runner import YamlCaseRunner
+from Framework_Core.utils.fileUtils.case_model import YamlCase, YamlCaseFile, load_case_file
+from Framework_Core.utils.requestUtils.api_plugin import APIRequest
+
+_runner_key = pytest.StashKey[YamlCaseRunner]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("yaml-cases", "YAML用例")
+    group.addoption("--yaml-host", default=None, help="YAML用例中 ${{host()}} 的取值")
+    parser.addini("yaml_case_patterns", "作为用例收集的YAML文件名模式", type="args",
+                  default=["test*.yaml", "*_test.yaml"])
+    parser.addini("yaml_host", "YAML用例中 ${{host()}} 的取值", default="")
+
+
+def pytest_collect_file(file_path, parent):
+    if file_path.suffix not in (".yaml", ".yml"):
+        return None
+    patterns = parent.config.getini("yaml_case_patterns")
+    if any(fnmatch(file_path.name, pattern) for pattern in patterns):
+        return YamlFile.from_parent(parent, path=file_path)
+    return None
+
+
+def _default_host() -> str:
+    """未指定host时使用配置文件中默认环境的接口地址"""
+    try:
+        from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
+        return ConfigLoader().get_environment_config().get('api_base_url', '')
+    except Exception:
+        return ''
+
+
+def get_runner(config) -> YamlCaseRunner:
+    """获取会话内共享的用例执行器"""
+    runner = config.stash.get(_runner_key, None)
+    if runner is None:
+        host = config.getoption("--yaml-host") or config.getini("yaml_host") or _default_host()
+        runner = YamlCaseRunner(APIRequest(), functions={'host': lambda: host})
+        config.stash[_runner_key] = runner
+    return runner
+
+
+def pytest_unconfigure(config):
+    runner = config.stash.get(_runner_key, None)
+    if runner is not None:
+        runner.dependencies.close()
+
+
+class YamlFile(pytest.File):
+    def collect(self):
+        case_file = load_case_file(str(self.path))
+        for case in case_file.cases.values():
+            if case.is_run:
+                yield YamlCaseItem.from_parent(self, name=f"test_{case.case_id}", case=case, case_file=case_file)
+
+
+class YamlCaseItem(pytest.Item):
+    def __init__(self, *, case: YamlCase, case_file: YamlCaseFile, **kwargs):
+        super().__init__(**kwargs)
+        self.case = case
+        self.case_file = case_file
+
+    def runtest(self):
+        common = self.case_file.common
+        allure.dynamic.epic(common.get('allureEpic', ''))
+        allure.dynamic.feature(common.get('allureFeature', ''))
+        allure.dynamic.story(common.get('allureStory', ''))
+        allure.dynamic.title(self.case.detail)
+        allure.dynamic.severity(allure.severity_level.NORMAL)
+        get_runner(self.config).run_case(self.case_file, self.case)
+
+    def repr_failure(self, excinfo, style=None):
+        if isinstance(excinfo.value, AssertionError):
+            return str(excinfo.value)
+        return super().repr_failure(excinfo, style=style)
+
+    def reportinfo(self):
+        return self.path, 0, f"{self.case.case_id}: {self.case.detail}"
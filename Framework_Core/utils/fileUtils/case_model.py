@@ -0,0 +1,176 @@
+import os
+import re
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from Framework_Core.utils.fileUtils.yaml_loader import load_yaml
+
+# 变量占位符: ${{name}} 或 ${{func()}}
+VARIABLE_PATTERN = re.compile(r'\$\{\{(.*?)\}\}')
+
+
+class Template:
+    """
+    预解析的字符串模板
+    不含占位符的值直接返回原值；整个值为单个占位符时保留变量原始类型
+    """
+
+    __slots__ = ('raw', 'parts', 'single')
+
+    def __init__(self, raw: Any):
+        self.raw = raw
+        self.parts: Optional[List[Tuple[bool, str]]] = None
+        self.single: Optional[str] = None
+        if isinstance(raw, str) and VARIABLE_PATTERN.search(raw):
+            match = VARIABLE_PATTERN.fullmatch(raw)
+            if match:
+                self.single = match.group(1).strip()
+            else:
+                parts, pos = [], 0
+                for match in VARIABLE_PATTERN.finditer(raw):
+                    parts.append((False, raw[pos:match.start()]))
+                    parts.append((True, match.group(1).strip()))
+                    pos = match.end()
+                parts.append((False, raw[pos:]))
+                self.parts = parts
+
+    @property
+    def is_static(self) -> bool:
+        return self.single is None and self.parts is None
+
+    def render(self, resolve) -> Any:
+        """
+        渲染模板
+        :param resolve: 变量解析函数，参数为占位符中的表达式
+        :return: 渲染结果
+        """
+        if self.single is not None:
+            return resolve(self.single)
+        if self.parts is None:
+            return self.raw
+        return "".join(str(resolve(text)) if is_var else text for is_var, text in self.parts)
+
+
+def compile_value(value: Any) -> Any:
+    """将字典/列表中的字符串编译为模板，不含占位符的值原样保留"""
+    if isinstance(value, str):
+        template = Template(value)
+        return value if template.is_static else template
+    if isinstance(value, dict):
+        return {k: compile_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [compile_value(v) for v in value]
+    return value
+
+
+def render_value(value: Any, resolve) -> Any:
+    """渲染compile_value的结果"""
+    if isinstance(value, Template):
+        return value.render(resolve)
+    if isinstance(value, dict):
+        return {k: render_value(v, resolve) for k, v in value.items()}
+    if isinstance(value, list):
+        return [render_value(v, resolve) for v in value]
+    return value
+
+
+def cache_name(value: Any) -> Optional[str]:
+    """从 set_cache 的值中取出缓存名称，如 ${{code}} -> code"""
+    if not value:
+        return None
+    match = VARIABLE_PATTERN.fullmatch(str(value))
+    return match.group(1).strip() if match else str(value)
+
+
+class CaseDependency:
+    """用例依赖：从上游用例的响应中提取数据写入缓存"""
+
+    __slots__ = ('case_id', 'dependent_type', 'jsonpath', 'cache_name')
+
+    def __init__(self, case_id: str, dependent_type: str, jsonpath: str, cache_name: str):
+        self.case_id = case_id
+        self.dependent_type = dependent_type
+        self.jsonpath = jsonpath
+        self.cache_name = cache_name
+
+
+class CaseAssertion:
+    """用例断言"""
+
+    __slots__ = ('name', 'jsonpath', 'type', 'value')
+
+    def __init__(self, name: str, jsonpath: str, assert_type: str, value: Any):
+        self.name = name
+        self.jsonpath = jsonpath
+        self.type = assert_type
+        self.value = value
+
+
+class YamlCase:
+    """预解析的单个YAML用例"""
+
+    __slots__ = ('case_id', 'detail', 'host', 'url', 'method', 'headers', 'request_type',
+                 'data', 'is_run', 'dependencies', 'assertions')
+
+    def __init__(self, case_id: str, case_data: Dict[str, Any]):
+        self.case_id = case_id
+        self.detail = case_data.get('detail', case_id)
+        self.host = Template(case_data.get('host') or '')
+        self.url = Template(case_data.get('url') or '')
+        self.method = (case_data.get('method') or 'GET').upper()
+        self.headers = compile_value(case_data.get('headers') or {})
+        self.request_type = case_data.get('requestType', 'json')
+        self.data = compile_value(case_data.get('data') or {})
+        self.is_run = case_data.get('is_run') is not False
+        self.dependencies = self._parse_dependencies(case_data.get('dependence_case_data') or [])
+        self.assertions = [
+            CaseAssertion(name, assertion.get('jsonpath'), assertion.get('type'), assertion.get('value'))
+            for name, assertion in (case_data.get('assert') or {}).items()
+            if assertion and assertion.get('jsonpath') and assertion.get('type')
+        ]
+
+    @staticmethod
+    def _parse_dependencies(dependencies: List[Dict[str, Any]]) -> List[CaseDependency]:
+        result = []
+        for dep in dependencies:
+            for data in dep.get('dependent_data') or []:
+                name = cache_name(data.get('set_cache'))
+                if all([data.get('dependent_type'), data.get('jsonpath'), name]):
+                    result.append(CaseDependency(dep.get('case_id'), data['dependent_type'], data['jsonpath'], name))
+        return result
+
+
+class YamlCaseFile:
+    """预解析的YAML用例文件"""
+
+    def __init__(self, path: str, yaml_data: Dict[str, Any]):
+        self.path = path
+        self.common: Dict[str, Any] = yaml_data.get('case_common') or {}
+        self.cases: Dict[str, YamlCase] = {
+            case_id: YamlCase(case_id, case_data)
+            for case_id, case_data in yaml_data.items()
+            if case_id != 'case_common' and isinstance(case_data, dict)
+        }
+
+
+_cache: Dict[str, Tuple[Tuple[int, int], YamlCaseFile]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_case_file(yaml_path: str) -> YamlCaseFile:
+    """
+    加载YAML用例文件，文件未修改时直接返回缓存的解析结果
+    :param yaml_path: YAML文件路径
+    :return: 用例文件模型
+    """
+    path = os.path.abspath(yaml_path)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+    case_file = YamlCaseFile(path, load_yaml(path) or {})
+    with _cache_lock:
+        _cache[path] = (key, case_file)
+    return case_file
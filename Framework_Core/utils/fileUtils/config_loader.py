@@ -1,66 +1,224 @@
 import os
+import copy
+import time
+import hashlib
+import threading
 import yaml
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from loguru import logger
+from Framework_Core.utils.fileUtils.yaml_loader import load_yaml_bytes
+
+# 配置层，后面的层覆盖前面的层
+LAYERS = ('base', 'environment', 'platform', 'cli', 'updates')
+# 只能通过专门的方法修改的层
+_PROTECTED_LAYERS = ('base', 'updates')
+# 检查配置文件是否变化的最小间隔（秒）
+RELOAD_CHECK_INTERVAL = 1.0
+_MISSING = object()
+
 
 class ConfigLoader:
+    """
+    配置加载器
+    同一配置文件在进程内只有一个实例，构造时不会重复读取文件。配置由多层合并而成:
+        base         配置文件
+        environment  与配置文件同目录的 config.<环境>.yaml，环境名取自环境变量TEST_ENV或default_environment
+        platform     平台下发的配置
+        cli          命令行覆盖项（apply_overrides）
+        updates      运行时通过update_config做的修改，save_config时与配置文件内容合并写回
+    合并结果展开为点号分隔的键索引，get_value直接查表；配置文件的mtime变化且内容哈希不同时自动重新加载。
+    实例在进程内共享，get_value默认返回缓存的值，调用方需要修改返回的字典或列表时传入copy_value=True，
+    修改配置需通过update_config/set_layer
+    """
+
+    _instances: Dict[str, "ConfigLoader"] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, config_path: str = "Resources/config/config.yaml"):
+        key = os.path.abspath(config_path)
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance._initialized = False
+                cls._instances[key] = instance
+            return instance
+
     def __init__(self, config_path: str = "Resources/config/config.yaml"):
+        if self._initialized:
+            return
         self.config_path = config_path
         self.config: Dict[str, Any] = {}
+        self._layers: Dict[str, Dict[str, Any]] = {layer: {} for layer in LAYERS}
+        self._index: Dict[str, Any] = {}
+        self._file_state: Dict[str, Tuple[int, int, str]] = {}
+        self._warned: set = set()
+        self._lock = threading.RLock()
+        self._next_check = 0.0
         self.load_config()
+        self._initialized = True
+
+    @classmethod
+    def reset_instances(cls) -> None:
+        """清除全部共享实例，下次构造时重新读取配置文件"""
+        with cls._instances_lock:
+            cls._instances.clear()
 
     def load_config(self) -> None:
         """加载配置文件"""
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+            with self._lock:
+                self._layers['base'] = self._read_yaml(self.config_path) or {}
+                env_path = self._environment_path()
+                self._layers['environment'] = (self._read_yaml(env_path) or {}) if env_path else {}
+                self._rebuild()
+                self._next_check = time.monotonic() + RELOAD_CHECK_INTERVAL
             logger.info(f"配置文件加载成功: {self.config_path}")
         except Exception as e:
             logger.error(f"加载配置文件失败: {str(e)}")
             raise
 
-    def get_value(self, key: str, default: Any = None) -> Any:
+    def _environment_path(self) -> Optional[str]:
+        env = os.environ.get('TEST_ENV') or self._layers['base'].get('default_environment')
+        if not env:
+            return None
+        root, ext = os.path.splitext(self.config_path)
+        path = f"{root}.{env}{ext}"
+        return path if os.path.exists(path) else None
+
+    def _read_yaml(self, path: str) -> Any:
+        """读取YAML文件并记录文件状态，用于判断是否需要重新加载"""
+        with open(path, 'rb') as f:
+            content = f.read()
+        stat = os.stat(path)
+        digest = hashlib.sha256(content).hexdigest()
+        self._file_state[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return load_yaml_bytes(content, digest)
+
+    def _rebuild(self) -> None:
+        """合并各层配置并重建键索引"""
+        merged: Dict[str, Any] = {}
+        for layer in LAYERS:
+            merged = self.merge_configs(merged, self._layers[layer])
+        index: Dict[str, Any] = {}
+        self._flatten(merged, "", index)
+        self.config = merged
+        # 整体替换索引，读取时不需要加锁
+        self._index = index
+        self._warned = set()
+
+    @staticmethod
+    def _flatten(value: Dict[str, Any], prefix: str, index: Dict[str, Any]) -> None:
+        for k, v in value.items():
+            key = f"{prefix}{k}"
+            index[key] = v
+            if isinstance(v, dict):
+                ConfigLoader._flatten(v, f"{key}.", index)
+
+    def _check_reload(self) -> None:
+        """按固定间隔检查配置文件，mtime或大小变化且内容哈希不同时重新加载"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + RELOAD_CHECK_INTERVAL
+            changed = False
+            for path, (mtime, size, digest) in list(self._file_state.items()):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if (stat.st_mtime_ns, stat.st_size) == (mtime, size):
+                    continue
+                with open(path, 'rb') as f:
+                    content_digest = hashlib.sha256(f.read()).hexdigest()
+                self._file_state[path] = (stat.st_mtime_ns, stat.st_size, content_digest)
+                changed = changed or content_digest != digest
+            if changed:
+                logger.info(f"配置文件已变化，重新加载: {self.config_path}")
+                self.load_config()
+
+    def get_value(self, key: str, default: Any = None, copy_value: bool = False) -> Any:
         """
         获取配置值
         :param key: 配置键，支持点号分隔的多级键
         :param default: 默认值
+        :param copy_value: 是否返回字典和列表的副本，返回值会被修改时使用
         :return: 配置值
         """
-        try:
-            value = self.config
-            for k in key.split('.'):
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            logger.warning(f"配置项不存在: {key}，使用默认值: {default}")
+        self._check_reload()
+        value = self._index.get(key, _MISSING)
+        if value is _MISSING:
+            # 同一个缺失的键只提示一次
+            if key not in self._warned:
+                self._warned.add(key)
+                logger.warning(f"配置项不存在: {key}，使用默认值: {default}")
             return default
+        if copy_value and isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
 
     def get_environment_config(self, env: str = None) -> Dict[str, Any]:
         """
         获取环境配置
         :param env: 环境名称，如果为None则使用配置文件中的默认环境
-        :return: 环境配置字典
+        :return: 环境配置字典的副本
         """
         if env is None:
             env = self.get_value('default_environment', 'dev')
-        
-        env_config = self.get_value(f'environments.{env}', {})
+
+        env_config = self.get_value(f'environments.{env}', {}, copy_value=True)
         if not env_config:
             logger.warning(f"环境配置不存在: {env}，使用空配置")
         return env_config
 
+    def set_layer(self, layer: str, values: Dict[str, Any], merge: bool = False) -> None:
+        """
+        设置某一层的配置
+        :param layer: 配置层 environment/platform/cli
+        :param values: 配置内容
+        :param merge: 是否与该层原有内容合并，默认替换
+        """
+        if layer not in LAYERS or layer in _PROTECTED_LAYERS:
+            raise ValueError(f"不支持的配置层: {layer}")
+        with self._lock:
+            self._layers[layer] = self.merge_configs(self._layers[layer], values or {}) if merge else (values or {})
+            self._rebuild()
+
+    def apply_overrides(self, overrides: List[str]) -> None:
+        """
+        应用命令行形式的覆盖项，如 ["test.max_workers=8", "api.timeout=60"]，值按YAML语法解析
+        :param overrides: 覆盖项列表
+        """
+        with self._lock:
+            for item in overrides:
+                key, sep, raw = item.partition('=')
+                if not sep or not key.strip():
+                    raise ValueError(f"配置覆盖项格式应为 key=value: {item}")
+                self._set_nested(self._layers['cli'], key.strip(), yaml.safe_load(raw))
+            self._rebuild()
+
+    @staticmethod
+    def _set_nested(target: Dict[str, Any], key: str, value: Any) -> None:
+        keys = key.split('.')
+        for k in keys[:-1]:
+            if not isinstance(target.get(k), dict):
+                target[k] = {}
+            target = target[k]
+        target[keys[-1]] = value
+
     def update_config(self, key: str, value: Any) -> None:
         """
-        更新配置值
+        更新配置值，修改优先于其他各层，调用save_config时写入配置文件
         :param key: 配置键
         :param value: 配置值
         """
         try:
-            keys = key.split('.')
-            current = self.config
-            for k in keys[:-1]:
-                current = current.setdefault(k, {})
-            current[keys[-1]] = value
+            with self._lock:
+                self._set_nested(self._layers['updates'], key, value)
+                self._rebuild()
             logger.info(f"配置已更新: {key} = {value}")
         except Exception as e:
             logger.error(f"更新配置失败: {str(e)}")
@@ -68,13 +226,16 @@ class ConfigLoader:
 
     def save_config(self, config_path: Optional[str] = None) -> None:
         """
-        保存配置到文件
+        保存配置到文件，保存配置文件本身的内容（base层）和update_config的修改，
+        环境、平台和命令行层可能包含密钥和临时覆盖项，不写入文件
         :param config_path: 配置文件路径，如果为None则使用当前配置文件路径
         """
         try:
             save_path = config_path or self.config_path
+            with self._lock:
+                base = copy.deepcopy(self.merge_configs(self._layers['base'], self._layers['updates']))
             with open(save_path, 'w', encoding='utf-8') as f:
-                yaml.safe_dump(self.config, f, allow_unicode=True)
+                yaml.safe_dump(base, f, allow_unicode=True)
             logger.info(f"配置已保存到: {save_path}")
         except Exception as e:
             logger.error(f"保存配置失败: {str(e)}")
@@ -94,4 +255,4 @@ class ConfigLoader:
                 result[key] = ConfigLoader.merge_configs(result[key], value)
             else:
                 result[key] = value
-        return result 
\ No newline at end of file
+        return result
\ No newline at end of file
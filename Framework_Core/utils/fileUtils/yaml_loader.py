@@ -0,0 +1,90 @@
+import os
+import marshal
+import hashlib
+from typing import Any, Optional, Union
+import yaml
+from loguru import logger
+
+# 优先使用libyaml的C实现，未编译libyaml时退回纯Python实现
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# 解析结果缓存目录，可通过环境变量YAML_CACHE_DIR修改，设为空字符串可关闭缓存
+DEFAULT_CACHE_DIR = '.cache/yaml'
+# 缓存键中包含解析器、PyYAML和marshal格式的版本，升级后旧缓存自动失效
+_CACHE_SALT = f"{SafeLoader.__name__}|{yaml.__version__}|{marshal.version}".encode('utf-8')
+
+
+def cache_dir() -> str:
+    """
+    获取解析结果缓存目录，每次使用时读取环境变量
+    :return: 缓存目录，为空表示关闭缓存
+    """
+    return os.environ.get('YAML_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+
+def load_yaml(path: str) -> Any:
+    """
+    读取并解析YAML文件
+    :param path: 文件路径
+    :return: 解析结果
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    return load_yaml_bytes(content)
+
+
+def load_yaml_bytes(content: Union[bytes, str], digest: Optional[str] = None) -> Any:
+    """
+    解析YAML内容，相同内容的解析结果按哈希缓存在磁盘上，多个进程和xdist worker共享；
+    缓存使用marshal格式，只包含普通的数据类型，读取缓存不会执行任何代码，含日期等marshal不支持的类型时不缓存
+    :param content: YAML内容
+    :param digest: 内容的sha256，调用方已经计算过时可直接传入
+    :return: 解析结果，每次调用返回新的对象
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    directory = cache_dir()
+    if not directory:
+        return yaml.load(content, Loader=SafeLoader)
+
+    key = hashlib.sha256(_CACHE_SALT + (digest or hashlib.sha256(content).hexdigest()).encode('utf-8')).hexdigest()
+    cache_path = os.path.join(directory, key[:2], f"{key}.marshal")
+    try:
+        with open(cache_path, 'rb') as f:
+            return marshal.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"YAML缓存损坏，重新解析: {cache_path}, {str(e)}")
+
+    data = yaml.load(content, Loader=SafeLoader)
+    _write_cache(cache_path, data)
+    return data
+
+
+def _write_cache(cache_path: str, data: Any) -> None:
+    """先写临时文件再替换，并发写入同一个键时读取方不会读到不完整的文件"""
+    try:
+        payload = marshal.dumps(data)
+    except ValueError:
+        # 含有日期等marshal不支持的类型
+        return
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"写入YAML缓存失败: {str(e)}")
+
+
+def clear_cache() -> None:
+    """删除全部YAML解析缓存"""
+    directory = cache_dir()
+    if not directory or not os.path.isdir(directory):
+        return
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith('.marshal'):
+                os.unlink(os.path.join(root, name))
@@ -1,58 +1,256 @@
 import os
 import sys
-from datetime import datetime
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from loguru import logger
 
+CONSOLE_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+# 用例级缓存的日志级别，低于该级别的日志在用例执行期间先缓存
+BUFFER_BELOW_LEVEL = 20  # INFO
+# 配置文件中没有logging配置时使用的默认值
+DEFAULT_LOG_CONFIG = {
+    'level': 'INFO',
+    'console_level': 'INFO',
+    'file': 'logs/test_execution.log',
+    'max_size': '500 MB',
+    'backup_count': 5,
+    'enqueue': False,
+}
+
+
+class _DebugBuffer:
+    """
+    当前用例的调试日志缓存
+    只保存记录的字段，写入文件时才格式化；用例内的并发请求线程共享同一个缓存
+    """
+
+    def __init__(self, max_records: int = 5000):
+        self.max_records = max_records
+        self.active = False
+        self.nodeid = None
+        self.records: List[Tuple] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def begin(self, nodeid: str) -> None:
+        with self._lock:
+            self.active = True
+            self.nodeid = nodeid
+            self.records = []
+            self.dropped = 0
+
+    def end(self) -> Tuple[List[Tuple], int]:
+        with self._lock:
+            records, dropped = self.records, self.dropped
+            self.active = False
+            self.records = []
+            self.dropped = 0
+            return records, dropped
+
+    def accepts(self, record) -> bool:
+        return self.active and record["level"].no < BUFFER_BELOW_LEVEL and not record["extra"].get("replay")
+
+    def write(self, message) -> None:
+        record = message.record
+        with self._lock:
+            if not self.active:
+                return
+            if len(self.records) >= self.max_records:
+                # 只保留最近的记录，失败前的调试信息通常最有用
+                self.records.pop(0)
+                self.dropped += 1
+            self.records.append((record["time"], record["level"].name, record["name"],
+                                 record["function"], record["line"], record["message"]))
+
+
 class TestLogger:
-    def __init__(self):
-        self.log_path = "logs"
-        if not os.path.exists(self.log_path):
-            os.makedirs(self.log_path)
-        
-        # 移除默认的处理器
-        logger.remove()
-        
-        # 添加控制台输出处理器
-        logger.add(
-            sys.stdout,
-            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-            level="INFO"
-        )
-        
-        # 添加文件处理器
-        log_file = os.path.join(self.log_path, f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-        logger.add(
-            log_file,
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-            level="DEBUG",
-            rotation="500 MB",
-            retention="10 days"
-        )
+    """
+    测试日志
+    框架内唯一的日志入口，第一次记录日志或调用setup时才按config.yaml的logging配置添加处理器:
+        level         文件日志级别
+        console_level 控制台日志级别
+        file          日志文件，pytest-xdist的worker写入各自的文件，如 logs/test_execution.gw0.log
+        max_size      单个日志文件的最大大小，超出后轮转
+        backup_count  保留的日志文件数
+        enqueue       是否异步写入，开启后控制台和文件由后台线程写出，记录日志的线程不等待IO
+    """
+
+    def __init__(self, log_config: Optional[Dict[str, Any]] = None):
+        """
+        :param log_config: 日志配置，为空时读取config.yaml的logging配置
+        """
+        self.log_config = log_config
+        self.log_file: Optional[str] = None
+        self.buffer_debug = False
+        self._buffer = _DebugBuffer()
+        self._buffer_handler = None
+        self._configured = False
+        self._setup_lock = threading.Lock()
+
+    def setup(self, log_config: Optional[Dict[str, Any]] = None, force: bool = False) -> None:
+        """
+        添加日志处理器，重复调用时不会重复添加
+        :param log_config: 日志配置，为空时使用构造时传入的配置或config.yaml的logging配置
+        :param force: 是否按新配置重新添加处理器
+        """
+        if self._configured and not force:
+            return
+        with self._setup_lock:
+            if self._configured and not force:
+                return
+            config = dict(DEFAULT_LOG_CONFIG)
+            config.update(log_config or self.log_config or self._load_config())
+            self.log_config = config
+            self.log_file = worker_log_file(config['file'])
+            log_dir = os.path.dirname(self.log_file)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+
+            # 移除默认的处理器和之前添加的处理器
+            logger.remove()
+            self._buffer_handler = None
+
+            # 添加控制台输出处理器
+            logger.add(
+                sys.stdout,
+                format=CONSOLE_FORMAT,
+                level=config['console_level'],
+                filter=lambda record: not record["extra"].get("replay"),
+                enqueue=config['enqueue']
+            )
+
+            # 添加文件处理器
+            logger.add(
+                self.log_file,
+                format=FILE_FORMAT,
+                level=config['level'],
+                filter=self._file_filter,
+                rotation=str(config['max_size']),
+                retention=int(config['backup_count']),
+                encoding="utf-8",
+                enqueue=config['enqueue']
+            )
+            self._configured = True
+            if self.buffer_debug:
+                self.buffer_debug = False
+                self.set_buffer_debug(True)
 
     @staticmethod
-    def info(msg: str, *args, **kwargs):
+    def _load_config() -> Dict[str, Any]:
+        """读取config.yaml中的logging配置，配置文件不存在时使用默认配置"""
+        try:
+            from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
+            return ConfigLoader().get_value('logging', {}) or {}
+        except Exception:
+            return {}
+
+    def _ensure_setup(self) -> None:
+        if not self._configured:
+            self.setup()
+
+    def set_buffer_debug(self, enabled: bool) -> None:
+        """
+        开启或关闭按用例缓存调试日志，开启后低于INFO的日志只在用例失败时写入文件
+        关闭时不注册缓存处理器，文件级别高于DEBUG时调试日志在记录前就被丢弃，参数不会被格式化
+        :param enabled: 是否开启
+        """
+        self._ensure_setup()
+        if enabled and self._buffer_handler is None:
+            # 缓存处理器只做列表追加，同步执行，保证用例结束时缓存已完整
+            self._buffer_handler = logger.add(self._buffer.write, format="{message}", level="DEBUG",
+                                              filter=self._buffer.accepts)
+        elif not enabled and self._buffer_handler is not None:
+            logger.remove(self._buffer_handler)
+            self._buffer_handler = None
+        self.buffer_debug = enabled
+
+    def _file_filter(self, record) -> bool:
+        if record["extra"].get("replay"):
+            return True
+        return not (self.buffer_debug and self._buffer.accepts(record))
+
+    def begin_test(self, nodeid: str) -> None:
+        """
+        开始缓存当前用例的调试日志
+        :param nodeid: 用例ID
+        """
+        if self.buffer_debug:
+            self._buffer.begin(nodeid)
+
+    def end_test(self, failed: bool) -> None:
+        """
+        结束当前用例，用例失败时把缓存的调试日志写入文件，否则丢弃
+        :param failed: 用例是否失败
+        """
+        if not self.buffer_debug:
+            return
+        nodeid = self._buffer.nodeid
+        records, dropped = self._buffer.end()
+        if not failed or not records:
+            return
+        lines = [f"---- 失败用例的调试日志: {nodeid}" + (f"（已丢弃较早的 {dropped} 条）" if dropped else "") + " ----"]
+        for time, level, name, function, line, message in records:
+            lines.append(f"{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}")
+        # 按文件日志级别写出，文件级别高于DEBUG时失败用例的调试日志也能写入
+        logger.bind(replay=True).opt(raw=True).log(self.log_config['level'], "\n".join(lines) + "\n")
+
+    def info(self, msg: str, *args, lazy: bool = False, **kwargs):
         """记录信息级别日志"""
-        logger.info(msg, *args, **kwargs)
+        self._ensure_setup()
+        logger.opt(depth=1, lazy=lazy).info(msg, *args, **kwargs)
 
-    @staticmethod
-    def debug(msg: str, *args, **kwargs):
-        """记录调试级别日志"""
-        logger.debug(msg, *args, **kwargs)
+    def debug(self, msg: str, *args, lazy: bool = False, **kwargs):
+        """
+        记录调试级别日志
+        消息使用 {} 占位符并把参数单独传入，日志级别未开启时不会格式化；
+        lazy为True时参数可以是无参函数，只在需要输出时调用，如 debug("响应: {}", lambda: response.text, lazy=True)
+        """
+        self._ensure_setup()
+        logger.opt(depth=1, lazy=lazy).debug(msg, *args, **kwargs)
 
-    @staticmethod
-    def warning(msg: str, *args, **kwargs):
+    def warning(self, msg: str, *args, lazy: bool = False, **kwargs):
         """记录警告级别日志"""
-        logger.warning(msg, *args, **kwargs)
+        self._ensure_setup()
+        logger.opt(depth=1, lazy=lazy).warning(msg, *args, **kwargs)
 
-    @staticmethod
-    def error(msg: str, *args, **kwargs):
+    def error(self, msg: str, *args, lazy: bool = False, **kwargs):
         """记录错误级别日志"""
-        logger.error(msg, *args, **kwargs)
+        self._ensure_setup()
+        logger.opt(depth=1, lazy=lazy).error(msg, *args, **kwargs)
 
-    @staticmethod
-    def exception(msg: str, *args, **kwargs):
+    def exception(self, msg: str, *args, **kwargs):
         """记录异常信息"""
-        logger.exception(msg, *args, **kwargs)
+        self._ensure_setup()
+        logger.opt(depth=1, exception=True).error(msg, *args, **kwargs)
+
+    @staticmethod
+    def complete() -> None:
+        """等待异步写入的日志全部写出"""
+        logger.complete()
+
+
+def worker_log_file(path: str) -> str:
+    """
+    获取当前进程的日志文件，pytest-xdist的worker在文件名中加上worker编号，避免多个进程写同一个文件
+    :param path: 配置的日志文件路径
+    :return: 日志文件路径
+    """
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    if not worker:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker}{ext}"
+
+
+def setup_logging(log_config: Optional[Dict[str, Any]] = None, force: bool = False) -> None:
+    """
+    初始化日志，重复调用时不会重复添加处理器
+    :param log_config: 日志配置，为空时读取config.yaml的logging配置
+    :param force: 是否按新配置重新添加处理器
+    """
+    test_logger.setup(log_config, force)
+
 
-# 创建全局日志记录器实例
-test_logger = TestLogger() 
\ No newline at end of file
+# 全局日志记录器实例，导入时不添加处理器
+test_logger = TestLogger()
\ No newline at end of file
@@ -0,0 +1,362 @@
+import os
+import io
+import gzip
+import json
+import time
+import queue
+import hashlib
+import tarfile
+import tempfile
+import threading
+from typing import Dict, Any, BinaryIO, Iterator, Optional, Tuple
+import requests
+from loguru import logger
+from .report_queue import is_retryable, retry_delay
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_STATE_DIR = ".upload_state"
+# 打包线程最多领先上传的块数，限制内存占用
+_MAX_BUFFERED_CHUNKS = 2
+_END = object()
+
+
+class _ChunkWriter(io.RawIOBase):
+    """把写入的数据切成固定大小的块放入有界队列，供上传线程读取"""
+
+    def __init__(self, chunks: "queue.Queue", chunk_size: int, cancelled: threading.Event):
+        self._chunks = chunks
+        self._chunk_size = chunk_size
+        self._cancelled = cancelled
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self._chunk_size:
+            self._put(bytes(self._buffer[:self._chunk_size]))
+            del self._buffer[:self._chunk_size]
+        return len(data)
+
+    def finish(self) -> None:
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def _put(self, chunk: bytes) -> None:
+        while not self._cancelled.is_set():
+            try:
+                self._chunks.put(chunk, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise IOError("上传已取消")
+
+
+def _tar_filter(info: tarfile.TarInfo) -> tarfile.TarInfo:
+    # 去掉属主信息，同一目录重复打包得到相同的字节流，断点续传时才能比对分块校验和
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
+
+
+def _pack_directory(path: str, writer: _ChunkWriter) -> None:
+    """以流的方式把目录打包为tar.gz，gzip头中的时间固定为0"""
+    with gzip.GzipFile(fileobj=writer, mode='wb', mtime=0, compresslevel=6) as gz:
+        with tarfile.open(fileobj=gz, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+            base = os.path.basename(os.path.normpath(path))
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    full_path = os.path.join(root, name)
+                    arcname = os.path.join(base, os.path.relpath(full_path, path))
+                    tar.add(full_path, arcname=arcname, recursive=False, filter=_tar_filter)
+    writer.finish()
+
+
+def iter_artifact_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    逐块读取产物，目录在后台线程中边打包边输出，不会把整个压缩包放入内存或写临时文件
+    :param path: 文件或目录路径
+    :param chunk_size: 块大小
+    :return: 数据块迭代器
+    """
+    if not os.path.isdir(path):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                yield chunk
+        return
+
+    chunks: "queue.Queue" = queue.Queue(maxsize=_MAX_BUFFERED_CHUNKS)
+    cancelled = threading.Event()
+    errors = []
+
+    def produce():
+        try:
+            _pack_directory(path, _ChunkWriter(chunks, chunk_size, cancelled))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            while not cancelled.is_set():
+                try:
+                    chunks.put(_END, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    producer = threading.Thread(target=produce, name="artifact-packer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _END:
+                break
+            yield chunk
+        if errors:
+            raise errors[0]
+    finally:
+        cancelled.set()
+        producer.join()
+
+
+class _MultipartBody:
+    """
+    multipart/form-data请求体，文件内容在发送时才从文件中读取
+    提供len属性，requests据此设置Content-Length并按块读取发送，不会把整个文件读入内存
+    """
+
+    def __init__(self, fields: Dict[str, Any], filename: str, content_type: str, fileobj: BinaryIO):
+        """
+        :param fields: 表单字段
+        :param filename: 文件名，对应file字段
+        :param content_type: 文件的Content-Type
+        :param fileobj: 从当前位置读到末尾的文件对象
+        """
+        boundary = os.urandom(16).hex()
+        head = b''.join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n{value}\r\n'.encode('utf-8')
+            for name, value in fields.items() if value is not None
+        )
+        head += (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{_quote(filename)}"\r\n'
+                 f'Content-Type: {content_type}\r\n\r\n').encode('utf-8')
+        tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        position = fileobj.tell()
+        size = fileobj.seek(0, os.SEEK_END) - position
+        fileobj.seek(position)
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        self.len = len(head) + size + len(tail)
+        self._parts = [io.BytesIO(head), fileobj, io.BytesIO(tail)]
+
+    def read(self, size: int = -1) -> bytes:
+        data = b''
+        while self._parts and (size < 0 or len(data) < size):
+            chunk = self._parts[0].read(-1 if size < 0 else size - len(data))
+            if chunk:
+                data += chunk
+            else:
+                self._parts.pop(0)
+        return data
+
+
+def _quote(value: str) -> str:
+    return value.replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+
+def artifact_name(path: str) -> Tuple[str, str]:
+    """
+    获取上传的文件名和内容类型
+    :param path: 文件或目录路径
+    :return: (文件名, Content-Type)
+    """
+    name = os.path.basename(os.path.normpath(path))
+    if os.path.isdir(path):
+        return f"{name}.tar.gz", "application/gzip"
+    return name, "application/octet-stream"
+
+
+class ChunkedUploader:
+    """
+    分块上传产物
+    协议:
+        POST {base_url}/api/reports/uploads                      创建上传，返回upload_id
+        GET  {base_url}/api/reports/uploads/{id}                 查询已接收的块
+        PUT  {base_url}/api/reports/uploads/{id}/chunks/{index}  上传一块，请求头带X-Chunk-SHA256
+        POST {base_url}/api/reports/uploads/{id}/complete        提交，带总大小和整体sha256
+    每块成功后记录到本地状态文件，中断后再次上传同一产物时跳过服务端已接收且校验和一致的块；
+    平台不支持分块接口时退回到原有的 POST {base_url}/api/reports multipart表单上传（file字段和type等表单字段）
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        base_url: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 60,
+        state_dir: str = DEFAULT_STATE_DIR
+    ):
+        """
+        :param session: 复用连接的会话
+        :param base_url: 平台地址
+        :param chunk_size: 块大小
+        :param max_retries: 单块最大重试次数
+        :param backoff: 首次重试的等待时间（秒）
+        :param max_backoff: 最大等待时间（秒）
+        :param timeout: 单次请求超时时间（秒）
+        :param state_dir: 断点续传状态目录
+        """
+        self.session = session
+        self.base_url = base_url
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.state_dir = state_dir
+
+    def upload(self, path: str, artifact_type: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        上传文件或目录
+        :param path: 文件或目录路径
+        :param artifact_type: 产物类型
+        :param metadata: 附加信息，如execution_id
+        :return: 上传结果
+        """
+        filename, content_type = artifact_name(path)
+        state_path = self._state_path(path, artifact_type)
+        state = self._load_state(state_path)
+        upload_id, received = self._open_upload(state, filename, content_type, artifact_type, metadata)
+        if upload_id is None:
+            return self._form_upload(path, filename, content_type, artifact_type, metadata)
+
+        state = {'upload_id': upload_id, 'chunk_size': self.chunk_size, 'chunks': state.get('chunks', {})
+                 if state.get('upload_id') == upload_id else {}}
+        digest = hashlib.sha256()
+        size, index, skipped = 0, 0, 0
+        for index, chunk in enumerate(iter_artifact_chunks(path, self.chunk_size)):
+            checksum = hashlib.sha256(chunk).hexdigest()
+            digest.update(chunk)
+            size += len(chunk)
+            if index in received and state['chunks'].get(str(index)) == checksum:
+                skipped += 1
+                continue
+            self._with_retry(self._put_chunk, upload_id, index, chunk, checksum)
+            state['chunks'][str(index)] = checksum
+            self._save_state(state_path, state)
+
+        total = index + 1 if size else 0
+        result = self._with_retry(self._complete, upload_id, {
+            'chunks': total,
+            'size': size,
+            'sha256': digest.hexdigest()
+        })
+        self._remove_state(state_path)
+        logger.info(f"产物上传完成: {filename}, {size} 字节, {total} 块, 续传跳过 {skipped} 块")
+        return result
+
+    def _open_upload(self, state: Dict[str, Any], filename: str, content_type: str,
+                     artifact_type: str, metadata: Optional[Dict[str, Any]]) -> Tuple[Optional[str], set]:
+        """复用未完成的上传或创建新的上传，平台不支持分块接口时返回None"""
+        if state.get('upload_id') and state.get('chunk_size') == self.chunk_size:
+            response = self.session.get(f"{self.base_url}/api/reports/uploads/{state['upload_id']}",
+                                        timeout=self.timeout)
+            if response.ok:
+                logger.info(f"继续未完成的上传: {filename}")
+                return state['upload_id'], set(response.json().get('received', []))
+
+        payload = {'filename': filename, 'content_type': content_type, 'type': artifact_type,
+                   'chunk_size': self.chunk_size, **(metadata or {})}
+        response = self._with_retry(self.session.post, f"{self.base_url}/api/reports/uploads",
+                                    json=payload, timeout=self.timeout)
+        if response.status_code in (404, 405):
+            return None, set()
+        response.raise_for_status()
+        return response.json()['upload_id'], set()
+
+    def _put_chunk(self, upload_id: str, index: int, chunk: bytes, checksum: str) -> None:
+        response = self.session.put(
+            f"{self.base_url}/api/reports/uploads/{upload_id}/chunks/{index}",
+            data=chunk,
+            headers={'Content-Type': 'application/octet-stream', 'X-Chunk-SHA256': checksum},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+
+    def _complete(self, upload_id: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+        response = self.session.post(f"{self.base_url}/api/reports/uploads/{upload_id}/complete",
+                                     json=summary, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    def _form_upload(self, path: str, filename: str, content_type: str,
+                     artifact_type: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """以multipart表单一次性上传，不支持断点续传；目录先打包到临时文件"""
+        logger.warning("平台不支持分块上传，使用表单上传")
+        fields = {'type': artifact_type, **(metadata or {})}
+        if os.path.isdir(path):
+            with tempfile.TemporaryFile() as f:
+                for chunk in iter_artifact_chunks(path, self.chunk_size):
+                    f.write(chunk)
+                result = self._with_retry(self._post_form, f, fields, filename, content_type)
+        else:
+            with open(path, 'rb') as f:
+                result = self._with_retry(self._post_form, f, fields, filename, content_type)
+        logger.info(f"产物上传完成: {filename}")
+        return result
+
+    def _post_form(self, fileobj: BinaryIO, fields: Dict[str, Any], filename: str, content_type: str) -> Dict[str, Any]:
+        fileobj.seek(0)
+        body = _MultipartBody(fields, filename, content_type, fileobj)
+        response = self.session.post(
+            f"{self.base_url}/api/reports",
+            data=body,
+            headers={'Content-Type': body.content_type},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    def _with_retry(self, func, *args, **kwargs) -> Any:
+        """执行请求，可重试的错误按指数退避重试"""
+        attempt = 0
+        while True:
+            try:
+                result = func(*args, **kwargs)
+                if isinstance(result, requests.Response) and result.status_code >= 500:
+                    result.raise_for_status()
+                return result
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries or not is_retryable(e):
+                    raise
+                delay = retry_delay(e, attempt, self.backoff, self.max_backoff)
+                logger.warning(f"上传请求失败，{delay:.1f}秒后第{attempt}次重试: {str(e)}")
+                time.sleep(delay)
+
+    def _state_path(self, path: str, artifact_type: str) -> str:
+        key = hashlib.sha256(f"{os.path.abspath(path)}|{artifact_type}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.state_dir, f"{key}.json")
+
+    @staticmethod
+    def _load_state(state_path: str) -> Dict[str, Any]:
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_state(state_path: str, state: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    @staticmethod
+    def _remove_state(state_path: str) -> None:
+        if os.path.exists(state_path):
+            os.unlink(state_path)
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+from loguru import logger
+
+DEFAULT_CACHE_DIR = ".cache/platform"
+DEFAULT_TTL = 300
+# 锁文件超过该时间仍未释放视为持有进程已退出
+_STALE_LOCK_SECONDS = 30
+
+
+class _FileLock:
+    """基于O_EXCL创建锁文件的跨进程锁，xdist的多个worker同时启动时只有一个去请求平台"""
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._fd = None
+
+    def __enter__(self) -> "_FileLock":
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > _STALE_LOCK_SECONDS:
+                        os.unlink(self.path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    # 等待超时时不再等待，直接请求
+                    logger.warning(f"等待缓存锁超时: {self.path}")
+                    return self
+                time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+class EnvironmentCache:
+    """
+    平台数据的磁盘缓存
+    每个键保存为一个JSON文件，记录数据、ETag和获取时间；在TTL内直接使用缓存，过期后携带
+    If-None-Match重新验证，平台返回304时只刷新获取时间；平台不可用时退回到过期的缓存。
+    环境数据通常包含token和数据库密码，缓存目录和文件只允许当前用户读写
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL):
+        """
+        :param cache_dir: 缓存目录
+        :param ttl: 缓存有效期（秒），0表示每次都重新验证
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存条目
+        :param key: 缓存键
+        :return: 包含data/etag/fetched_at的条目，不存在时返回None
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None and self.is_fresh(entry):
+            return entry
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return entry
+        if entry.get('key') != key:
+            return None
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def save(self, key: str, data: Any, etag: Optional[str] = None) -> Dict[str, Any]:
+        """
+        写入缓存条目
+        :param key: 缓存键
+        :param data: 数据
+        :param etag: 平台返回的ETag
+        :return: 缓存条目
+        """
+        entry = {'key': key, 'data': data, 'etag': etag, 'fetched_at': time.time()}
+        with self._lock:
+            self._memory[key] = entry
+        try:
+            self._make_dir()
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with os.fdopen(os.open(tmp_path, os.O_CREAT | os.O_TRUNC | os.O_WRONLY, 0o600), 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入平台缓存失败: {str(e)}")
+        return entry
+
+    def _make_dir(self) -> None:
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get('fetched_at', 0) < self.ttl
+
+    def get_or_fetch(self, key: str, fetch: Callable[[Optional[str]], Tuple[int, Any, Optional[str]]]) -> Any:
+        """
+        获取缓存数据，过期时调用fetch重新验证
+        :param key: 缓存键
+        :param fetch: 请求函数，参数为缓存的ETag，返回 (状态码, 数据, ETag)，状态码304表示未变化
+        :return: 数据
+        """
+        entry = self.load(key)
+        if entry is not None and self.is_fresh(entry):
+            return entry['data']
+
+        self._make_dir()
+        with _FileLock(f"{self._path(key)}.lock"):
+            # 等锁期间其他进程可能已经刷新了缓存
+            entry = self.load(key)
+            if entry is not None and self.is_fresh(entry):
+                return entry['data']
+            try:
+                status, data, etag = fetch(entry.get('etag') if entry else None)
+            except Exception as e:
+                if entry is None:
+                    raise
+                logger.warning(f"请求平台失败，使用过期缓存: {key}, {str(e)}")
+                return entry['data']
+            if status == 304 and entry is not None:
+                return self.save(key, entry['data'], entry.get('etag'))['data']
+            return self.save(key, data, etag)['data']
+
+    def invalidate(self, key: str = None) -> None:
+        """
+        删除缓存
+        :param key: 缓存键，为空时删除全部
+        """
+        with self._lock:
+            if key is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(key, None)
+        if key is not None:
+            paths = [self._path(key)]
+        elif os.path.isdir(self.cache_dir):
+            paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+        else:
+            paths = []
+        for path in paths:
+            if os.path.exists(path):
+                os.unlink(path)
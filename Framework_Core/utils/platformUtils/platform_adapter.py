@@ -1,20 +1,63 @@
+import hashlib
 from typing import Dict, Any, List, Optional
 import requests
+from requests.adapters import HTTPAdapter
 from loguru import logger
-from .config_loader import ConfigLoader
+from .report_queue import ReportQueue
+from .artifact_upload import ChunkedUploader, DEFAULT_CHUNK_SIZE, DEFAULT_STATE_DIR
+from .env_cache import EnvironmentCache, DEFAULT_CACHE_DIR, DEFAULT_TTL
 
 class PlatformAdapter:
     def __init__(self, platform_config: Dict[str, Any]):
         """
         初始化平台适配器
-        :param platform_config: 平台配置
+        :param platform_config: 平台配置，reporting节点为后台上报队列的配置
         """
         self.config = platform_config
         self.base_url = platform_config.get('api_base_url', '')
+        self.timeout = platform_config.get('timeout', 30)
         self.headers = {
             'Content-Type': 'application/json',
             'Authorization': f"Bearer {platform_config.get('api_token', '')}"
         }
+        # 复用连接，避免每次请求重新建立TCP和TLS连接
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = self.headers['Authorization']
+        pool_size = platform_config.get('pool_size', 10)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._reporter: Optional[ReportQueue] = None
+        self._bulk_status = True
+        upload = platform_config.get('upload', {})
+        self.uploader = ChunkedUploader(
+            self.session,
+            self.base_url,
+            chunk_size=upload.get('chunk_size', DEFAULT_CHUNK_SIZE),
+            max_retries=upload.get('max_retries', 5),
+            timeout=upload.get('timeout', 60),
+            state_dir=upload.get('state_dir', DEFAULT_STATE_DIR)
+        )
+        # 环境变量和测试配置的磁盘缓存，xdist的多个worker共用
+        cache = platform_config.get('cache', {})
+        self.cache: Optional[EnvironmentCache] = None
+        if cache.get('enabled', True):
+            self.cache = EnvironmentCache(cache.get('dir', DEFAULT_CACHE_DIR), cache.get('ttl', DEFAULT_TTL))
+
+    @property
+    def reporter(self) -> ReportQueue:
+        """后台上报队列，首次使用时创建"""
+        if self._reporter is None:
+            reporting = self.config.get('reporting', {})
+            self._reporter = ReportQueue(
+                self._send_status_batch,
+                batch_size=reporting.get('batch_size', 200),
+                flush_interval=reporting.get('flush_interval', 1.0),
+                max_retries=reporting.get('max_retries', 5),
+                backoff=reporting.get('backoff', 0.5),
+                max_backoff=reporting.get('max_backoff', 30.0)
+            )
+        return self._reporter
 
     def upload_test_results(self, results: Dict[str, Any]) -> bool:
         """
@@ -24,7 +67,7 @@ class PlatformAdapter:
         """
         try:
             url = f"{self.base_url}/api/test-results"
-            response = requests.post(url, json=results, headers=self.headers)
+            response = self.session.post(url, json=results, timeout=self.timeout)
             response.raise_for_status()
             logger.info("测试结果上传成功")
             return True
@@ -41,7 +84,7 @@ class PlatformAdapter:
         """
         try:
             url = f"{self.base_url}/api/tests/{test_id}/status"
-            response = requests.put(url, json={'status': status}, headers=self.headers)
+            response = self.session.put(url, json={'status': status}, timeout=self.timeout)
             response.raise_for_status()
             logger.info(f"测试状态更新成功: {test_id} -> {status}")
             return True
@@ -49,6 +92,56 @@ class PlatformAdapter:
             logger.error(f"更新测试状态失败: {str(e)}")
             return False
 
+    def report_test_status(self, test_id: str, status: str, message: str = None) -> None:
+        """
+        异步上报测试状态，记录进入后台队列后立即返回
+        :param test_id: 测试ID
+        :param status: 测试状态
+        :param message: 状态信息
+        """
+        self.reporter.put(test_id, {'test_id': test_id, 'status': status, 'message': message})
+
+    def _send_status_batch(self, updates: List[Dict[str, Any]]) -> None:
+        """
+        批量发送测试状态，平台不支持批量接口时逐条发送
+        :param updates: 状态记录列表
+        """
+        if self._bulk_status:
+            response = self.session.post(f"{self.base_url}/api/tests/status/batch",
+                                         json={'updates': updates}, timeout=self.timeout)
+            if response.status_code not in (404, 405):
+                response.raise_for_status()
+                logger.info(f"批量更新测试状态成功: {len(updates)} 条")
+                return
+            logger.warning("平台不支持批量更新测试状态，改为逐条发送")
+            self._bulk_status = False
+        for update in updates:
+            response = self.session.put(f"{self.base_url}/api/tests/{update['test_id']}/status",
+                                        json={'status': update['status'], 'message': update['message']},
+                                        timeout=self.timeout)
+            response.raise_for_status()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        等待后台队列中的记录全部发送
+        :param timeout: 最长等待时间（秒）
+        :return: 是否全部发送完成
+        """
+        if self._reporter is None:
+            return True
+        return self._reporter.flush(timeout)
+
+    def close(self, timeout: float = 30.0) -> bool:
+        """
+        发送剩余记录并释放连接
+        :param timeout: 最长等待时间（秒）
+        :return: 是否全部发送完成
+        """
+        drained = self._reporter.close(timeout) if self._reporter is not None else True
+        self._reporter = None
+        self.session.close()
+        return drained
+
     def get_test_config(self, test_id: str) -> Optional[Dict[str, Any]]:
         """
         从平台获取测试配置
@@ -56,10 +149,7 @@ class PlatformAdapter:
         :return: 测试配置
         """
         try:
-            url = f"{self.base_url}/api/tests/{test_id}/config"
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(f"{self.base_url}/api/tests/{test_id}/config")
         except Exception as e:
             logger.error(f"获取测试配置失败: {str(e)}")
             return None
@@ -72,7 +162,7 @@ class PlatformAdapter:
         """
         try:
             url = f"{self.base_url}/api/test-cases/sync"
-            response = requests.post(url, json={'test_cases': test_cases}, headers=self.headers)
+            response = self.session.post(url, json={'test_cases': test_cases}, timeout=self.timeout)
             response.raise_for_status()
             logger.info("测试用例同步成功")
             return True
@@ -80,20 +170,17 @@ class PlatformAdapter:
             logger.error(f"同步测试用例失败: {str(e)}")
             return False
 
-    def upload_report(self, report_path: str, report_type: str = 'allure') -> bool:
+    def upload_report(self, report_path: str, report_type: str = 'allure', execution_id: str = None) -> bool:
         """
-        上传测试报告到平台
-        :param report_path: 报告文件路径
+        上传测试报告到平台，目录边打包为tar.gz边分块上传，中断后可续传
+        :param report_path: 报告文件或目录路径
         :param report_type: 报告类型
+        :param execution_id: 执行ID
         :return: 是否上传成功
         """
         try:
-            url = f"{self.base_url}/api/reports"
-            with open(report_path, 'rb') as f:
-                files = {'file': f}
-                data = {'type': report_type}
-                response = requests.post(url, files=files, data=data, headers=self.headers)
-            response.raise_for_status()
+            metadata = {'execution_id': execution_id} if execution_id else None
+            self.uploader.upload(report_path, report_type, metadata)
             logger.info("测试报告上传成功")
             return True
         except Exception as e:
@@ -114,7 +201,7 @@ class PlatformAdapter:
                 'status': status,
                 'message': message
             }
-            response = requests.put(url, json=data, headers=self.headers)
+            response = self.session.put(url, json=data, timeout=self.timeout)
             response.raise_for_status()
             logger.info(f"执行状态通知成功: {execution_id} -> {status}")
             return True
@@ -129,10 +216,27 @@ class PlatformAdapter:
         :return: 环境变量字典
         """
         try:
-            url = f"{self.base_url}/api/environments/{env}/variables"
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(f"{self.base_url}/api/environments/{env}/variables")
         except Exception as e:
             logger.error(f"获取环境变量失败: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+
+    def _get_json(self, url: str) -> Any:
+        """
+        GET请求JSON数据，开启缓存时在TTL内直接使用缓存，过期后按ETag重新验证
+        :param url: 请求地址
+        :return: 响应数据
+        """
+        def fetch(etag: Optional[str]):
+            headers = {'If-None-Match': etag} if etag else None
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                return 304, None, etag
+            response.raise_for_status()
+            return response.status_code, response.json(), response.headers.get('ETag')
+
+        if self.cache is None:
+            return fetch(None)[1]
+        # 缓存键区分平台凭据，不同项目或token请求同一接口时互不影响；缓存中只保存凭据的摘要
+        credential = hashlib.sha256(self.headers['Authorization'].encode('utf-8')).hexdigest()[:16]
+        return self.cache.get_or_fetch(f"{credential} {url}", fetch) 
\ No newline at end of file
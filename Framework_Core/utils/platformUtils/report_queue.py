@@ -0,0 +1,195 @@
+import time
+import random
+import atexit
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional
+import requests
+from loguru import logger
+
+# 可重试的HTTP状态码
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# 未关闭的上报队列，进程退出时统一关闭；只保存弱引用，关闭后的队列可以被回收
+_open_queues: "weakref.WeakSet[ReportQueue]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_queues() -> None:
+    for queue in list(_open_queues):
+        queue.close()
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    判断请求异常是否可以重试
+    :param error: 请求异常
+    :return: 连接错误、超时以及429/5xx等状态码返回True
+    """
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def retry_delay(error: Exception, attempt: int, backoff: float, max_backoff: float) -> float:
+    """
+    计算重试等待时间：指数退避加随机抖动，服务端返回Retry-After时优先使用
+    :param error: 请求异常
+    :param attempt: 第几次重试，从1开始
+    :param backoff: 首次重试的等待时间（秒）
+    :param max_backoff: 最大等待时间（秒）
+    :return: 等待时间（秒）
+    """
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), max_backoff)
+    delay = min(backoff * (2 ** (attempt - 1)), max_backoff)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class ReportQueue:
+    """
+    后台上报队列
+    用例状态先写入内存缓冲，同一用例在一个批次内只保留最新状态；缓冲达到batch_size或距离第一条
+    未发送记录超过flush_interval时，由后台线程批量发送，失败按指数退避重试，调用方不会被网络请求阻塞
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[Dict[str, Any]]], None],
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0
+    ):
+        """
+        :param send_batch: 发送一批记录的函数，失败时抛出异常
+        :param batch_size: 每批最多发送的记录数
+        :param flush_interval: 最长缓冲时间（秒）
+        :param max_retries: 单批最大重试次数
+        :param backoff: 首次重试的等待时间（秒），之后逐次翻倍
+        :param max_backoff: 最大等待时间（秒）
+        """
+        self.send_batch = send_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sent = 0
+        self.dropped = 0
+        self._pending: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self._first_pending_at: Optional[float] = None
+        self._inflight = False
+        self._flush_requested = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="platform-report-queue", daemon=True)
+        self._thread.start()
+        _open_queues.add(self)
+
+    def put(self, key: Any, record: Dict[str, Any]) -> None:
+        """
+        加入一条待上报记录，相同key的未发送记录会被覆盖
+        :param key: 合并用的键，如用例ID
+        :param record: 上报内容
+        """
+        with self._condition:
+            if self._closed:
+                logger.warning(f"上报队列已关闭，丢弃记录: {key}")
+                return
+            self._pending.pop(key, None)
+            self._pending[key] = record
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即发送缓冲中的全部记录并等待完成
+        :param timeout: 最长等待时间（秒）
+        :return: 是否在超时前全部处理完成
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            try:
+                while self._pending or self._inflight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                return True
+            finally:
+                # 超时返回时同样恢复按批次和时间间隔发送
+                self._flush_requested = False
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        发送剩余记录并停止后台线程
+        :param timeout: 最长等待时间（秒）
+        :return: 是否全部发送完成
+        """
+        with self._condition:
+            if self._closed:
+                return True
+        drained = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        _open_queues.discard(self)
+        self._thread.join(timeout)
+        if not drained:
+            logger.warning(f"上报队列关闭时仍有 {len(self._pending)} 条记录未发送")
+        logger.info(f"上报队列已关闭: 发送 {self.sent} 条，丢弃 {self.dropped} 条")
+        return drained
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._pending and (self._flush_requested or len(self._pending) >= self.batch_size):
+                        break
+                    if self._pending:
+                        wait = self._first_pending_at + self.flush_interval - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+                if not self._pending:
+                    if self._closed:
+                        return
+                    continue
+                keys = list(self._pending)[:self.batch_size]
+                batch = [self._pending.pop(key) for key in keys]
+                self._first_pending_at = time.monotonic() if self._pending else None
+                self._inflight = True
+
+            try:
+                self._send_with_retry(batch)
+            finally:
+                with self._condition:
+                    self._inflight = False
+                    self._condition.notify_all()
+
+    def _send_with_retry(self, batch: List[Dict[str, Any]]) -> None:
+        attempt = 0
+        while True:
+            try:
+                self.send_batch(batch)
+                self.sent += len(batch)
+                return
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries or not is_retryable(e):
+                    self.dropped += len(batch)
+                    logger.error(f"批量上报失败，丢弃 {len(batch)} 条记录: {str(e)}")
+                    return
+                delay = retry_delay(e, attempt, self.backoff, self.max_backoff)
+                logger.warning(f"批量上报失败，{delay:.1f}秒后第{attempt}次重试: {str(e)}")
+                time.sleep(delay)
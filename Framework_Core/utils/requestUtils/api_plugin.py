@@ -1,14 +1,21 @@
 import json
+import time
 import requests
 from typing import Dict, Any, Optional
 from loguru import logger
 import allure
+from Framework_Core.utils.requestUtils.attachment_policy import AttachmentPolicy, attach_response
+from Framework_Core.utils.requestUtils.telemetry import TimedHTTPAdapter, begin_timing, body_size, end_timing, get_telemetry
 
 class APIRequest:
-    def __init__(self, base_url: str = ""):
+    def __init__(self, base_url: str = "", attachment_policy: Optional[AttachmentPolicy] = None):
         self.base_url = base_url.rstrip('/')
         self.session = requests.Session()
+        # 记录DNS解析和建立连接的耗时，供请求遥测使用
+        self.session.mount('http://', TimedHTTPAdapter())
+        self.session.mount('https://', TimedHTTPAdapter())
         self.last_response = None
+        self.attachment_policy = attachment_policy
 
     def set_headers(self, headers: Dict[str, str]) -> None:
         """
@@ -17,6 +24,16 @@ class APIRequest:
         """
         self.session.headers.update(headers)
 
+    def build_url(self, endpoint: str) -> str:
+        """
+        拼接请求URL，endpoint为完整URL时直接使用
+        :param endpoint: 接口端点或完整URL
+        :return: 请求URL
+        """
+        if endpoint.startswith(('http://', 'https://')):
+            return endpoint
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
     @allure.step("发送API请求")
     def request(
         self,
@@ -38,7 +55,10 @@ class APIRequest:
         :param headers: 请求头
         :return: 响应对象
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        url = self.build_url(endpoint)
+        telemetry = get_telemetry()
+        timings = begin_timing() if telemetry else None
+        start = time.perf_counter()
         
         try:
             with allure.step(f"{method.upper()} {url}"):
@@ -51,47 +71,31 @@ class APIRequest:
                     headers=headers,
                     **kwargs
                 )
+                if telemetry:
+                    timings['total'] = time.perf_counter() - start
+                    timings['ttfb'] = response.elapsed.total_seconds()
+                    end_timing()
+                    telemetry.record(method, response.url, response.status_code, timings,
+                                     body_size(response.request.body), len(response.content))
                 
                 self.last_response = response
                 self._log_request_details(response)
                 return response
                 
         except Exception as e:
+            if telemetry and timings['total'] is None:
+                timings['total'] = time.perf_counter() - start
+                end_timing()
+                telemetry.record(method, url, None, timings, error=e)
             logger.error(f"请求失败: {str(e)}")
             raise
 
     def _log_request_details(self, response: requests.Response) -> None:
         """
-        记录请求详情
+        记录请求详情，附件内容由attachment_policy决定
         :param response: 响应对象
         """
-        with allure.step("请求详情"):
-            allure.attach(
-                response.request.url,
-                name="Request URL",
-                attachment_type=allure.attachment_type.TEXT
-            )
-            allure.attach(
-                str(response.request.headers),
-                name="Request Headers",
-                attachment_type=allure.attachment_type.TEXT
-            )
-            if response.request.body:
-                allure.attach(
-                    str(response.request.body),
-                    name="Request Body",
-                    attachment_type=allure.attachment_type.TEXT
-                )
-            allure.attach(
-                str(response.status_code),
-                name="Response Status",
-                attachment_type=allure.attachment_type.TEXT
-            )
-            allure.attach(
-                str(response.text),
-                name="Response Body",
-                attachment_type=allure.attachment_type.TEXT
-            )
+        attach_response(response, self.attachment_policy)
 
     def get(self, endpoint: str, **kwargs) -> requests.Response:
         """GET请求"""
@@ -0,0 +1,441 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from http.cookiejar import CookieJar
+from http.cookies import Morsel, SimpleCookie
+from typing import Dict, Any, Optional, List, Awaitable, Union
+from urllib.parse import urlencode
+import aiohttp
+import requests
+from multidict import CIMultiDict, CIMultiDictProxy
+from loguru import logger
+import allure
+from Framework_Core.utils.requestUtils.api_plugin import APIRequest
+from Framework_Core.utils.requestUtils.attachment_policy import AttachmentPolicy
+from Framework_Core.utils.requestUtils.telemetry import aiohttp_trace_config, body_size, get_telemetry
+
+
+class AsyncRequestInfo:
+    """发送出去的请求信息，字段与requests.PreparedRequest保持一致"""
+
+    def __init__(self, method: str, url: str, headers: Dict[str, str], body: Optional[str]):
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+
+class AsyncResponse:
+    """
+    异步请求的响应对象
+    响应体在返回前已完整读取，常用属性与requests.Response保持一致，
+    便于断言代码和Allure记录逻辑在同步/异步客户端之间复用；
+    响应头不区分大小写，Set-Cookie等重复的响应头可通过headers.getall获取全部值
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: CIMultiDictProxy,
+        content: bytes,
+        url: str,
+        encoding: Optional[str],
+        request: AsyncRequestInfo,
+        elapsed: timedelta
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.encoding = encoding
+        self.request = request
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        """按响应编码解码后的响应体"""
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self, **kwargs) -> Any:
+        """将响应体解析为JSON"""
+        return json.loads(self.content, **kwargs)
+
+    def raise_for_status(self) -> None:
+        """状态码为4xx/5xx时抛出requests.HTTPError，与同步客户端一致"""
+        if not self.ok:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise requests.HTTPError(f"{self.status_code} {kind} Error for url: {self.url}", response=self)
+
+
+class _LoopThread:
+    """在后台线程中运行的事件循环，供同步代码提交协程"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="async-api-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Awaitable) -> Any:
+        """提交协程并阻塞等待结果"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class AsyncAPIRequest:
+    """
+    基于asyncio的API客户端
+    与APIRequest提供相同的get/post/put/delete/patch/request接口，
+    底层使用按主机限流的长连接池，可并发发送大量请求
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        pool_size: int = 100,
+        per_host_limit: int = 20,
+        keepalive_timeout: float = 30,
+        timeout: float = 30,
+        attachment_policy: Optional[AttachmentPolicy] = None
+    ):
+        """
+        初始化异步API客户端
+        :param base_url: 基础URL
+        :param pool_size: 连接池总连接数上限
+        :param per_host_limit: 单个主机的连接数上限
+        :param keepalive_timeout: 空闲长连接保持时间（秒）
+        :param timeout: 单个请求超时时间（秒）
+        :param attachment_policy: Allure附件策略，为空则使用全局默认策略
+        """
+        self.base_url = base_url.rstrip('/')
+        self.headers: Dict[str, str] = {}
+        self.cookies: List[Morsel] = []
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.attachment_policy = attachment_policy
+        self.last_response: Optional[AsyncResponse] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[_LoopThread] = None
+        self._lock = threading.Lock()
+
+    def set_headers(self, headers: Dict[str, str]) -> None:
+        """
+        设置请求头
+        :param headers: 请求头字典
+        """
+        self.headers.update(headers)
+
+    def set_cookies(self, cookies: Union[Dict[str, str], CookieJar]) -> None:
+        """
+        设置Cookie，替换之前设置的Cookie
+        :param cookies: Cookie字典，或带域名和路径的CookieJar（如requests.Session.cookies）
+        """
+        if isinstance(cookies, CookieJar):
+            items = [(cookie.name, cookie.value, cookie.domain, cookie.path) for cookie in cookies]
+        else:
+            items = [(name, value, '', '/') for name, value in cookies.items()]
+        self.cookies = []
+        for name, value, domain, path in items:
+            cookie = SimpleCookie()
+            cookie[name] = value or ''
+            cookie[name]['domain'] = domain
+            cookie[name]['path'] = path
+            self.cookies.append(cookie[name])
+        if self._session is not None:
+            self._update_cookie_jar(self._session, self.cookies)
+
+    def load_session(self, client: APIRequest) -> None:
+        """
+        沿用同步客户端的会话状态，包括基础URL、会话请求头、Cookie和附件策略
+        :param client: 同步API客户端
+        """
+        self.base_url = client.base_url
+        self.headers = dict(client.session.headers)
+        self.attachment_policy = client.attachment_policy
+        self.set_cookies(client.session.cookies)
+
+    def save_cookies(self, client: APIRequest) -> None:
+        """
+        把会话中的Cookie写回同步客户端，服务端在异步请求中设置的Cookie在之后的同步请求中同样生效
+        :param client: 同步API客户端
+        """
+        if self._session is None:
+            return
+        for morsel in self._session.cookie_jar:
+            client.session.cookies.set(morsel.key, morsel.value, domain=morsel['domain'], path=morsel['path'] or '/')
+
+    @classmethod
+    def from_client(cls, client: APIRequest, **kwargs) -> "AsyncAPIRequest":
+        """
+        按同步客户端创建异步客户端，沿用其会话状态，见load_session
+        :param client: 同步API客户端
+        :param kwargs: 连接池等其他初始化参数
+        :return: 异步API客户端
+        """
+        async_client = cls(**kwargs)
+        async_client.load_session(client)
+        return async_client
+
+    @staticmethod
+    def _update_cookie_jar(session: aiohttp.ClientSession, cookies: List[Morsel]) -> None:
+        for morsel in cookies:
+            session.cookie_jar.update_cookies({morsel.key: morsel})
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取当前事件循环上的会话，不同事件循环之间不共享连接池，切换事件循环时关闭原来的会话"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            stale, stale_loop = self._session, self._session_loop
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.per_host_limit,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[aiohttp_trace_config()],
+                # 与requests一致，接口地址为IP时同样发送Cookie
+                cookie_jar=aiohttp.CookieJar(unsafe=True)
+            )
+            self._session_loop = loop
+            self._update_cookie_jar(self._session, self.cookies)
+            if stale is not None:
+                # 原会话中服务端设置的Cookie继续生效
+                self._update_cookie_jar(self._session, list(stale.cookie_jar))
+                if not stale.closed:
+                    await self._close_session(stale, stale_loop)
+        return self._session
+
+    @staticmethod
+    async def _close_session(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        关闭在其他事件循环上创建的会话
+        连接只能在创建它的事件循环上关闭；该事件循环已关闭时连接已无法使用，只需释放连接器
+        :param session: 会话
+        :param loop: 创建会话的事件循环
+        """
+        try:
+            if loop.is_closed():
+                await session.close()
+            else:
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+        except Exception as e:
+            logger.warning(f"关闭会话失败: {str(e)}")
+
+    async def send(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> AsyncResponse:
+        """
+        发送请求并完整读取响应体，不做任何Allure记录，适用于负载测试等大量发送请求的场景
+        :param method: 请求方法
+        :param endpoint: 接口端点
+        :param data: 表单数据
+        :param json_data: JSON数据
+        :param params: URL参数
+        :param headers: 请求头
+        :return: 响应对象
+        """
+        url = self.build_url(endpoint)
+        request_headers = {**self.headers, **(headers or {})}
+        # aiohttp不允许同时传入data和json，与requests一致，表单数据不为空时优先使用表单数据
+        if data or json_data is None:
+            json_data = None
+            body = urlencode(data) if isinstance(data, dict) else data
+        else:
+            data = None
+            body = json.dumps(json_data, ensure_ascii=False)
+
+        session = await self._get_session()
+        telemetry = get_telemetry()
+        timings = {'dns': None, 'connect': None, 'ttfb': None, 'total': None, 'reused': None}
+        start = time.perf_counter()
+        try:
+            async with session.request(
+                method=method.upper(),
+                url=url,
+                data=data,
+                json=json_data,
+                params=params,
+                headers=request_headers,
+                trace_request_ctx=timings,
+                **kwargs
+            ) as resp:
+                content = await resp.read()
+        except Exception as e:
+            if telemetry:
+                timings['total'] = time.perf_counter() - start
+                telemetry.record(method, url, None, timings, error=e)
+            raise
+        timings['total'] = time.perf_counter() - start
+        if telemetry:
+            telemetry.record(method, str(resp.url), resp.status, timings, body_size(body), len(content))
+        return AsyncResponse(
+            status_code=resp.status,
+            headers=CIMultiDictProxy(CIMultiDict(resp.headers)),
+            content=content,
+            url=str(resp.url),
+            encoding=resp.charset,
+            request=AsyncRequestInfo(method.upper(), str(resp.url), request_headers, body),
+            elapsed=timedelta(seconds=timings['total'])
+        )
+
+    def _record(self, method: str, response: AsyncResponse) -> None:
+        """
+        在Allure中记录请求，与APIRequest的步骤结构一致
+        记录过程中没有await，并发协程之间的步骤不会交错
+        """
+        with allure.step("发送API请求"):
+            with allure.step(f"{method.upper()} {response.request.url}"):
+                self.last_response = response
+                self._log_request_details(response)
+
+    build_url = APIRequest.build_url
+    _log_request_details = APIRequest._log_request_details
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> AsyncResponse:
+        """
+        发送HTTP请求
+        :param method: 请求方法
+        :param endpoint: 接口端点
+        :param data: 表单数据
+        :param json_data: JSON数据
+        :param params: URL参数
+        :param headers: 请求头
+        :return: 响应对象
+        """
+        try:
+            response = await self.send(method, endpoint, data, json_data, params, headers, **kwargs)
+        except Exception as e:
+            logger.error(f"请求失败: {str(e)}")
+            raise
+        self._record(method, response)
+        return response
+
+    async def get(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """GET请求"""
+        return await self.request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """POST请求"""
+        return await self.request("POST", endpoint, **kwargs)
+
+    async def put(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """PUT请求"""
+        return await self.request("PUT", endpoint, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """DELETE请求"""
+        return await self.request("DELETE", endpoint, **kwargs)
+
+    async def patch(self, endpoint: str, **kwargs) -> AsyncResponse:
+        """PATCH请求"""
+        return await self.request("PATCH", endpoint, **kwargs)
+
+    async def gather(self, calls: List[Dict[str, Any]], concurrency: Optional[int] = None,
+                     return_exceptions: bool = False) -> List[Any]:
+        """
+        并发发送一批请求
+        :param calls: 请求参数列表，每项为request方法的关键字参数，如 {'method': 'GET', 'endpoint': '/users'}
+        :param concurrency: 最大并发数，默认为连接池大小
+        :param return_exceptions: 为True时异常作为结果返回，否则抛出第一个异常
+        :return: 与calls顺序一致的响应列表
+        """
+        results = await self._send_all(calls, concurrency)
+        return self._finish_batch(calls, results, return_exceptions)
+
+    def request_many(self, calls: List[Dict[str, Any]], concurrency: Optional[int] = None,
+                     return_exceptions: bool = False) -> List[Any]:
+        """
+        在同步测试中并发发送一批请求
+        请求在后台事件循环中执行，Allure记录在调用线程中完成
+        :param calls: 请求参数列表，格式同gather
+        :param concurrency: 最大并发数
+        :param return_exceptions: 为True时异常作为结果返回，否则抛出第一个异常
+        :return: 与calls顺序一致的响应列表
+        """
+        results = self._get_loop_thread().run(self._send_all(calls, concurrency))
+        return self._finish_batch(calls, results, return_exceptions)
+
+    async def _send_all(self, calls: List[Dict[str, Any]], concurrency: Optional[int]) -> List[Any]:
+        """在并发上限内发送全部请求，异常作为结果返回"""
+        semaphore = asyncio.Semaphore(concurrency or self.pool_size)
+
+        async def _call(call: Dict[str, Any]) -> AsyncResponse:
+            async with semaphore:
+                return await self.send(**call)
+
+        return await asyncio.gather(*(_call(call) for call in calls), return_exceptions=True)
+
+    def _finish_batch(self, calls: List[Dict[str, Any]], results: List[Any], return_exceptions: bool) -> List[Any]:
+        """按原始顺序记录批量请求结果"""
+        first_error = None
+        for call, result in zip(calls, results):
+            if isinstance(result, BaseException):
+                logger.error(f"请求失败: {str(result)}")
+                first_error = first_error or result
+            else:
+                self._record(call.get('method', 'GET'), result)
+        if first_error is not None and not return_exceptions:
+            raise first_error
+        return results
+
+    def _get_loop_thread(self) -> _LoopThread:
+        with self._lock:
+            if self._loop_thread is None:
+                self._loop_thread = _LoopThread()
+            return self._loop_thread
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环上的会话"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    def close(self) -> None:
+        """关闭会话及后台事件循环"""
+        if self._loop_thread is not None:
+            if self._session_loop is self._loop_thread.loop:
+                self._loop_thread.run(self.aclose())
+            self._loop_thread.stop()
+            self._loop_thread = None
+
+    async def __aenter__(self) -> "AsyncAPIRequest":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
@@ -0,0 +1,227 @@
+import os
+import threading
+import uuid
+from collections import deque
+from typing import Dict, Any, Optional, Union
+from loguru import logger
+import allure
+
+# 按文本解码的Content-Type，其余类型视为二进制内容
+TEXT_CONTENT_TYPES = ('text/', 'application/json', 'application/xml', 'application/javascript',
+                      'application/x-www-form-urlencoded', '+json', '+xml')
+
+
+class AttachmentPolicy:
+    """
+    请求详情的Allure附件策略
+    mode:
+        always     - 每个请求都记录附件
+        on_failure - 请求详情缓存在当前用例中，仅在用例失败时写入附件
+        never      - 不记录请求详情
+    """
+
+    MODES = ('always', 'on_failure', 'never')
+
+    def __init__(
+        self,
+        mode: str = 'always',
+        max_body_size: int = 64 * 1024,
+        spill_dir: Optional[str] = None,
+        max_buffered: int = 50
+    ):
+        """
+        :param mode: 附件模式
+        :param max_body_size: 附件中请求/响应体的最大字节数，超出部分截断
+        :param spill_dir: 超大响应体完整写入的目录，为空则只保留截断内容
+        :param max_buffered: on_failure模式下单个用例最多缓存的请求数
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的附件模式: {mode}")
+        self.mode = mode
+        self.max_body_size = max_body_size
+        self.spill_dir = spill_dir
+        self.max_buffered = max_buffered
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AttachmentPolicy":
+        """
+        根据配置字典创建策略
+        :param config: 配置字典，键与构造参数一致
+        :return: 附件策略
+        """
+        return cls(
+            mode=config.get('mode', 'always'),
+            max_body_size=int(config.get('max_body_size', 64 * 1024)),
+            spill_dir=config.get('spill_dir'),
+            max_buffered=int(config.get('max_buffered', 50))
+        )
+
+
+_default_policy = AttachmentPolicy()
+
+
+def get_default_policy() -> AttachmentPolicy:
+    """获取全局默认附件策略"""
+    return _default_policy
+
+
+def set_default_policy(policy: AttachmentPolicy) -> None:
+    """
+    设置全局默认附件策略
+    :param policy: 附件策略
+    """
+    global _default_policy
+    _default_policy = policy
+
+
+class _AttachmentBuffer:
+    """当前用例中待写入的请求，保存响应对象本身，写入时才解码"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Optional[deque] = None
+
+    def begin(self, max_buffered: int) -> None:
+        with self._lock:
+            self._pending = deque(maxlen=max_buffered)
+
+    def add(self, response: Any, policy: AttachmentPolicy) -> bool:
+        with self._lock:
+            if self._pending is None:
+                return False
+            self._pending.append((response, policy))
+            return True
+
+    def drain(self) -> list:
+        with self._lock:
+            pending = list(self._pending or ())
+            if self._pending is not None:
+                self._pending.clear()
+            return pending
+
+    def end(self) -> None:
+        with self._lock:
+            self._pending = None
+
+
+_buffer = _AttachmentBuffer()
+
+
+def begin_test(policy: Optional[AttachmentPolicy] = None) -> None:
+    """
+    用例开始时开启请求缓存
+    :param policy: 附件策略，用于确定缓存上限
+    """
+    _buffer.begin((policy or _default_policy).max_buffered)
+
+
+def flush_buffer() -> None:
+    """将当前用例缓存的请求写入Allure附件"""
+    for response, policy in _buffer.drain():
+        with allure.step(f"请求详情: {response.request.method} {response.request.url}"):
+            _attach_details(response, policy)
+
+
+def end_test() -> None:
+    """用例结束时丢弃未写入的缓存"""
+    _buffer.end()
+
+
+def attach_response(response: Any, policy: Optional[AttachmentPolicy] = None) -> None:
+    """
+    按策略记录请求详情
+    :param response: 响应对象
+    :param policy: 附件策略，为空则使用全局默认策略
+    """
+    policy = policy or _default_policy
+    if policy.mode == 'never':
+        return
+    if policy.mode == 'on_failure' and _buffer.add(response, policy):
+        return
+    with allure.step("请求详情"):
+        _attach_details(response, policy)
+
+
+def _attach_details(response: Any, policy: AttachmentPolicy) -> None:
+    """写入单个请求的Allure附件"""
+    request = response.request
+    allure.attach(
+        request.url,
+        name="Request URL",
+        attachment_type=allure.attachment_type.TEXT
+    )
+    allure.attach(
+        str(request.headers),
+        name="Request Headers",
+        attachment_type=allure.attachment_type.TEXT
+    )
+    if request.body:
+        allure.attach(
+            _render_body(request.body, request.headers.get('Content-Type'), None, policy),
+            name="Request Body",
+            attachment_type=allure.attachment_type.TEXT
+        )
+    allure.attach(
+        str(response.status_code),
+        name="Response Status",
+        attachment_type=allure.attachment_type.TEXT
+    )
+    allure.attach(
+        _render_body(response.content, response.headers.get('Content-Type'), response.encoding, policy),
+        name="Response Body",
+        attachment_type=allure.attachment_type.TEXT
+    )
+
+
+def _is_text(content_type: Optional[str]) -> bool:
+    """根据Content-Type判断是否为文本内容，未声明类型时按文本处理"""
+    if not content_type:
+        return True
+    content_type = content_type.lower()
+    return any(marker in content_type for marker in TEXT_CONTENT_TYPES)
+
+
+def _render_body(body: Union[str, bytes, None], content_type: Optional[str],
+                 encoding: Optional[str], policy: AttachmentPolicy) -> str:
+    """
+    生成请求/响应体附件内容
+    二进制内容只记录摘要；超出大小上限时只解码开头部分，完整内容按需写入磁盘
+    """
+    if body is None:
+        return ""
+    if isinstance(body, str):
+        if len(body) <= policy.max_body_size:
+            return body
+        body = body.encode('utf-8')
+    elif not isinstance(body, (bytes, bytearray)):
+        # 文件对象、生成器等流式请求体不读取
+        return f"<流式内容: {type(body).__name__}>"
+
+    size = len(body)
+    if not _is_text(content_type):
+        spilled = _spill(body, policy) if size > policy.max_body_size else None
+        suffix = f", 已保存到: {spilled}" if spilled else ""
+        return f"<二进制内容: {content_type}, {size} 字节{suffix}>"
+
+    if size <= policy.max_body_size:
+        return bytes(body).decode(encoding or 'utf-8', errors='replace')
+
+    head = bytes(body[:policy.max_body_size]).decode(encoding or 'utf-8', errors='ignore')
+    spilled = _spill(body, policy)
+    suffix = f"，完整内容已保存到: {spilled}" if spilled else ""
+    return f"{head}\n... <已截断，共 {size} 字节{suffix}>"
+
+
+def _spill(body: bytes, policy: AttachmentPolicy) -> Optional[str]:
+    """将完整内容写入spill_dir，返回文件路径"""
+    if not policy.spill_dir:
+        return None
+    try:
+        os.makedirs(policy.spill_dir, exist_ok=True)
+        path = os.path.join(policy.spill_dir, f"{uuid.uuid4()}.body")
+        with open(path, 'wb') as f:
+            f.write(body)
+        return path
+    except Exception as e:
+        logger.error(f"保存响应体失败: {str(e)}")
+        return None
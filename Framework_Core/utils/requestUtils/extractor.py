@@ -0,0 +1,204 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+import jsonpath
+
+# 编译后的路径操作
+_CHILD = 'child'
+_WILDCARD = 'wildcard'
+_DESCENDANT = 'descendant'
+
+_TOKEN_PATTERN = re.compile(
+    r"\.\.(?P<desc>[^.\[\]]+|\*)"      # ..name / ..*
+    r"|\.(?P<name>[^.\[\]]+)"          # .name / .*
+    r"|\[(?P<index>-?\d+)\]"           # [0] / [-1]
+    r"|\['(?P<squote>[^']*)'\]"        # ['name']
+    r"|\[\"(?P<dquote>[^\"]*)\"\]"     # ["name"]
+    r"|\[(?P<star>\*)\]"               # [*]
+)
+
+_NOT_JSON = object()
+_MISSING = object()
+_PARSED_ATTR = '_extractor_parsed_body'
+
+
+class CompiledPath:
+    """
+    编译后的JSONPath表达式
+    常用语法（.name、['name']、[n]、*、..name）编译为操作序列直接遍历，
+    过滤器、切片等其余语法交给jsonpath库处理
+    """
+
+    __slots__ = ('expr', 'ops', 'simple')
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.ops: Optional[Tuple[Tuple[str, Any], ...]] = self._compile(expr)
+        # 只包含子节点访问的路径最多只有一个结果
+        self.simple = self.ops is not None and all(op == _CHILD for op, _ in self.ops)
+
+    @staticmethod
+    def _compile(expr: str) -> Optional[Tuple[Tuple[str, Any], ...]]:
+        expr = expr.strip()
+        if not expr.startswith('$'):
+            return None
+        ops, pos = [], 1
+        while pos < len(expr):
+            match = _TOKEN_PATTERN.match(expr, pos)
+            if match is None:
+                return None
+            if match.group('desc') is not None:
+                key = match.group('desc')
+                ops.append((_DESCENDANT, None if key == '*' else key))
+            elif match.group('name') is not None:
+                key = match.group('name')
+                ops.append((_WILDCARD, None) if key == '*' else (_CHILD, key))
+            elif match.group('index') is not None:
+                ops.append((_CHILD, int(match.group('index'))))
+            elif match.group('star') is not None:
+                ops.append((_WILDCARD, None))
+            else:
+                ops.append((_CHILD, match.group('squote') if match.group('squote') is not None else match.group('dquote')))
+            pos = match.end()
+        return tuple(ops)
+
+    def find_all(self, data: Any) -> List[Any]:
+        """
+        查找全部匹配值
+        :param data: 已解析的JSON数据
+        :return: 匹配值列表
+        """
+        if self.ops is None:
+            result = jsonpath.jsonpath(data, self.expr)
+            return result if result else []
+        if self.simple:
+            value = _child(data, self.ops)
+            return [] if value is _MISSING else [value]
+
+        current = [data]
+        for op, key in self.ops:
+            following = []
+            for node in current:
+                if op == _CHILD:
+                    value = _get(node, key)
+                    if value is not _MISSING:
+                        following.append(value)
+                elif op == _WILDCARD:
+                    following.extend(_children(node))
+                else:
+                    _descend(node, key, following)
+            current = following
+            if not current:
+                break
+        return current
+
+    def find(self, data: Any, default: Any = None) -> Any:
+        """
+        查找第一个匹配值
+        :param data: 已解析的JSON数据
+        :param default: 无匹配时的默认值
+        :return: 第一个匹配值
+        """
+        if self.simple:
+            value = _child(data, self.ops)
+            return default if value is _MISSING else value
+        result = self.find_all(data)
+        return result[0] if result else default
+
+
+def _get(node: Any, key: Any) -> Any:
+    """按键或下标取值，字符串形式的数字可用于列表下标"""
+    if isinstance(node, dict):
+        return node.get(key, _MISSING) if not isinstance(key, int) else node.get(str(key), _MISSING)
+    if isinstance(node, list):
+        if isinstance(key, str):
+            if not key.lstrip('-').isdigit():
+                return _MISSING
+            key = int(key)
+        if -len(node) <= key < len(node):
+            return node[key]
+    return _MISSING
+
+
+def _child(data: Any, ops: Tuple[Tuple[str, Any], ...]) -> Any:
+    for _, key in ops:
+        data = _get(data, key)
+        if data is _MISSING:
+            break
+    return data
+
+
+def _children(node: Any) -> List[Any]:
+    if isinstance(node, dict):
+        return list(node.values())
+    if isinstance(node, list):
+        return list(node)
+    return []
+
+
+def _descend(node: Any, key: Optional[str], result: List[Any]) -> None:
+    """递归查找，key为None时收集全部后代节点"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if key is None:
+            children = _children(current)
+            result.extend(children)
+        else:
+            if isinstance(current, dict) and key in current:
+                result.append(current[key])
+            children = _children(current)
+        stack.extend(reversed([child for child in children if isinstance(child, (dict, list))]))
+
+
+@lru_cache(maxsize=4096)
+def compile_path(expr: str) -> CompiledPath:
+    """
+    编译JSONPath表达式，相同表达式只编译一次
+    :param expr: JSONPath表达式
+    :return: 编译后的路径
+    """
+    return CompiledPath(expr)
+
+
+def parse_body(source: Any) -> Any:
+    """
+    解析响应体，同一个响应对象只解析一次
+    :param source: 响应对象或已解析的数据
+    :return: 解析后的JSON数据，非JSON响应返回None
+    """
+    if source is None or isinstance(source, (dict, list, str, int, float, bool)):
+        return source
+    parsed = getattr(source, _PARSED_ATTR, _MISSING)
+    if parsed is _MISSING:
+        try:
+            parsed = json.loads(source.content)
+        except (ValueError, TypeError, AttributeError):
+            parsed = _NOT_JSON
+        try:
+            setattr(source, _PARSED_ATTR, parsed)
+        except AttributeError:
+            pass
+    return None if parsed is _NOT_JSON else parsed
+
+
+def extract(source: Any, expr: str, default: Any = None) -> Any:
+    """
+    从响应中提取第一个匹配值
+    :param source: 响应对象或已解析的数据
+    :param expr: JSONPath表达式
+    :param default: 无匹配时的默认值
+    :return: 匹配值
+    """
+    return compile_path(expr).find(parse_body(source), default)
+
+
+def extract_all(source: Any, expr: str) -> List[Any]:
+    """
+    从响应中提取全部匹配值
+    :param source: 响应对象或已解析的数据
+    :param expr: JSONPath表达式
+    :return: 匹配值列表
+    """
+    return compile_path(expr).find_all(parse_body(source))
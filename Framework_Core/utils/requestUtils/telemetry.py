@@ -0,0 +1,376 @@
+import os
+import re
+import json
+import time
+import socket
+import threading
+from functools import lru_cache
+from typing import Dict, Any, List, Callable, Optional
+from urllib.parse import urlsplit
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from Framework_Core.core.histogram import LatencyHistogram
+
+# 路径中按参数处理的片段: 纯数字、UUID、较长的十六进制串
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})$')
+# 记录中的耗时字段
+PHASES = ('dns', 'connect', 'ttfb', 'total')
+
+
+def endpoint_template(url: str) -> str:
+    """
+    把请求URL归一化为接口模板，去掉主机和查询参数，ID类的路径片段替换为{id}
+    如 https://api.example.com/users/42?x=1 -> /users/{id}
+    :param url: 请求URL
+    :return: 接口模板
+    """
+    return _path_template(urlsplit(url).path or '/')
+
+
+@lru_cache(maxsize=4096)
+def _path_template(path: str) -> str:
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+class RequestTelemetry:
+    """
+    请求遥测
+    每个请求生成一条结构化记录写入JSON Lines文件，同时按 (方法, 接口模板) 汇总耗时直方图和错误数；
+    请求异常和5xx的耗时（如很快失败的DNS/连接错误）不代表接口的正常表现，另外只用成功的请求汇总一份直方图，
+    供耗时基线和回归检测使用
+    """
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 1.0):
+        """
+        :param path: JSON Lines文件路径，为空时只在内存中汇总
+        :param flush_interval: 写文件的最长缓冲时间（秒）
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.success_histograms: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._file = None
+        self._next_flush = 0.0
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        添加记录监听函数，每记录一个请求调用一次，参数为记录
+        :param listener: 监听函数，需要线程安全
+        """
+        self.listeners.append(listener)
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: Optional[int],
+        timings: Dict[str, Optional[float]],
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+        error: Optional[BaseException] = None
+    ) -> Dict[str, Any]:
+        """
+        记录一次请求
+        :param method: 请求方法
+        :param url: 请求URL
+        :param status: 响应状态码，请求异常时为None
+        :param timings: 各阶段耗时（秒），键为dns/connect/ttfb/total，未知的阶段为None
+        :param bytes_out: 请求体字节数
+        :param bytes_in: 响应体字节数
+        :param error: 请求异常
+        :return: 记录
+        """
+        method = method.upper()
+        parts = urlsplit(url)
+        endpoint = _path_template(parts.path or '/')
+        key = f"{method} {endpoint}"
+        record = {
+            'ts': round(time.time(), 6),
+            'method': method,
+            'endpoint': endpoint,
+            'host': parts.netloc,
+            'status': status,
+            'error': type(error).__name__ if error is not None else None,
+            **{f"{phase}_ms": _ms(timings.get(phase)) for phase in PHASES},
+            'reused': timings.get('reused'),
+            'bytes_out': bytes_out,
+            'bytes_in': bytes_in,
+            'test': _current_test(),
+        }
+        with self._lock:
+            histogram = _histogram(self.histograms, key)
+            failed = error is not None or (status or 0) >= 500
+            if timings.get('total') is not None:
+                histogram.record(timings['total'])
+                if not failed:
+                    _histogram(self.success_histograms, key).record(timings['total'])
+            if failed:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            if self.path:
+                self._write(record)
+        for listener in self.listeners:
+            listener(record)
+        return record
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """追加一条记录，调用方需持有锁"""
+        try:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            now = time.monotonic()
+            if now >= self._next_flush:
+                self._file.flush()
+                self._next_flush = now + self.flush_interval
+        except OSError as e:
+            logger.warning(f"写入请求遥测失败: {str(e)}")
+            self.path = None
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        按接口汇总的耗时统计，按p95从高到低排序
+        :return: 每个接口的次数、错误数和分位数（毫秒）
+        """
+        with self._lock:
+            items = list(self.histograms.items())
+            errors = dict(self.errors)
+        rows = []
+        for key, histogram in items:
+            method, _, endpoint = key.partition(' ')
+            rows.append({'method': method, 'endpoint': endpoint, 'errors': errors.get(key, 0), **histogram.summary()})
+        return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        导出可序列化的汇总数据，用于在pytest-xdist的worker和主进程之间传递
+        :return: 汇总数据，histograms为全部请求的耗时，success为成功请求的耗时
+        """
+        with self._lock:
+            return {
+                'histograms': {key: histogram.to_dict() for key, histogram in self.histograms.items()},
+                'success': {key: histogram.to_dict() for key, histogram in self.success_histograms.items()},
+                'errors': dict(self.errors),
+            }
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """
+        合并其他进程导出的汇总数据
+        :param snapshot: snapshot的结果
+        """
+        with self._lock:
+            for key, data in snapshot.get('histograms', {}).items():
+                _histogram(self.histograms, key).merge(LatencyHistogram.from_dict(data))
+            for key, data in snapshot.get('success', {}).items():
+                _histogram(self.success_histograms, key).merge(LatencyHistogram.from_dict(data))
+            for key, count in snapshot.get('errors', {}).items():
+                self.errors[key] = self.errors.get(key, 0) + count
+
+    def close(self) -> None:
+        """关闭记录文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _histogram(histograms: Dict[str, LatencyHistogram], key: str) -> LatencyHistogram:
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = LatencyHistogram()
+    return histogram
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def _current_test() -> Optional[str]:
+    # pytest执行用例期间设置，格式为 "path::name (call)"
+    current = os.environ.get('PYTEST_CURRENT_TEST')
+    return current.rsplit(' ', 1)[0] if current else None
+
+
+_telemetry = RequestTelemetry()
+
+
+def get_telemetry() -> Optional[RequestTelemetry]:
+    """获取全局请求遥测，关闭时返回None"""
+    return _telemetry
+
+
+def set_telemetry(telemetry: Optional[RequestTelemetry]) -> None:
+    """
+    设置全局请求遥测
+    :param telemetry: 请求遥测，为None时关闭
+    """
+    global _telemetry
+    _telemetry = telemetry
+
+
+# ---- 同步客户端的连接阶段计时 ----
+
+_local = threading.local()
+
+
+def begin_timing() -> Dict[str, Optional[float]]:
+    """
+    开始记录当前线程中下一个请求的阶段耗时
+    :return: 耗时字典，请求过程中由连接池填充dns/connect
+    """
+    timings = {'dns': None, 'connect': None, 'ttfb': None, 'total': None, 'reused': None}
+    _local.timings = timings
+    return timings
+
+
+def end_timing() -> None:
+    _local.timings = None
+
+
+class _TimedConnectionMixin:
+    """新建连接时记录DNS解析和建立连接（含TLS握手）的耗时，复用连接时两者为0"""
+
+    def connect(self) -> None:
+        timings = getattr(_local, 'timings', None)
+        if timings is None:
+            return super().connect()
+        timings['reused'] = False
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            timings['connect'] = time.perf_counter() - start - (timings['dns'] or 0.0)
+
+    def _new_conn(self) -> socket.socket:
+        timings = getattr(_local, 'timings', None)
+        if timings is None:
+            return super()._new_conn()
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror:
+            # 由urllib3按原有方式解析并抛出异常
+            return super()._new_conn()
+        timings['dns'] = time.perf_counter() - start
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        # 按解析结果逐个连接，不再重复解析
+        try:
+            for i, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except NewConnectionError:
+                    if i == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """记录连接阶段耗时的HTTPAdapter，其余行为与requests默认的HTTPAdapter一致"""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        timings = getattr(_local, 'timings', None)
+        if timings is not None:
+            # 没有新建连接时保持为0，表示复用了连接
+            timings.update(dns=0.0, connect=0.0, reused=True)
+        return super().send(request, *args, **kwargs)
+
+
+# ---- 异步客户端的连接阶段计时 ----
+
+def aiohttp_trace_config():
+    """
+    创建记录各阶段耗时的aiohttp TraceConfig
+    请求时通过 trace_request_ctx 传入begin_timing()格式的字典，由回调填充dns/connect/ttfb
+    """
+    import aiohttp
+
+    def _timings(context) -> Optional[Dict[str, Any]]:
+        timings = context.trace_request_ctx
+        return timings if isinstance(timings, dict) else None
+
+    async def on_request_start(session, context, params):
+        timings = _timings(context)
+        if timings is not None:
+            timings.update(dns=0.0, connect=0.0, reused=True)
+            context.started = time.perf_counter()
+
+    async def on_dns_start(session, context, params):
+        context.dns_started = time.perf_counter()
+
+    async def on_dns_end(session, context, params):
+        timings = _timings(context)
+        if timings is not None:
+            timings['dns'] = time.perf_counter() - context.dns_started
+
+    async def on_connection_create_start(session, context, params):
+        context.connect_started = time.perf_counter()
+
+    async def on_connection_create_end(session, context, params):
+        timings = _timings(context)
+        if timings is not None:
+            timings['connect'] = time.perf_counter() - context.connect_started - (timings['dns'] or 0.0)
+            timings['reused'] = False
+
+    async def on_request_end(session, context, params):
+        timings = _timings(context)
+        if timings is not None:
+            timings['ttfb'] = time.perf_counter() - context.started
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+def body_size(body: Any) -> int:
+    """
+    请求体字节数
+    :param body: 请求体
+    :return: 字节数，无法确定时为0
+    """
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    return 0
@@ -1,38 +1,159 @@
 import os
 import sys
+import json
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Tuple
 from Framework_Core.utils.fileUtils import FileUtils
-from Framework_Core.utils.logger import test_logger
+from Framework_Core.utils.logUtils.logger import test_logger
+
+MANIFEST_NAME = ".yaml_to_test_manifest.json"
+DEFAULT_OUTPUT_DIR = "TestSuites/test_cases"
+
+
+def file_hash(path: str) -> str:
+    """
+    计算文件内容哈希
+    :param path: 文件路径
+    :return: sha256摘要
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(output_dir: str) -> Dict[str, Any]:
+    """
+    读取转换清单，生成器版本不一致时视为空清单
+    :param output_dir: 输出目录
+    :return: 清单内容
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'generator_version': FileUtils.GENERATOR_VERSION, 'files': {}}
+    if manifest.get('generator_version') != FileUtils.GENERATOR_VERSION:
+        test_logger.info("生成器版本已变化，全部重新生成")
+        return {'generator_version': FileUtils.GENERATOR_VERSION, 'files': {}}
+    return manifest
+
+
+def save_manifest(output_dir: str, manifest: Dict[str, Any]) -> None:
+    """
+    原子写入转换清单
+    :param output_dir: 输出目录
+    :param manifest: 清单内容
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def collect_yaml_files(yaml_path: str) -> List[Tuple[str, str]]:
+    """
+    收集待转换的YAML文件
+    :param yaml_path: YAML文件或目录
+    :return: (文件路径, 相对目录) 列表，相对目录用于在输出目录中保持原有结构
+    """
+    if os.path.isfile(yaml_path):
+        return [(yaml_path, '')]
+    result = []
+    for root, _, files in os.walk(yaml_path):
+        for name in sorted(files):
+            if name.endswith(('.yaml', '.yml')):
+                result.append((os.path.join(root, name), os.path.relpath(root, yaml_path)))
+    return result
+
+
+def convert_file(yaml_file: str, output_dir: str) -> str:
+    """
+    转换单个YAML文件，供进程池调用
+    :param yaml_file: YAML文件路径
+    :param output_dir: 输出目录
+    :return: 生成的测试文件路径
+    """
+    return FileUtils(output_dir).generate_test_file(yaml_file)
+
+
+def convert(yaml_path: str, output_dir: str = DEFAULT_OUTPUT_DIR, workers: int = None, force: bool = False) -> Dict[str, int]:
+    """
+    增量转换YAML用例
+    只重新生成内容哈希或生成器版本发生变化、或输出文件缺失的用例，变化的文件在进程池中并行转换
+    :param yaml_path: YAML文件或目录
+    :param output_dir: 输出目录
+    :param workers: 进程数，默认为CPU核数
+    :param force: 是否忽略清单全部重新生成
+    :return: 转换统计
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {'generator_version': FileUtils.GENERATOR_VERSION, 'files': {}} if force else load_manifest(output_dir)
+    previous = manifest['files']
+    current: Dict[str, Any] = {}
+    changed = []
+
+    for yaml_file, rel_dir in collect_yaml_files(yaml_path):
+        key = os.path.abspath(yaml_file)
+        digest = file_hash(yaml_file)
+        entry = previous.get(key)
+        if entry and entry['hash'] == digest and os.path.exists(entry['output']):
+            current[key] = entry
+        else:
+            changed.append((yaml_file, os.path.normpath(os.path.join(output_dir, rel_dir)), key, digest))
+
+    if changed:
+        if len(changed) == 1 or workers == 1:
+            outputs = [convert_file(yaml_file, target) for yaml_file, target, _, _ in changed]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outputs = list(pool.map(convert_file, [c[0] for c in changed], [c[1] for c in changed]))
+        for (_, _, key, digest), output in zip(changed, outputs):
+            current[key] = {'hash': digest, 'output': output}
+
+    # 源文件已删除的输出一并清理，其他来源的记录保留
+    removed = 0
+    for key, entry in previous.items():
+        if key in current:
+            continue
+        if os.path.exists(key):
+            current[key] = entry
+            continue
+        if os.path.exists(entry['output']):
+            os.unlink(entry['output'])
+        removed += 1
+
+    manifest['files'] = current
+    save_manifest(output_dir, manifest)
+    test_logger.info(f"转换完成: 重新生成 {len(changed)} 个文件，清理 {removed} 个文件")
+    return {'total': len(current), 'changed': len(changed), 'removed': removed}
+
 
 def main():
     parser = argparse.ArgumentParser(description='将YAML测试用例转换为pytest测试用例')
-    parser.add_argument('yaml_path', help='YAML文件路径')
+    parser.add_argument('yaml_path', help='YAML文件或目录路径')
     parser.add_argument('--output', '-o', help='输出目录路径（可选）')
-    
+    parser.add_argument('--workers', '-j', type=int, help='并行转换的进程数（可选）')
+    parser.add_argument('--force', action='store_true', help='忽略转换清单，全部重新生成')
+
     args = parser.parse_args()
-    
+
     try:
         # 检查YAML文件是否存在
         if not os.path.exists(args.yaml_path):
             test_logger.error(f"YAML文件不存在: {args.yaml_path}")
             sys.exit(1)
-            
-        # 创建FileUtils实例
-        file_utils = FileUtils()
-        
-        # 如果指定了输出目录，则修改输出路径
-        if args.output:
-            file_utils.test_case_dir = args.output
-            if not os.path.exists(args.output):
-                os.makedirs(args.output)
-        
-        # 生成测试文件
-        test_file_path = file_utils.generate_test_file(args.yaml_path)
-        test_logger.info(f"测试用例文件已生成: {test_file_path}")
-        
+
+        convert(args.yaml_path, args.output or DEFAULT_OUTPUT_DIR, args.workers, args.force)
+
     except Exception as e:
         test_logger.error(f"转换失败: {str(e)}")
         sys.exit(1)
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
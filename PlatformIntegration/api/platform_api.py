@@ -1,16 +1,23 @@
 from typing import Dict, Any, List, Optional
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from Framework_Core.utils.platform_adapter import PlatformAdapter
-from Framework_Core.utils.config_loader import ConfigLoader
+from Framework_Core.utils.platformUtils.platform_adapter import PlatformAdapter
+from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
 from loguru import logger
 
 class PlatformAPI:
-    def __init__(self):
+    def __init__(self, platform_config: Dict[str, Any] = None):
+        """
+        :param platform_config: 平台配置，为空时读取配置文件中的platform节点
+        """
         self.config_loader = ConfigLoader()
-        platform_config = self.config_loader.get_value('platform', {})
+        if platform_config is None:
+            platform_config = self.config_loader.get_value('platform', {})
         self.adapter = PlatformAdapter(platform_config)
         self.project_id = platform_config.get('project_id')
+        self.upload_concurrency = platform_config.get('upload', {}).get('concurrency', 4)
 
     def start_test_execution(self, suite_name: str, env: str) -> Optional[str]:
         """
@@ -20,7 +27,9 @@ class PlatformAPI:
         :return: 执行ID
         """
         try:
+            # 执行ID由本地生成，平台通过状态通知得知新的执行
             execution_data = {
+                'id': uuid.uuid4().hex,
                 'project_id': self.project_id,
                 'suite_name': suite_name,
                 'environment': env,
@@ -70,21 +79,26 @@ class PlatformAPI:
 
     def upload_test_artifacts(self, execution_id: str, artifacts: Dict[str, str]) -> bool:
         """
-        上传测试产物
+        并发上传测试产物
         :param execution_id: 执行ID
         :param artifacts: 产物字典 {类型: 路径}
         :return: 是否上传成功
         """
         try:
             success = True
+            existing = {}
             for artifact_type, path in artifacts.items():
                 if os.path.exists(path):
-                    if not self.adapter.upload_report(path, artifact_type):
-                        success = False
+                    existing[artifact_type] = path
                 else:
                     logger.warning(f"产物文件不存在: {path}")
                     success = False
-            return success
+            if not existing:
+                return success
+            with ThreadPoolExecutor(max_workers=min(self.upload_concurrency, len(existing))) as pool:
+                futures = [pool.submit(self.adapter.upload_report, path, artifact_type, execution_id)
+                           for artifact_type, path in existing.items()]
+                return all([future.result() for future in futures]) and success
         except Exception as e:
             logger.error(f"上传测试产物失败: {str(e)}")
             return False
@@ -101,20 +115,45 @@ class PlatformAPI:
             logger.error(f"获取测试环境配置失败: {str(e)}")
             return None
 
+    def resolve_environment(self, env: str) -> Dict[str, Any]:
+        """
+        获取本地环境配置与平台环境变量合并后的结果，平台变量写入配置的platform层；
+        平台数据由适配器的环境缓存按TTL和ETag刷新，每次调用都能取到缓存过期后的新数据
+        :param env: 环境名称
+        :return: 合并后的环境配置，每次返回新的副本
+        """
+        remote = self.get_test_environment(env)
+        if remote:
+            self.config_loader.set_layer('platform', {'environments': {env: remote}}, merge=True)
+        return self.config_loader.get_environment_config(env)
+
     def update_test_case_status(self, case_id: str, status: str, message: str = None) -> bool:
         """
-        更新测试用例状态
+        更新测试用例状态，状态进入后台队列批量上报，不阻塞用例执行
         :param case_id: 用例ID
         :param status: 状态
         :param message: 状态信息
-        :return: 是否更新成功
+        :return: 是否已加入上报队列
         """
         try:
-            return self.adapter.update_test_status(case_id, status)
+            self.adapter.report_test_status(case_id, status, message)
+            return True
         except Exception as e:
             logger.error(f"更新测试用例状态失败: {str(e)}")
             return False
 
+    def close(self, timeout: float = 30.0) -> bool:
+        """
+        发送队列中剩余的状态并释放连接
+        :param timeout: 最长等待时间（秒）
+        :return: 是否全部发送完成
+        """
+        try:
+            return self.adapter.close(timeout)
+        except Exception as e:
+            logger.error(f"关闭平台连接失败: {str(e)}")
+            return False
+
     def get_suite_config(self, suite_name: str) -> Optional[Dict[str, Any]]:
         """
         获取测试套件配置
@@ -0,0 +1,146 @@
+"""
+平台上报性能基准
+在进程内的测试平台替身上模拟用例执行时的状态上报，比较三种方式:
+    unpooled  每次调用新建连接逐条同步上报（原先的实现方式）
+    sync      连接池逐条同步上报
+    queued    后台队列批量异步上报
+输出每个用例在关键路径上增加的耗时、平台收到的请求数和吞吐量、调用耗时分位数
+
+用法:
+    python -m PlatformIntegration.benchmarks.platform_benchmark --tests 2000 --latency-ms 2
+"""
+import sys
+import json
+import math
+import time
+import argparse
+from typing import Dict, Any, List, Callable
+import requests
+from loguru import logger
+from Framework_Core.utils.platformUtils.platform_adapter import PlatformAdapter
+from PlatformIntegration.testing.fake_platform import FakePlatformServer
+
+SCENARIOS = ('unpooled', 'sync', 'queued')
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    计算分位数（最近秩法）
+    :param values: 已排序的数值列表
+    :param pct: 百分位，如99
+    :return: 分位数
+    """
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def _latency_summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p90_ms': round(percentile(samples, 90) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(samples[-1] * 1000, 3) if samples else 0.0,
+    }
+
+
+def _unpooled_reporter(adapter: PlatformAdapter) -> Callable[[str, str], None]:
+    def report(test_id: str, status: str) -> None:
+        requests.put(f"{adapter.base_url}/api/tests/{test_id}/status", json={'status': status},
+                     headers=adapter.headers, timeout=adapter.timeout).raise_for_status()
+    return report
+
+
+def run_scenario(name: str, tests: int, latency: float, reporting: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    运行单个场景
+    :param name: 场景名称
+    :param tests: 模拟的用例数
+    :param latency: 平台每个请求的处理延迟（秒）
+    :param reporting: 队列配置
+    :return: 测量结果
+    """
+    with FakePlatformServer(latency=latency) as platform:
+        adapter = PlatformAdapter({'api_base_url': platform.base_url, 'reporting': reporting})
+        if name == 'unpooled':
+            report = _unpooled_reporter(adapter)
+        elif name == 'sync':
+            report = adapter.update_test_status
+        else:
+            report = adapter.report_test_status
+
+        call_latencies = []
+        started = time.perf_counter()
+        for i in range(tests):
+            test_id = f"case_{i}"
+            # 每个用例开始和结束各上报一次状态，与TestExecutionTemplate一致
+            for status in ('RUNNING', 'PASSED'):
+                call_started = time.perf_counter()
+                report(test_id, status)
+                call_latencies.append(time.perf_counter() - call_started)
+        critical_path = time.perf_counter() - started
+        adapter.close(timeout=300)
+        wall = time.perf_counter() - started
+
+        server_latencies = [duration for _, _, duration in platform.requests]
+        delivered = sum(1 for status in platform.test_status.values() if status['status'] == 'PASSED')
+        return {
+            'scenario': name,
+            'tests': tests,
+            'overhead_per_test_ms': round(critical_path / tests * 1000, 3),
+            'critical_path_s': round(critical_path, 3),
+            'wall_s': round(wall, 3),
+            'platform_requests': len(platform.requests),
+            'requests_per_s': round(len(platform.requests) / wall, 1) if wall else 0.0,
+            'statuses_per_s': round(tests * 2 / wall, 1) if wall else 0.0,
+            'delivered': delivered,
+            'call_latency': _latency_summary(call_latencies),
+            'server_latency': _latency_summary(server_latencies),
+        }
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    """
+    格式化结果表格
+    :param results: 各场景的测量结果
+    :return: 表格文本
+    """
+    header = ('场景', '用例数', '单用例开销ms', '总耗时s', '平台请求数', '请求/s', '调用p50ms', '调用p99ms', '送达')
+    rows = [header] + [(
+        r['scenario'], r['tests'], r['overhead_per_test_ms'], r['wall_s'], r['platform_requests'],
+        r['requests_per_s'], r['call_latency']['p50_ms'], r['call_latency']['p99_ms'], r['delivered']
+    ) for r in results]
+    widths = [max(len(str(row[i])) for row in rows) + 2 for i in range(len(header))]
+    return "\n".join("".join(str(value).ljust(width) for value, width in zip(row, widths)) for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='平台上报性能基准')
+    parser.add_argument('--tests', type=int, default=1000, help='模拟的用例数')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='平台每个请求的处理延迟（毫秒）')
+    parser.add_argument('--batch-size', type=int, default=200, help='队列每批发送的记录数')
+    parser.add_argument('--flush-interval', type=float, default=0.5, help='队列最长缓冲时间（秒）')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='要运行的场景，逗号分隔')
+    parser.add_argument('--json', help='将结果写入JSON文件')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"不支持的场景: {', '.join(unknown)}")
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    reporting = {'batch_size': args.batch_size, 'flush_interval': args.flush_interval}
+    results = [run_scenario(name, args.tests, args.latency_ms / 1000, reporting) for name in scenarios]
+
+    print(format_table(results))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 import pytest
 from typing import Dict, Any
 from PlatformIntegration.api.platform_api import PlatformAPI
-from Framework_Core.utils.config_loader import ConfigLoader
+from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
 
 class TestExecutionTemplate:
     def __init__(self):
@@ -18,8 +18,8 @@ class TestExecutionTemplate:
         # 启动测试执行
         self.execution_id = self.platform_api.start_test_execution(suite_name, env)
         
-        # 获取环境配置
-        env_config = self.platform_api.get_test_environment(env)
+        # 获取环境配置，本地配置与平台变量合并，平台数据有磁盘缓存
+        env_config = self.platform_api.resolve_environment(env)
         if env_config:
             # 更新配置
             self.config_loader.update_config('test_environment', env_config)
@@ -29,6 +29,8 @@ class TestExecutionTemplate:
         清理测试套件
         :param results: 测试结果
         """
+        # 先发送队列中剩余的用例状态，再完成执行
+        self.platform_api.adapter.flush(timeout=30)
         if self.execution_id:
             # 计算测试状态
             status = 'PASSED' if results.get('failed', 0) == 0 else 'FAILED'
@@ -48,6 +50,7 @@ class TestExecutionTemplate:
                     'logs': './logs/test_execution.log'
                 }
             )
+        self.platform_api.close()
 
     @pytest.fixture(scope="session", autouse=True)
     def manage_test_execution(self, request):
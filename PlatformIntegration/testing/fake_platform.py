@@ -0,0 +1,284 @@
+import re
+import json
+import time
+import uuid
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from email.parser import BytesParser
+from email.policy import HTTP
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+from loguru import logger
+
+
+class FakePlatformServer:
+    """
+    进程内的测试平台替身
+    实现PlatformAdapter使用的全部接口，记录收到的请求和数据，可注入延迟和错误，
+    用于在没有真实平台的情况下验证平台集成和测量上报开销
+
+    使用示例:
+        with FakePlatformServer(latency=0.01) as platform:
+            adapter = PlatformAdapter({'api_base_url': platform.base_url})
+            adapter.update_test_status('case_1', 'PASSED')
+            assert platform.test_status['case_1']['status'] == 'PASSED'
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, bulk_status: bool = True):
+        """
+        :param host: 监听地址
+        :param port: 监听端口，0表示随机端口
+        :param latency: 每个请求的处理延迟（秒）
+        :param bulk_status: 是否支持批量更新状态接口
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.bulk_status = bulk_status
+        self.test_status: Dict[str, Dict[str, Any]] = {}
+        self.executions: Dict[str, List[Dict[str, Any]]] = {}
+        self.test_results: List[Dict[str, Any]] = []
+        self.test_cases: List[Dict[str, Any]] = []
+        self.reports: List[Dict[str, Any]] = []
+        self.environments: Dict[str, Dict[str, str]] = {}
+        self.test_configs: Dict[str, Dict[str, Any]] = {}
+        # 请求记录: (方法, 路径, 处理耗时)
+        self.requests: List[Tuple[str, str, float]] = []
+        self._uploads: Dict[str, Dict[str, Any]] = {}
+        self._failures: List[Tuple[re.Pattern, int, int]] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """
+        启动服务
+        :return: 服务地址
+        """
+        platform = self
+
+        class Handler(_PlatformHandler):
+            server_platform = platform
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-platform", daemon=True)
+        self._thread.start()
+        logger.info(f"测试平台替身已启动: {self.base_url}")
+        return self.base_url
+
+    def stop(self) -> None:
+        """停止服务"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread.join()
+
+    def __enter__(self) -> "FakePlatformServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def fail_next(self, path_pattern: str, status: int = 503, count: int = 1) -> None:
+        """
+        让匹配路径的接下来count个请求返回错误
+        :param path_pattern: 路径正则
+        :param status: 返回的状态码
+        :param count: 失败次数
+        """
+        with self._lock:
+            self._failures.append((re.compile(path_pattern), status, count))
+
+    def request_count(self, path_pattern: str = None) -> int:
+        """
+        统计收到的请求数
+        :param path_pattern: 路径正则，为空时统计全部
+        :return: 请求数
+        """
+        with self._lock:
+            if path_pattern is None:
+                return len(self.requests)
+            pattern = re.compile(path_pattern)
+            return sum(1 for _, path, _ in self.requests if pattern.search(path))
+
+    def reset(self) -> None:
+        """清空记录的请求和数据"""
+        with self._lock:
+            self.requests.clear()
+            self.test_status.clear()
+            self.executions.clear()
+            self.test_results.clear()
+            self.test_cases.clear()
+            self.reports.clear()
+            self._uploads.clear()
+            self._failures.clear()
+
+    def _injected_failure(self, path: str) -> Optional[int]:
+        with self._lock:
+            for i, (pattern, status, count) in enumerate(self._failures):
+                if pattern.search(path):
+                    if count <= 1:
+                        self._failures.pop(i)
+                    else:
+                        self._failures[i] = (pattern, status, count - 1)
+                    return status
+        return None
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: bytes,
+               content_type: str = '') -> Tuple[int, Any]:
+        """
+        处理请求
+        :return: (状态码, 响应内容)
+        """
+        status = self._injected_failure(path)
+        if status is not None:
+            return status, {'error': 'injected failure'}
+
+        with self._lock:
+            match = re.fullmatch(r'/api/tests/([^/]+)/status', path)
+            if match and method == 'PUT':
+                self.test_status[match.group(1)] = json.loads(body)
+                return 200, {'success': True}
+            if path == '/api/tests/status/batch' and method == 'POST':
+                if not self.bulk_status:
+                    return 404, {'error': 'not found'}
+                updates = json.loads(body)['updates']
+                for update in updates:
+                    self.test_status[update['test_id']] = {'status': update['status'], 'message': update.get('message')}
+                return 200, {'success': True, 'count': len(updates)}
+            match = re.fullmatch(r'/api/tests/([^/]+)/config', path)
+            if match and method == 'GET':
+                return 200, self.test_configs.get(match.group(1), {})
+            match = re.fullmatch(r'/api/executions/([^/]+)/status', path)
+            if match and method == 'PUT':
+                self.executions.setdefault(match.group(1), []).append(json.loads(body))
+                return 200, {'success': True}
+            if path == '/api/test-results' and method == 'POST':
+                self.test_results.append(json.loads(body))
+                return 200, {'success': True}
+            if path == '/api/test-cases/sync' and method == 'POST':
+                self.test_cases.extend(json.loads(body).get('test_cases', []))
+                return 200, {'success': True}
+            match = re.fullmatch(r'/api/environments/([^/]+)/variables', path)
+            if match and method == 'GET':
+                env = match.group(1)
+                if env not in self.environments:
+                    return 404, {'error': f'environment not found: {env}'}
+                return 200, self.environments[env]
+            if path == '/api/reports' and method == 'POST':
+                fields, files = _parse_multipart(content_type, body)
+                if 'file' not in files:
+                    return 400, {'error': 'missing file'}
+                filename, data = files['file']
+                return 200, self._store_report({**fields, 'filename': filename}, data)
+            return self._handle_upload(method, path, body)
+
+    def _handle_upload(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        """分块上传接口，调用方需持有锁"""
+        if path == '/api/reports/uploads' and method == 'POST':
+            upload_id = uuid.uuid4().hex
+            self._uploads[upload_id] = {'meta': json.loads(body), 'chunks': {}}
+            return 200, {'upload_id': upload_id}
+        match = re.fullmatch(r'/api/reports/uploads/([^/]+)(/chunks/(\d+)|/complete)?', path)
+        if not match or match.group(1) not in self._uploads:
+            return 404, {'error': 'not found'}
+        upload = self._uploads[match.group(1)]
+        if match.group(2) is None and method == 'GET':
+            return 200, {'received': sorted(upload['chunks'])}
+        if match.group(3) is not None and method == 'PUT':
+            upload['chunks'][int(match.group(3))] = body
+            return 200, {'success': True}
+        if match.group(2) == '/complete' and method == 'POST':
+            summary = json.loads(body)
+            data = b''.join(upload['chunks'].get(i, b'') for i in range(summary['chunks']))
+            if len(data) != summary['size'] or hashlib.sha256(data).hexdigest() != summary['sha256']:
+                return 400, {'error': 'checksum mismatch'}
+            del self._uploads[match.group(1)]
+            return 200, self._store_report(upload['meta'], data)
+        return 405, {'error': 'method not allowed'}
+
+    def _store_report(self, meta: Dict[str, Any], data: bytes) -> Dict[str, Any]:
+        report = {'id': uuid.uuid4().hex, 'meta': meta, 'size': len(data), 'data': data}
+        self.reports.append(report)
+        return {'id': report['id'], 'size': report['size']}
+
+
+def _parse_multipart(content_type: str, body: bytes) -> Tuple[Dict[str, str], Dict[str, Tuple[str, bytes]]]:
+    """
+    解析multipart/form-data请求体
+    :return: (表单字段, {字段名: (文件名, 内容)})
+    """
+    if not content_type.startswith('multipart/form-data'):
+        raise ValueError(f"不是multipart请求: {content_type}")
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + body)
+    fields, files = {}, {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        data = part.get_payload(decode=True)
+        if part.get_filename() is not None:
+            files[name] = (part.get_filename(), data)
+        else:
+            fields[name] = data.decode('utf-8')
+    return fields, files
+
+
+class _PlatformHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # 响应头和响应体分两次写出，不关闭Nagle算法时长连接上每个请求会多出约40ms的延迟确认等待
+    disable_nagle_algorithm = True
+    server_platform: FakePlatformServer = None
+
+    def _handle(self) -> None:
+        started = time.perf_counter()
+        parsed = urlparse(self.path)
+        body = self._read_body()
+        if self.server_platform.latency:
+            time.sleep(self.server_platform.latency)
+        try:
+            status, payload = self.server_platform.handle(self.command, parsed.path, parse_qs(parsed.query), body,
+                                                          self.headers.get('Content-Type', ''))
+        except Exception as e:
+            status, payload = 400, {'error': str(e)}
+        content = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        etag = None
+        if self.command == 'GET' and status == 200:
+            etag = f'"{hashlib.sha1(content).hexdigest()}"'
+            if self.headers.get('If-None-Match') == etag:
+                status, content = 304, b''
+        # 在写出响应前记录请求，客户端收到响应后统计请求数时一定包含这次请求
+        with self.server_platform._lock:
+            self.server_platform.requests.append((self.command, parsed.path, time.perf_counter() - started))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            data = bytearray()
+            while True:
+                size = int(self.rfile.readline().strip() or b'0', 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(data)
+                data += self.rfile.read(size)
+                self.rfile.readline()
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    do_GET = do_POST = do_PUT = _handle
+
+    def log_message(self, format, *args) -> None:
+        pass
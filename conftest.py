@@ -0,0 +1,14 @@
+"""
+框架插件注册
+放在项目根目录，从根目录执行pytest时，无论用例在哪个目录（test_case、Resources/test_data、tests）都会加载这些插件
+"""
+pytest_plugins = [
+    "Framework_Core.extensions.attachment_plugin",
+    "Framework_Core.extensions.yaml_plugin",
+    "Framework_Core.extensions.duration_plugin",
+    "Framework_Core.extensions.log_plugin",
+    "Framework_Core.extensions.telemetry_plugin",
+    "Framework_Core.extensions.result_store_plugin",
+    "Framework_Core.extensions.progress_plugin",
+    "Framework_Core.extensions.perf_baseline_plugin",
+]
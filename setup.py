@@ -7,13 +7,15 @@ setup(
     install_requires=[
         "pytest>=7.4.0",
         "pytest-xdist>=3.3.1",
+        "pytest-rerunfailures>=12.0",
         "allure-pytest>=2.13.2",
         "requests>=2.31.0",
         "pyyaml>=6.0.1",
         "python-dotenv>=1.0.0",
         "jsonpath>=0.82",
         "loguru>=0.7.0",
-        "pymysql>=1.1.0"
+        "pymysql>=1.1.0",
+        "aiohttp>=3.8.0"
     ],
     author="Your Name",
     author_email="your.email@example.com",
@@ -14,7 +14,7 @@ def api_client():
         "Content-Type": "application/json",
         "Accept": "application/json"
     })
-    test_logger.debug(f"API客户端headers设置: {client.session.headers}")
+    test_logger.debug("API客户端headers设置: {}", lambda: client.session.headers, lazy=True)
     return client
 
 @pytest.fixture
@@ -23,7 +23,7 @@ def test_data() -> Dict:
     test_logger.info("加载测试数据")
     with open("Resources/test_data/demo_data.json", "r", encoding="utf-8") as f:
         data = json.load(f)
-        test_logger.debug(f"加载的测试数据: {data}")
+        test_logger.debug("加载的测试数据: {}", data)
         return data
 
 @allure.feature("示例模块")
@@ -41,10 +41,10 @@ class TestUserManagement:
         test_logger.info(f"开始测试创建用户: {user_data}")
         
         with allure.step("发送创建用户请求"):
-            test_logger.debug(f"发送创建用户请求，数据: {user_data}")
+            test_logger.debug("发送创建用户请求，数据: {}", user_data)
             response = api_client.post("/users", json_data=user_data)
-            test_logger.debug(f"创建用户响应状态码: {response.status_code}")
-            test_logger.debug(f"创建用户响应数据: {response.text}")
+            test_logger.debug("创建用户响应状态码: {}", response.status_code)
+            test_logger.debug("创建用户响应数据: {}", lambda: response.text, lazy=True)
         
         with allure.step("验证响应状态码"):
             assert response.status_code == 201, f"创建用户失败: {response.text}"
@@ -52,7 +52,7 @@ class TestUserManagement:
         
         with allure.step("验证响应数据"):
             resp_data = response.json()
-            test_logger.debug(f"验证响应数据: {resp_data}")
+            test_logger.debug("验证响应数据: {}", resp_data)
             assert resp_data["username"] == user_data["username"]
             assert resp_data["email"] == user_data["email"]
             assert "id" in resp_data
@@ -66,10 +66,10 @@ class TestUserManagement:
         test_logger.info(f"开始测试获取用户信息，用户ID: {user_id}")
         
         with allure.step(f"获取用户ID: {user_id}的信息"):
-            test_logger.debug(f"发送获取用户信息请求，用户ID: {user_id}")
+            test_logger.debug("发送获取用户信息请求，用户ID: {}", user_id)
             response = api_client.get(f"/users/{user_id}")
-            test_logger.debug(f"获取用户信息响应状态码: {response.status_code}")
-            test_logger.debug(f"获取用户信息响应数据: {response.text}")
+            test_logger.debug("获取用户信息响应状态码: {}", response.status_code)
+            test_logger.debug("获取用户信息响应数据: {}", lambda: response.text, lazy=True)
         
         with allure.step("验证响应状态码"):
             assert response.status_code == 200, f"获取用户信息失败: {response.text}"
@@ -77,7 +77,7 @@ class TestUserManagement:
         
         with allure.step("验证响应数据"):
             resp_data = response.json()
-            test_logger.debug(f"验证响应数据: {resp_data}")
+            test_logger.debug("验证响应数据: {}", resp_data)
             assert resp_data["id"] == user_id
             assert "username" in resp_data
             assert "email" in resp_data
@@ -92,13 +92,13 @@ class TestUserManagement:
             "email": "updated@example.com"
         }
         test_logger.info(f"开始测试更新用户信息，用户ID: {user_id}")
-        test_logger.debug(f"更新数据: {update_data}")
+        test_logger.debug("更新数据: {}", update_data)
         
         with allure.step(f"更新用户ID: {user_id}的信息"):
-            test_logger.debug(f"发送更新用户信息请求，用户ID: {user_id}")
+            test_logger.debug("发送更新用户信息请求，用户ID: {}", user_id)
             response = api_client.put(f"/users/{user_id}", json_data=update_data)
-            test_logger.debug(f"更新用户信息响应状态码: {response.status_code}")
-            test_logger.debug(f"更新用户信息响应数据: {response.text}")
+            test_logger.debug("更新用户信息响应状态码: {}", response.status_code)
+            test_logger.debug("更新用户信息响应数据: {}", lambda: response.text, lazy=True)
         
         with allure.step("验证响应状态码"):
             assert response.status_code == 200, f"更新用户信息失败: {response.text}"
@@ -106,7 +106,7 @@ class TestUserManagement:
         
         with allure.step("验证响应数据"):
             resp_data = response.json()
-            test_logger.debug(f"验证响应数据: {resp_data}")
+            test_logger.debug("验证响应数据: {}", resp_data)
             assert resp_data["id"] == user_id
             assert resp_data["email"] == update_data["email"]
             test_logger.info("响应数据验证通过") 
\ No newline at end of file
@@ -0,0 +1,9 @@
+import pytest
+from PlatformIntegration.testing.fake_platform import FakePlatformServer
+
+
+@pytest.fixture
+def fake_platform():
+    """进程内的测试平台替身"""
+    with FakePlatformServer() as platform:
+        yield platform
@@ -0,0 +1,70 @@
+import io
+import os
+import tarfile
+import pytest
+import requests
+from Framework_Core.utils.platformUtils.artifact_upload import ChunkedUploader
+
+CHUNKS = r'/chunks/\d+$'
+
+
+@pytest.fixture
+def uploader(fake_platform, tmp_path):
+    session = requests.Session()
+    yield ChunkedUploader(session, fake_platform.base_url, chunk_size=1024, max_retries=2, backoff=0.01,
+                          state_dir=str(tmp_path / 'state'))
+    session.close()
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / 'report.bin'
+    path.write_bytes(os.urandom(5 * 1024 + 100))
+    return path
+
+
+def test_upload_in_chunks(fake_platform, uploader, artifact):
+    result = uploader.upload(str(artifact), 'allure', {'execution_id': 'e1'})
+    report = fake_platform.reports[0]
+    assert result == {'id': report['id'], 'size': artifact.stat().st_size}
+    assert report['data'] == artifact.read_bytes()
+    assert report['meta']['execution_id'] == 'e1'
+    assert fake_platform.request_count(CHUNKS) == 6
+
+
+def test_resume_skips_received_chunks(fake_platform, uploader, artifact, tmp_path):
+    """中断后再次上传同一产物时只发送平台未接收的块"""
+    fake_platform.fail_next(r'/chunks/3$', status=400)
+    with pytest.raises(requests.HTTPError):
+        uploader.upload(str(artifact), 'allure')
+    assert os.listdir(tmp_path / 'state')
+    assert fake_platform.request_count(CHUNKS) == 4
+
+    uploader.upload(str(artifact), 'allure')
+    assert fake_platform.request_count(CHUNKS) == 4 + 3
+    assert fake_platform.reports[0]['data'] == artifact.read_bytes()
+    assert not os.listdir(tmp_path / 'state')
+
+
+def test_retry_server_errors(fake_platform, uploader, artifact):
+    fake_platform.fail_next(r'/chunks/1$', status=503, count=2)
+    uploader.upload(str(artifact), 'allure')
+    assert fake_platform.reports[0]['data'] == artifact.read_bytes()
+
+
+def test_directory_upload(fake_platform, uploader, tmp_path):
+    directory = tmp_path / 'allure-report'
+    directory.mkdir()
+    (directory / 'index.html').write_text('<html></html>', encoding='utf-8')
+    uploader.upload(str(directory), 'allure')
+    with tarfile.open(fileobj=io.BytesIO(fake_platform.reports[0]['data'])) as tar:
+        assert [name.split('/')[-1] for name in tar.getnames()][-1] == 'index.html'
+
+
+def test_form_upload_fallback(fake_platform, uploader, artifact):
+    """平台不支持分块接口时使用multipart表单上传"""
+    fake_platform.fail_next(r'/api/reports/uploads$', status=404)
+    uploader.upload(str(artifact), 'allure', {'execution_id': 'e1'})
+    report = fake_platform.reports[0]
+    assert report['data'] == artifact.read_bytes()
+    assert report['meta'] == {'type': 'allure', 'execution_id': 'e1', 'filename': 'report.bin'}
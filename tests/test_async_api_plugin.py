@@ -0,0 +1,55 @@
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+import requests
+from Framework_Core.utils.requestUtils.async_api_plugin import AsyncAPIRequest
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(404 if self.path == '/missing' else 200)
+        self.send_header('Set-Cookie', 'a=1')
+        self.send_header('Set-Cookie', 'b=2')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _send(base_url, endpoint):
+    async def send():
+        client = AsyncAPIRequest(base_url)
+        try:
+            return await client.send('GET', endpoint)
+        finally:
+            await client.aclose()
+    return asyncio.run(send())
+
+
+def test_response_headers(base_url):
+    """响应头不区分大小写，并保留重复的响应头"""
+    response = _send(base_url, '/ok')
+    assert response.headers['content-type'] == 'application/json'
+    assert response.headers.getall('Set-Cookie') == ['a=1', 'b=2']
+
+
+def test_raise_for_status(base_url):
+    response = _send(base_url, '/missing')
+    with pytest.raises(requests.HTTPError) as excinfo:
+        response.raise_for_status()
+    assert excinfo.value.response is response
+    assert str(excinfo.value) == f"404 Client Error for url: {base_url}/missing"
@@ -0,0 +1,44 @@
+import yaml
+import pytest
+from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump({'api': {'timeout': 30, 'retries': 1}}), encoding='utf-8')
+    yield str(path)
+    ConfigLoader.reset_instances()
+
+
+def test_update_config_is_saved(config_path):
+    """update_config的修改由save_config写回，命令行覆盖项不写入文件"""
+    loader = ConfigLoader(config_path)
+    loader.apply_overrides(["api.retries=5"])
+    loader.update_config("api.timeout", 60)
+    assert loader.get_value("api") == {'timeout': 60, 'retries': 5}
+    loader.save_config()
+    with open(config_path, encoding='utf-8') as f:
+        assert yaml.safe_load(f) == {'api': {'timeout': 60, 'retries': 1}}
+
+
+def test_update_config_survives_reload(config_path):
+    loader = ConfigLoader(config_path)
+    loader.update_config("api.timeout", 60)
+    loader.load_config()
+    assert loader.get_value("api.timeout") == 60
+
+
+def test_get_value_copy(config_path):
+    loader = ConfigLoader(config_path)
+    assert loader.get_value("api") is loader.get_value("api")
+    copied = loader.get_value("api", copy_value=True)
+    copied['timeout'] = 1
+    assert loader.get_value("api.timeout") == 30
+
+
+def test_protected_layers(config_path):
+    loader = ConfigLoader(config_path)
+    for layer in ('base', 'updates', 'unknown'):
+        with pytest.raises(ValueError):
+            loader.set_layer(layer, {})
@@ -0,0 +1,36 @@
+from datetime import datetime
+import pytest
+from Framework_Core.core.cron import CronExpression
+
+
+@pytest.mark.parametrize("expr, start, expected", [
+    # 起始时间本身不算
+    ("*/15 * * * *", datetime(2025, 10, 18, 10, 15), datetime(2025, 10, 18, 10, 30)),
+    # 秒会被忽略
+    ("* * * * *", datetime(2025, 10, 18, 10, 15, 59), datetime(2025, 10, 18, 10, 16)),
+    # 跨年
+    ("59 23 31 12 *", datetime(2025, 12, 31, 23, 59), datetime(2026, 12, 31, 23, 59)),
+    ("@yearly", datetime(2025, 12, 31, 23, 59), datetime(2026, 1, 1)),
+    # 2月29日只在闰年触发
+    ("0 0 29 2 *", datetime(2025, 3, 1), datetime(2028, 2, 29)),
+    # 31日跳过小月
+    ("0 12 31 * *", datetime(2025, 4, 1), datetime(2025, 5, 31, 12)),
+    # 日和周同时指定时满足其一即可
+    ("0 9 1 * mon", datetime(2025, 9, 1, 9, 0), datetime(2025, 9, 8, 9, 0)),
+    # 周日可以写作7
+    ("*/15 * * * 7", datetime(2025, 10, 18, 23, 50), datetime(2025, 10, 19)),
+    ("0 8 * jan-mar/2 *", datetime(2025, 1, 31, 8), datetime(2025, 3, 1, 8)),
+])
+def test_next_after(expr, start, expected):
+    assert CronExpression(expr).next_after(start) == expected
+
+
+def test_never_fires():
+    with pytest.raises(ValueError):
+        CronExpression("0 0 30 2 *").next_after(datetime(2025, 1, 1))
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "* 24 * * *", "0 0 0 * *", "*/0 * * * *", "5-1 * * * *"])
+def test_invalid_expression(expr):
+    with pytest.raises(ValueError):
+        CronExpression(expr)
@@ -0,0 +1,128 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import pytest
+from Framework_Core.core.case_runner import YamlCaseRunner
+from Framework_Core.utils.fileUtils.case_model import YamlCaseFile
+from Framework_Core.utils.requestUtils.api_plugin import APIRequest
+from Framework_Core.utils.requestUtils.attachment_policy import AttachmentPolicy
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """返回请求路径和查询参数，/fail 返回 code=1"""
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def _reply(self):
+        url = urlsplit(self.path)
+        self.requests.append(url.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        body = json.dumps({'code': 1 if url.path == '/fail' else 0, 'path': url.path,
+                           'query': {key: values[0] for key, values in parse_qs(url.query).items()}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def runner(base_url):
+    _Handler.requests.clear()
+    runner = YamlCaseRunner(APIRequest(attachment_policy=AttachmentPolicy(mode='never')),
+                            functions={'host': lambda: base_url})
+    yield runner
+    runner.dependencies.close()
+
+
+def _case(url, request_type='json', data=None, dependencies=None, code=0):
+    return {
+        'host': '${{host()}}', 'url': url, 'method': 'POST', 'requestType': request_type,
+        'data': data or {},
+        'dependence_case_data': dependencies or [],
+        'assert': {'code': {'jsonpath': '$.code', 'type': '==', 'value': code}},
+    }
+
+
+def _dep(case_id, dependent_type, jsonpath, name):
+    return {'case_id': case_id,
+            'dependent_data': [{'dependent_type': dependent_type, 'jsonpath': jsonpath, 'set_cache': f'${{{{{name}}}}}'}]}
+
+
+def test_dependent_type_sources(runner):
+    """response从响应体提取，json/params/form-data从上游用例发送的请求数据中提取"""
+    case_file = YamlCaseFile('deps.yaml', {
+        'login': _case('/login', 'json', {'user': 'alice'}),
+        'query': _case('/query', 'params', {'page': 3}),
+        'form': _case('/form', 'data', {'token': 'abc'}),
+        'target': _case('/target', 'json', dependencies=[
+            _dep('login', 'response', '$.path', 'path'),
+            _dep('login', 'json', '$.user', 'user'),
+            _dep('query', 'params', '$.page', 'page'),
+            _dep('form', 'form-data', '$.token', 'token'),
+        ]),
+    })
+    runner.run_case(case_file, case_file.cases['target'])
+
+    assert runner.cache == {'path': '/login', 'user': 'alice', 'page': 3, 'token': 'abc'}
+    assert sorted(_Handler.requests) == ['/form', '/login', '/query', '/target']
+
+
+def test_unsupported_dependent_type(runner):
+    case_file = YamlCaseFile('deps.yaml', {
+        'login': _case('/login'),
+        'target': _case('/target', dependencies=[_dep('login', 'headers', '$.token', 'token')]),
+    })
+    with pytest.raises(ValueError, match="不支持的依赖类型: headers"):
+        runner.run_case(case_file, case_file.cases['target'])
+    assert _Handler.requests == []
+
+
+def test_dependent_type_mismatch_request_type(runner):
+    """依赖上游用例的json数据，但上游用例按params发送"""
+    case_file = YamlCaseFile('deps.yaml', {
+        'query': _case('/query', 'params', {'page': 1}),
+        'target': _case('/target', dependencies=[_dep('query', 'json', '$.page', 'page')]),
+    })
+    with pytest.raises(ValueError, match="requestType为params"):
+        runner.run_case(case_file, case_file.cases['target'])
+
+
+def test_upstream_assertion_failure(runner):
+    """上游用例断言失败时不发送当前用例，且失败的响应不会被复用"""
+    case_file = YamlCaseFile('deps.yaml', {
+        'broken': _case('/fail'),
+        'target': _case('/target', dependencies=[_dep('broken', 'response', '$.code', 'code')]),
+    })
+    for _ in range(2):
+        with pytest.raises(AssertionError, match="依赖用例 broken 断言失败"):
+            runner.run_case(case_file, case_file.cases['target'])
+    assert _Handler.requests == ['/fail', '/fail']
+
+
+def test_failed_case_not_reused(runner):
+    case_file = YamlCaseFile('deps.yaml', {
+        'broken': _case('/fail'),
+        'target': _case('/target', dependencies=[_dep('broken', 'response', '$.code', 'code')]),
+    })
+    with pytest.raises(AssertionError):
+        runner.run_case(case_file, case_file.cases['broken'])
+    with pytest.raises(AssertionError, match="依赖用例 broken"):
+        runner.run_case(case_file, case_file.cases['target'])
+    assert _Handler.requests == ['/fail', '/fail']
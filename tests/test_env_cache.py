@@ -0,0 +1,78 @@
+import os
+import stat
+import pytest
+from Framework_Core.utils.platformUtils.platform_adapter import PlatformAdapter
+
+VARIABLES = r'/api/environments/dev/variables$'
+
+
+@pytest.fixture
+def make_adapter(fake_platform, tmp_path):
+    adapters = []
+
+    def make(ttl=300, token='token-a'):
+        adapter = PlatformAdapter({
+            'api_base_url': fake_platform.base_url,
+            'api_token': token,
+            'cache': {'dir': str(tmp_path / 'cache'), 'ttl': ttl},
+            'upload': {'state_dir': str(tmp_path / 'upload')},
+        })
+        adapters.append(adapter)
+        return adapter
+
+    fake_platform.environments['dev'] = {'db_host': 'db-1'}
+    yield make
+    for adapter in adapters:
+        adapter.close()
+
+
+def _record_statuses(adapter):
+    statuses = []
+    get = adapter.session.get
+
+    def record(*args, **kwargs):
+        response = get(*args, **kwargs)
+        statuses.append(response.status_code)
+        return response
+
+    adapter.session.get = record
+    return statuses
+
+
+def test_fresh_cache_skips_request(fake_platform, make_adapter):
+    """TTL内包括其他进程（新的适配器实例）都直接使用磁盘缓存"""
+    assert make_adapter().get_environment_variables('dev') == {'db_host': 'db-1'}
+    assert make_adapter().get_environment_variables('dev') == {'db_host': 'db-1'}
+    assert fake_platform.request_count(VARIABLES) == 1
+
+
+def test_expired_cache_revalidates_with_etag(fake_platform, make_adapter):
+    adapter = make_adapter(ttl=0)
+    statuses = _record_statuses(adapter)
+    adapter.get_environment_variables('dev')
+    assert adapter.get_environment_variables('dev') == {'db_host': 'db-1'}
+    fake_platform.environments['dev'] = {'db_host': 'db-2'}
+    assert adapter.get_environment_variables('dev') == {'db_host': 'db-2'}
+    assert statuses == [200, 304, 200]
+
+
+def test_platform_down_uses_stale_cache(fake_platform, make_adapter):
+    adapter = make_adapter(ttl=0)
+    adapter.get_environment_variables('dev')
+    fake_platform.fail_next(VARIABLES, status=503)
+    assert adapter.get_environment_variables('dev') == {'db_host': 'db-1'}
+
+
+def test_cache_is_keyed_by_credential(fake_platform, make_adapter):
+    make_adapter(token='token-a').get_environment_variables('dev')
+    make_adapter(token='token-b').get_environment_variables('dev')
+    assert fake_platform.request_count(VARIABLES) == 2
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="只在POSIX上检查文件权限")
+def test_cache_files_are_private(make_adapter, tmp_path):
+    make_adapter().get_environment_variables('dev')
+    directory = tmp_path / 'cache'
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+    for path in directory.iterdir():
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
@@ -0,0 +1,18 @@
+import importlib.util
+import pytest
+from Framework_Core.core import executor
+
+pytestmark = pytest.mark.skipif(importlib.util.find_spec('xdist') is None, reason="需要pytest-xdist")
+
+
+def test_duration_strategy_loads_plugin():
+    """按耗时分配时显式加载duration_plugin，用例不在项目根目录下时--duration-order同样可用"""
+    args = executor.TestExecutor.build_args(["cases"], test_config={'parallel': True, 'distribution': 'duration', 'max_workers': 2})
+    assert args[args.index("-p") + 1] == executor.DURATION_PLUGIN
+    assert args.index("-p") < args.index("--duration-order")
+    assert args[-1] == "cases"
+
+
+def test_other_strategies_do_not_load_plugin():
+    args = executor.TestExecutor.build_args(["cases"], test_config={'parallel': True, 'distribution': 'module'})
+    assert "-p" not in args and "--duration-order" not in args
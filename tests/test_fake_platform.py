@@ -0,0 +1,32 @@
+import requests
+
+
+def test_records_requests_before_responding(fake_platform):
+    """客户端收到响应后请求已被记录"""
+    for _ in range(20):
+        requests.get(f"{fake_platform.base_url}/api/tests/case_1/config")
+    assert fake_platform.request_count(r'/config$') == 20
+
+
+def test_injected_failures(fake_platform):
+    fake_platform.fail_next(r'/config$', status=503, count=2)
+    url = f"{fake_platform.base_url}/api/tests/case_1/config"
+    assert [requests.get(url).status_code for _ in range(3)] == [503, 503, 200]
+
+
+def test_etag_revalidation(fake_platform):
+    fake_platform.environments['dev'] = {'db_host': 'db-1'}
+    url = f"{fake_platform.base_url}/api/environments/dev/variables"
+    etag = requests.get(url).headers['ETag']
+    assert requests.get(url, headers={'If-None-Match': etag}).status_code == 304
+    fake_platform.environments['dev'] = {'db_host': 'db-2'}
+    assert requests.get(url, headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_multipart_report(fake_platform):
+    response = requests.post(f"{fake_platform.base_url}/api/reports",
+                             data={'type': 'allure'}, files={'file': ('report.zip', b'zip-data')})
+    assert response.status_code == 200
+    report = fake_platform.reports[0]
+    assert report['meta'] == {'type': 'allure', 'filename': 'report.zip'}
+    assert report['data'] == b'zip-data'
@@ -0,0 +1,67 @@
+import math
+import random
+import pytest
+from Framework_Core.core.histogram import LatencyHistogram, SUB_BUCKETS
+
+
+def _histogram(values):
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+def _exact_percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def test_small_values_are_exact():
+    """小于SUB_BUCKETS微秒的值精确记录"""
+    histogram = _histogram([i / 1_000_000 for i in range(1, SUB_BUCKETS)])
+    assert histogram.percentile(50) == pytest.approx(16 / 1_000_000)
+    assert histogram.percentile(100) == pytest.approx((SUB_BUCKETS - 1) / 1_000_000)
+
+
+@pytest.mark.parametrize("pct", [1, 50, 90, 95, 99, 99.9, 100])
+def test_percentile_relative_error(pct):
+    """分位数的相对误差不超过1/SUB_BUCKETS"""
+    rng = random.Random(pct)
+    values = [rng.lognormvariate(math.log(0.05), 1.5) for _ in range(5000)]
+    expected = _exact_percentile(values, pct)
+    assert abs(_histogram(values).percentile(pct) - expected) <= expected / SUB_BUCKETS
+
+
+def test_percentile_clamped_to_recorded_range():
+    histogram = _histogram([0.123456])
+    assert histogram.percentile(0) == histogram.percentile(100) == 0.123456
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0.0
+    assert histogram.mean == 0.0
+
+
+def test_merge_matches_single_histogram():
+    """合并两个直方图与把全部值记录到一个直方图的结果相同"""
+    rng = random.Random(1)
+    first = [rng.uniform(0.001, 0.5) for _ in range(1000)]
+    second = [rng.uniform(0.2, 2.0) for _ in range(500)]
+    merged = _histogram(first)
+    merged.merge(_histogram(second))
+    combined = _histogram(first + second)
+    assert merged.counts == combined.counts
+    assert merged.count == 1500
+    assert merged.min == min(first) and merged.max == max(second)
+    assert merged.total == pytest.approx(combined.total)
+    for pct in (50, 95, 99):
+        assert merged.percentile(pct) == combined.percentile(pct)
+
+
+def test_merge_empty_and_round_trip():
+    histogram = _histogram([0.01, 0.02, 0.03])
+    histogram.merge(LatencyHistogram())
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.counts == histogram.counts
+    assert restored.summary() == histogram.summary()
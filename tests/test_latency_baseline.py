@@ -0,0 +1,24 @@
+import pytest
+from Framework_Core.core.histogram import LatencyHistogram
+from Framework_Core.core.latency_baseline import mann_whitney_p
+
+
+def _histogram(micros):
+    histogram = LatencyHistogram()
+    for value in micros:
+        histogram.record(value / 1_000_000)
+    return histogram
+
+
+def test_mann_whitney_known_answer():
+    """基线1~5微秒、本次6~10微秒: U=25，z=(25-12.5-0.5)/sqrt(25/12*11)，单侧p=0.0060929"""
+    baseline = _histogram(range(1, 6))
+    current = _histogram(range(6, 11))
+    assert mann_whitney_p(baseline, current) == pytest.approx(0.0060929, rel=1e-4)
+    assert mann_whitney_p(current, baseline) == pytest.approx(0.9966923, rel=1e-4)
+
+
+def test_mann_whitney_degenerate():
+    same = _histogram([5] * 5)
+    assert mann_whitney_p(same, same) == 1.0
+    assert mann_whitney_p(LatencyHistogram(), same) == 1.0
@@ -0,0 +1,31 @@
+import random
+from Framework_Core.core.duration_store import lpt_partition
+
+
+def test_known_partition():
+    """5→0，4→1，3→1，3→0，3→1，每个worker内部从长到短"""
+    assert lpt_partition([5, 4, 3, 3, 3], 2) == [[0, 3], [1, 2, 4]]
+
+
+def test_every_item_assigned_once():
+    rng = random.Random(0)
+    durations = [rng.expovariate(1) for _ in range(200)]
+    shards = lpt_partition(durations, 7)
+    assert len(shards) == 7
+    assert sorted(index for shard in shards for index in shard) == list(range(200))
+    for shard in shards:
+        assert [durations[i] for i in shard] == sorted((durations[i] for i in shard), reverse=True)
+
+
+def test_makespan_bound():
+    """LPT的最大负载不超过 平均负载 + 最长用例"""
+    rng = random.Random(1)
+    durations = [rng.uniform(0.1, 30) for _ in range(100)]
+    loads = [sum(durations[i] for i in shard) for shard in lpt_partition(durations, 4)]
+    assert max(loads) <= sum(durations) / 4 + max(durations)
+
+
+def test_more_workers_than_items():
+    assert lpt_partition([1.0, 2.0], 4) == [[1], [0], [], []]
+    assert lpt_partition([], 3) == [[], [], []]
+    assert lpt_partition([1.0, 2.0], 0) == [[1, 0]]
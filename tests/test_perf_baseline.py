@@ -0,0 +1,64 @@
+import pytest
+from Framework_Core.core.latency_baseline import LatencyBaseline, RegressionDetector
+from Framework_Core.extensions.perf_baseline_plugin import PerfRegressionCheck
+from Framework_Core.utils.requestUtils.telemetry import RequestTelemetry, get_telemetry, set_telemetry
+
+
+def _record(telemetry, url, seconds, status=200, error=None):
+    telemetry.record('GET', url, status, {'total': seconds}, error=error)
+
+
+@pytest.fixture
+def telemetry():
+    previous = get_telemetry()
+    telemetry = RequestTelemetry()
+    set_telemetry(telemetry)
+    yield telemetry
+    set_telemetry(previous)
+
+
+def test_failed_requests_excluded_from_success_histogram(telemetry):
+    for _ in range(3):
+        _record(telemetry, 'http://api/users/1', 0.1)
+    _record(telemetry, 'http://api/users/2', 0.002, status=None, error=ConnectionError())
+    _record(telemetry, 'http://api/users/3', 0.005, status=503)
+    snapshot = telemetry.snapshot()
+    assert snapshot['histograms']['GET /users/{id}']['count'] == 5
+    assert snapshot['success']['GET /users/{id}']['count'] == 3
+    assert snapshot['errors'] == {'GET /users/{id}': 2}
+
+    merged = RequestTelemetry()
+    merged.merge_snapshot(snapshot)
+    merged.merge_snapshot(snapshot)
+    assert merged.success_histograms['GET /users/{id}'].count == 6
+    assert merged.success_histograms['GET /users/{id}'].min == pytest.approx(0.1)
+
+
+def test_baseline_uses_successful_requests(telemetry, tmp_path):
+    """全部失败的接口不参与检测，其他接口只用成功请求的耗时记录基线"""
+    for _ in range(3):
+        _record(telemetry, 'http://api/orders', 0.1)
+    _record(telemetry, 'http://api/orders', 0.001, status=None, error=ConnectionError())
+    for _ in range(2):
+        _record(telemetry, 'http://api/users', 0.002, status=None, error=ConnectionError())
+    baseline = LatencyBaseline(str(tmp_path / 'baseline.json'))
+    results = PerfRegressionCheck(baseline, RegressionDetector(), 'dev').check()
+    assert [(row['endpoint'], row['count'], row['errors']) for row in results] == [('/orders', 3, 1)]
+    run = LatencyBaseline(baseline.path).runs(LatencyBaseline.key('dev', 'GET', '/orders'))[0]
+    assert run['histogram']['min'] == pytest.approx(0.1)
+
+
+def test_mostly_failed_endpoint_not_recorded(telemetry, tmp_path):
+    _record(telemetry, 'http://api/orders', 0.1)
+    for _ in range(2):
+        _record(telemetry, 'http://api/orders', 0.1, status=500)
+    baseline = LatencyBaseline(str(tmp_path / 'baseline.json'))
+    PerfRegressionCheck(baseline, RegressionDetector(), 'dev').check()
+    assert not LatencyBaseline(baseline.path).runs(LatencyBaseline.key('dev', 'GET', '/orders'))
+
+
+def test_check_without_recording(telemetry, tmp_path):
+    _record(telemetry, 'http://api/orders', 0.1)
+    baseline = LatencyBaseline(str(tmp_path / 'baseline.json'))
+    assert PerfRegressionCheck(baseline, RegressionDetector(), 'dev').check(record=False)
+    assert not (tmp_path / 'baseline.json').exists()
@@ -0,0 +1,27 @@
+import pytest
+from Framework_Core.utils.fileUtils.config_loader import ConfigLoader
+from PlatformIntegration.api.platform_api import PlatformAPI
+
+
+@pytest.fixture
+def platform_api(fake_platform, tmp_path):
+    api = PlatformAPI({'api_base_url': fake_platform.base_url, 'cache': {'dir': str(tmp_path), 'ttl': 0}})
+    yield api
+    api.adapter.close()
+    # platform层写入了共享的配置实例
+    ConfigLoader.reset_instances()
+
+
+def test_resolve_environment_refreshes_after_ttl(fake_platform, platform_api):
+    """缓存过期后重新获取平台变量，不会一直使用第一次的结果"""
+    fake_platform.environments['dev'] = {'db_host': 'db-1'}
+    assert platform_api.resolve_environment('dev')['db_host'] == 'db-1'
+    fake_platform.environments['dev'] = {'db_host': 'db-2'}
+    assert platform_api.resolve_environment('dev')['db_host'] == 'db-2'
+
+
+def test_resolve_environment_returns_copy(fake_platform, platform_api):
+    fake_platform.environments['dev'] = {'db_host': 'db-1'}
+    first = platform_api.resolve_environment('dev')
+    first['db_host'] = 'changed'
+    assert platform_api.resolve_environment('dev')['db_host'] == 'db-1'
@@ -0,0 +1,57 @@
+import pytest
+from _pytest.reports import TestReport
+from Framework_Core.core.progress import LiveProgress
+
+
+def _report(when, outcome, nodeid='test_a.py::test_a', api_requests=None):
+    report = TestReport(nodeid, ('test_a.py', 0, 'test_a'), {}, outcome,
+                        'error' if outcome == 'failed' else None, when)
+    if api_requests is not None:
+        report.api_requests = api_requests
+    return report
+
+
+def _run(progress, setup='passed', call='passed', teardown='passed', api_requests=None):
+    progress.add_report(_report('setup', setup))
+    if setup == 'passed':
+        progress.add_report(_report('call', call))
+    progress.add_report(_report('teardown', teardown, api_requests=api_requests))
+
+
+@pytest.mark.parametrize("phases, outcomes", [
+    ({}, {'passed': 1}),
+    ({'call': 'failed'}, {'failed': 1}),
+    ({'call': 'skipped'}, {'skipped': 1}),
+    ({'setup': 'skipped'}, {'skipped': 1}),
+    ({'setup': 'failed'}, {'error': 1}),
+    # 用例通过但teardown失败时与pytest一样同时计为passed和error
+    ({'teardown': 'failed'}, {'passed': 1, 'error': 1}),
+])
+def test_outcomes(phases, outcomes):
+    progress = LiveProgress()
+    _run(progress, **phases)
+    assert progress.outcomes == outcomes
+    assert progress.completed == 1
+
+
+def test_requests_and_snapshot():
+    progress = LiveProgress()
+    progress.set_total(3)
+    _run(progress, api_requests=[('GET /users', 20.0, False), ('GET /users', 40.0, True)])
+    _run(progress, call='failed', api_requests=[('POST /orders', 100.0, False)])
+    assert progress.requests == 3 and progress.request_errors == 1
+    assert progress.recent_error_rate() == pytest.approx(1 / 3)
+    assert progress.recent_error_rate(min_requests=10) is None
+    snapshot = progress.snapshot()
+    assert snapshot['completed'] == 2 and snapshot['total'] == 3
+    assert snapshot['outcomes'] == {'passed': 1, 'failed': 1}
+    assert {(row['method'], row['endpoint'], row['count'], row['errors']) for row in snapshot['endpoints']} == {
+        ('GET', '/users', 2, 1), ('POST', '/orders', 1, 0)}
+
+
+def test_in_flight():
+    progress = LiveProgress()
+    progress.test_started('test_a.py::test_a')
+    assert list(progress.in_flight) == ['test_a.py::test_a']
+    progress.test_finished('test_a.py::test_a')
+    assert not progress.in_flight
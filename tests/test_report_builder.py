@@ -0,0 +1,70 @@
+import json
+from Framework_Core.core.report_builder import ReportBuilder
+from Framework_Core.core.result_store import SegmentWriter
+
+
+def _result(name, status='passed', start=1000, history_id=None):
+    return {'name': name, 'historyId': history_id or name, 'status': status, 'start': start, 'stop': start + 10,
+            'labels': [{'name': 'suite', 'value': 'demo'}]}
+
+
+def _write(results_dir, file_name, result):
+    (results_dir / file_name).write_text(json.dumps(result), encoding='utf-8')
+
+
+def test_incremental_reads_only_new_files(tmp_path):
+    results, report = tmp_path / 'results', tmp_path / 'report'
+    results.mkdir()
+    _write(results, 'a-result.json', _result('a'))
+    assert ReportBuilder(str(results), str(report)).build()['total'] == 1
+
+    # 已处理过的文件在增量模式下不会重新读取
+    _write(results, 'a-result.json', _result('a', status='failed'))
+    _write(results, 'b-result.json', _result('b', status='broken'))
+    summary = ReportBuilder(str(results), str(report)).build(incremental=True)
+    assert summary['total'] == 2
+    assert summary['statuses']['passed'] == 1 and summary['statuses']['broken'] == 1
+
+    # 全量生成时重新读取全部文件
+    summary = ReportBuilder(str(results), str(report)).build()
+    assert summary['statuses']['failed'] == 1 and summary['statuses']['broken'] == 1
+
+
+def test_incremental_rerun_keeps_latest(tmp_path):
+    results, report = tmp_path / 'results', tmp_path / 'report'
+    results.mkdir()
+    _write(results, 'a1-result.json', _result('a', status='failed', start=1000))
+    ReportBuilder(str(results), str(report)).build()
+    _write(results, 'a2-result.json', _result('a', status='passed', start=2000))
+    summary = ReportBuilder(str(results), str(report)).build(incremental=True)
+    assert summary['total'] == 1
+    assert summary['statuses']['passed'] == 1
+    assert summary['slowest'][0]['status'] == 'passed'
+
+
+def test_incremental_segments(tmp_path):
+    """分段文件只处理上次生成后追加的记录"""
+    results, report = tmp_path / 'results', tmp_path / 'report'
+    writer = SegmentWriter(str(results / 'gw0.seg'))
+    writer.append('result', 'a-result.json', json.dumps(_result('a')).encode('utf-8'))
+    writer.flush()
+    assert ReportBuilder(str(results), str(report)).build()['total'] == 1
+
+    writer.append('result', 'b-result.json', json.dumps(_result('b', status='failed')).encode('utf-8'))
+    writer.close()
+    builder = ReportBuilder(str(results), str(report))
+    summary = builder.build(incremental=True)
+    assert summary['total'] == 2
+    assert summary['statuses']['failed'] == 1
+    assert builder.seen_segments['gw0.seg'][1] == 2
+
+
+def test_state_from_other_results_dir_is_ignored(tmp_path):
+    report = tmp_path / 'report'
+    for name in ('first', 'second'):
+        (tmp_path / name).mkdir()
+        _write(tmp_path / name, f'{name}-result.json', _result(name))
+    ReportBuilder(str(tmp_path / 'first'), str(report)).build()
+    summary = ReportBuilder(str(tmp_path / 'second'), str(report)).build(incremental=True)
+    assert summary['total'] == 1
+    assert summary['slowest'][0]['name'] == 'second'
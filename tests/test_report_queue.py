@@ -0,0 +1,96 @@
+import gc
+import threading
+from Framework_Core.utils.platformUtils import report_queue
+from Framework_Core.utils.platformUtils.platform_adapter import PlatformAdapter
+from Framework_Core.utils.platformUtils.report_queue import ReportQueue
+
+
+def _adapter(fake_platform, tmp_path, **reporting):
+    return PlatformAdapter({
+        'api_base_url': fake_platform.base_url,
+        'cache': {'enabled': False},
+        'upload': {'state_dir': str(tmp_path)},
+        'reporting': {'flush_interval': 60, 'backoff': 0.01, **reporting},
+    })
+
+
+def test_batching_and_merging(fake_platform, tmp_path):
+    """同一用例只上报最新状态，按batch_size分批发送"""
+    adapter = _adapter(fake_platform, tmp_path, batch_size=2)
+    adapter.report_test_status('case_0', 'RUNNING')
+    for i in range(5):
+        adapter.report_test_status(f'case_{i}', 'PASSED')
+    assert adapter.close(timeout=5)
+    assert {case: data['status'] for case, data in fake_platform.test_status.items()} == {
+        f'case_{i}': 'PASSED' for i in range(5)}
+    assert fake_platform.request_count(r'/status/batch$') == 3
+
+
+def test_retry_on_server_error(fake_platform, tmp_path):
+    adapter = _adapter(fake_platform, tmp_path)
+    fake_platform.fail_next(r'/status/batch$', status=503, count=2)
+    adapter.report_test_status('case_1', 'FAILED')
+    assert adapter.flush(timeout=5)
+    assert fake_platform.test_status['case_1']['status'] == 'FAILED'
+    assert fake_platform.request_count(r'/status/batch$') == 3
+    assert adapter.reporter.sent == 1
+    adapter.close()
+
+
+def test_client_error_is_not_retried(fake_platform, tmp_path):
+    adapter = _adapter(fake_platform, tmp_path)
+    fake_platform.fail_next(r'/status/batch$', status=400)
+    adapter.report_test_status('case_1', 'PASSED')
+    assert adapter.flush(timeout=5)
+    assert adapter.reporter.dropped == 1
+    assert fake_platform.request_count(r'/status/batch$') == 1
+    adapter.close()
+
+
+def test_fallback_to_single_status(fake_platform, tmp_path):
+    """平台不支持批量接口时逐条发送"""
+    fake_platform.bulk_status = False
+    adapter = _adapter(fake_platform, tmp_path)
+    adapter.report_test_status('case_1', 'PASSED')
+    adapter.report_test_status('case_2', 'FAILED')
+    assert adapter.close(timeout=5)
+    assert fake_platform.test_status['case_2']['status'] == 'FAILED'
+    assert fake_platform.request_count(r'/api/tests/case_\d/status$') == 2
+
+
+def test_close_rejects_new_records():
+    sent = []
+    queue = ReportQueue(sent.extend, flush_interval=60)
+    queue.put('a', {'id': 'a'})
+    assert queue.close(timeout=5)
+    queue.put('b', {'id': 'b'})
+    assert sent == [{'id': 'a'}]
+    assert queue.close() is True
+
+
+def test_flush_timeout_resets_flush_request():
+    """flush超时后恢复按时间间隔发送，之后的记录不会被立即发送"""
+    release = threading.Event()
+    sent = []
+
+    def send(batch):
+        release.wait(5)
+        sent.extend(batch)
+
+    queue = ReportQueue(send, flush_interval=60)
+    queue.put('a', {'id': 'a'})
+    assert queue.flush(timeout=0.05) is False
+    release.set()
+    queue.put('b', {'id': 'b'})
+    assert not queue._flush_requested
+    assert queue.close(timeout=5)
+    assert sent == [{'id': 'a'}, {'id': 'b'}]
+
+
+def test_closed_queue_is_released():
+    queue = ReportQueue(lambda batch: None)
+    assert queue in report_queue._open_queues
+    queue.close()
+    del queue
+    gc.collect()
+    assert not report_queue._open_queues
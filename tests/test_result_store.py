@@ -0,0 +1,71 @@
+import os
+import pytest
+from Framework_Core.core.result_store import MAGIC, SegmentReader, SegmentWriter, export_allure
+
+RECORDS = [('result', f'{i}-result.json', b'{"name": "t%d"}' % i) if i % 3 == 0
+           else ('attachment', f'{i}-attachment.txt', os.urandom(300)) for i in range(20)]
+
+
+def _write(path, close=True):
+    # 数据块很小，记录分布在多个数据块中
+    writer = SegmentWriter(str(path), block_size=1024)
+    for kind, name, data in RECORDS:
+        writer.append(kind, name, data)
+    if close:
+        writer.close()
+    else:
+        writer.flush()
+    return writer
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "main.seg"
+    _write(path)
+    with SegmentReader(str(path)) as reader:
+        assert list(reader) == RECORDS
+        assert reader.read('4-attachment.txt') == RECORDS[4][2]
+        assert reader.read('missing') is None
+        assert [name for _, name, _ in reader.records(kind='result')] == [r[1] for r in RECORDS if r[0] == 'result']
+        assert list(reader.records(start=18)) == RECORDS[18:]
+
+
+def test_empty_writer_creates_no_file(tmp_path):
+    path = tmp_path / "main.seg"
+    SegmentWriter(str(path)).close()
+    assert not path.exists()
+
+
+def test_missing_index_is_rebuilt(tmp_path):
+    """进程异常退出没有写入索引时按数据块重建"""
+    path = tmp_path / "main.seg"
+    _write(path, close=False)
+    with SegmentReader(str(path)) as reader:
+        assert list(reader) == RECORDS
+
+
+def test_truncated_file_keeps_complete_blocks(tmp_path):
+    """截断在最后一个数据块中间时，只丢失该数据块"""
+    path = tmp_path / "main.seg"
+    writer = _write(path)
+    last_block = writer.index[-1][2]
+    data = path.read_bytes()
+    path.write_bytes(data[:last_block + 10])
+    with SegmentReader(str(path)) as reader:
+        records = list(reader)
+    kept = sum(entry[2] < last_block for entry in writer.index)
+    assert 0 < kept < len(RECORDS)
+    assert records == RECORDS[:kept]
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "main.seg"
+    path.write_bytes(b'x' * len(MAGIC))
+    with pytest.raises(ValueError):
+        SegmentReader(str(path))
+
+
+def test_export_allure(tmp_path):
+    _write(tmp_path / "gw0.seg")
+    target = tmp_path / "export"
+    assert export_allure(str(tmp_path), str(target)) == len(RECORDS)
+    assert (target / RECORDS[1][1]).read_bytes() == RECORDS[1][2]